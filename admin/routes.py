@@ -1,64 +1,99 @@
 import os # Import necessary modules
-from flask import Blueprint, request, jsonify, current_app # Import Flask components for creating routes
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context # Import Flask components for creating routes
 from bson import ObjectId # Import ObjectId for MongoDB document IDs
+from bson.errors import InvalidId # Raised for a malformed dashboard cursor
 from werkzeug.utils import secure_filename # Import secure_filename to handle file uploads safely
 import uuid # Import uuid to generate unique filenames
-import cloudinary # Import cloudinary for image uploads
-import cloudinary.uploader # Import cloudinary uploader for uploading images
+from admin.uploads import image_uploads, UploadError # Import the concurrent image upload pool
+from datetime import datetime, timedelta # Import datetime helpers for the date-range filters
+from hotels.names import normalize_name, name_index # Import hotel name normalization and the autocomplete index
+from utils.response_cache import cached_response, response_cache # Import the catalogue response cache
+from admin import transfer # Import the NDJSON/CSV export and import helpers
+from auth.identity import admin_required # Import the JWT plus ADMIN_EMAILS check for bulk data routes
+from observability.metrics import timed_external # Import the external call timer
+from hotels.search import city_key # Import the city normalization used by /search
 
 admin_bp = Blueprint('admin', __name__) # Blueprint for admin routes
 
+DASHBOARD_PAGE_SIZE = 50 # Bookings per dashboard page when a cursor is given without a limit
+DASHBOARD_MAX_PAGE_SIZE = 500 # Upper bound on the page size a client can request
+DASHBOARD_SORT = {'_id': -1} # Newest bookings first; pages continue below the last _id, like /get-rooms and history
+DASHBOARD_USER_LOOKUP = {'$lookup': { # The booking's user name, one indexed _id lookup per booking
+    'from': 'users',
+    'let': {'user_id': {'$convert': {'input': '$user', 'to': 'objectId', 'onError': None, 'onNull': None}}},
+    'pipeline': [
+        {'$match': {'$expr': {'$eq': ['$_id', '$$user_id']}}},
+        {'$project': {'_id': 0, 'name': 1}}
+    ],
+    'as': 'user_doc'
+}}
+
+def booking_date_filter(args): # Build a created_at range filter from the 'from' and 'to' query parameters (YYYY-MM-DD)
+    created_at = {}
+    if args.get('from'):
+        created_at['$gte'] = datetime.strptime(args['from'], '%Y-%m-%d')
+    if args.get('to'):
+        created_at['$lt'] = datetime.strptime(args['to'], '%Y-%m-%d') + timedelta(days=1) # Include the whole 'to' day
+    return {'created_at': created_at} if created_at else {}
+
 @admin_bp.route('/dashboard', methods=['GET']) 
 def dashboard():
     mongo = current_app.mongo # Get the MongoDB instance from the current app context
-    bookings = list(mongo.db.bookings.find({}, { # Find all bookings and select specific fields
-        'user': 1, 
-        'name': 1,
-        'pricePerNight': 1,
-        'status': 1,
-        '_id': 0
-    }))
-
-    user_ids = [] # Prepare a list to hold user IDs
-    for booking in bookings: 
-        try:
-            user_ids.append(ObjectId(booking['user'])) # Convert user ID to ObjectId and append to the list
-        except:
-            pass
-
-    users = mongo.db.users.find( # Find users by their IDs and select specific fields
-        {'_id': {'$in': user_ids}},
-        {'_id': 1, 'name': 1}
-    )
-
-    user_id_to_name = {str(user['_id']): user['name'] for user in users} # Create a mapping of user IDs to names for easy lookup
-
-    dashboard_data = [] # Prepare a list to hold dashboard data
-    for booking in bookings: # Iterate through each booking
-        user_id = str(booking['user']) # Get the user ID as a string
-        dashboard_data.append({ # Append booking details along with user name and hotel name
-            'user_name': user_id_to_name.get(user_id, 'Unknown'),
-            'hotel_name': booking.get('name', 'N/A'),
-            'amount': booking.get('pricePerNight', 0),
-            'payment_status': booking.get('status', 'Unknown'),
-        })
-
-    return jsonify(dashboard_data), 200 # Return the dashboard data as a JSON response
+
+    paginated = 'limit' in request.args or 'cursor' in request.args # Without either, every booking is returned as before
+    try:
+        match = booking_date_filter(request.args)
+        limit = min(max(int(request.args.get('limit', DASHBOARD_PAGE_SIZE)), 1), DASHBOARD_MAX_PAGE_SIZE)
+        if request.args.get('cursor'): # Continue below the last booking of the previous page
+            match = {'$and': [match, {'_id': {'$lt': ObjectId(request.args['cursor'])}}]}
+    except (ValueError, InvalidId):
+        return jsonify({'message': 'Invalid limit, cursor or date parameters'}), 400
+
+    project = {
+        '_id': 0,
+        'user_name': {'$ifNull': [{'$arrayElemAt': ['$user_doc.name', 0]}, 'Unknown']},
+        'hotel_name': {'$ifNull': ['$name', 'N/A']},
+        'amount': {'$ifNull': ['$pricePerNight', 0]},
+        'payment_status': {'$ifNull': ['$status', 'Unknown']}
+    }
+    pipeline = [{'$match': match}, {'$sort': DASHBOARD_SORT}]
+    if paginated:
+        project['cursor'] = {'$toString': '$_id'} # Passed back as ?cursor= for the next page
+        pipeline.append({'$limit': limit}) # Only the bookings on this page are joined with users
+    pipeline += [DASHBOARD_USER_LOOKUP, {'$project': project}]
+    dashboard_data = list(mongo.db.bookings.aggregate(pipeline))
+
+    if not paginated:
+        return jsonify(dashboard_data), 200 # Return every booking as a JSON list, the original response
+
+    page = {'bookings': dashboard_data,
+            'next_cursor': dashboard_data[-1]['cursor'] if len(dashboard_data) == limit else None} # A full page means there may be more
+    if request.args.get('includeCount') in ('1', 'true'): # Counting touches every matching booking, so it is opt-in
+        page['total'] = mongo.db.bookings.count_documents(booking_date_filter(request.args))
+    return jsonify(page), 200
 
 @admin_bp.route('/booking-summary', methods=['GET'])
 def booking_summary():
     mongo = current_app.mongo # Get the MongoDB instance from the current app context
 
-    bookings = list(mongo.db.bookings.find({}, {'pricePerNight': 1})) # Find all bookings and select only the pricePerNight field
+    try:
+        match = booking_date_filter(request.args)
+    except ValueError:
+        return jsonify({'message': 'Invalid date parameters'}), 400
+
+    summary = next(mongo.db.bookings.aggregate([ # Count and sum on the server instead of loading every booking
+        {'$match': match},
+        {'$facet': {
+            'totals': [{'$group': {'_id': None, 'total_bookings': {'$sum': 1}, 'total_amount': {'$sum': '$pricePerNight'}}}],
+            'by_status': [{'$group': {'_id': '$status', 'count': {'$sum': 1}}}]
+        }}
+    ]))
+    totals = summary['totals'][0] if summary['totals'] else {'total_bookings': 0, 'total_amount': 0}
 
-    total_bookings = len(bookings) # Count the total number of bookings
-    total_amount = 0    # Initialize total amount to 0
-    for b in bookings: # Iterate through each booking
-        total_amount += b.get('pricePerNight', 0)
-    
     return jsonify({ # Return a summary of bookings
-        'total_bookings': total_bookings,
-        'total_amount': total_amount
+        'total_bookings': totals['total_bookings'],
+        'total_amount': totals['total_amount'],
+        'by_status': {str(s['_id']): s['count'] for s in summary['by_status']} # Booking counts per payment status
     }), 200
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'} # Set of allowed file extensions for image uploads
@@ -78,27 +113,13 @@ def add_hotels():
     if len(images) != 4: # Check if exactly 4 images are provided
         return jsonify({'error': 'Exactly 4 images are required'}), 400 
 
-    cloudinary.config( # Configure Cloudinary with credentials from the current app context
-        cloud_name=current_app.config['CLOUDINARY_CLOUD_NAME'],
-        api_key=current_app.config['CLOUDINARY_API_KEY'],
-        api_secret=current_app.config['CLOUDINARY_API_SECRET']
-    )
-
-    
-    saved_paths = [] # Prepare a list to hold the saved image paths
-
-    for image in images: # Iterate through each image
-        if image and allowed_file(image.filename): # Check if the image is valid and has an allowed file extension
-            try:
-                result = cloudinary.uploader.upload(image, folder="hotel_images") # Upload the image to Cloudinary
-                saved_paths.append(result['secure_url']) # Append the secure URL of the uploaded image to the list
-            except Exception as e:
-                return jsonify({'error': f'Failed to upload image: {str(e)}'}), 500
-        else:
+    for image in images: # Validate every file before anything is uploaded
+        if not image or not allowed_file(image.filename): # Check if the image is valid and has an allowed file extension
             return jsonify({'error': f'Invalid file type: {image.filename}'}), 400
 
     hotel_name = request.form.get('hotel_name') # Get the hotel name from the form data
     street_address = request.form.get("street_address") # Get the street address from the form data
+    city = request.form.get('city') # Get the city from the form data, used by /search
     hotel_type = request.form.get('hotel_type') # Get the hotel type from the form data
     price_per_night = request.form.get('price_per_night') # Get the price per night from the form data
     amenities = request.form.getlist('amenities') # Get the list of amenities from the form data
@@ -106,21 +127,38 @@ def add_hotels():
     if not hotel_name or not hotel_type or not price_per_night or not amenities: # Check if any required fields are missing
         return jsonify({'error': 'Missing required hotel fields'}), 400
 
+    try:
+        price_per_night = float(price_per_night) # Validate the price before spending time on uploads
+    except ValueError:
+        return jsonify({'error': 'price_per_night must be a number'}), 400
+
+    try:
+        with timed_external('cloudinary'): # Time the upload batch as one external call
+            saved_paths = image_uploads.upload_all(images, folder="hotel_images") # Upload all images concurrently, cleaning up on partial failure
+    except UploadError as e:
+        return jsonify({'error': f'Failed to upload image: {str(e)}'}), 500
+
     hotel_data = {  # Create a dictionary to hold the hotel data
         'images': saved_paths,
         'hotelName': hotel_name,
+        'hotelNameKey': normalize_name(hotel_name), # Normalized name for indexed exact lookups
         'streetAddress': street_address,
+        'city': city,
+        'cityKey': city_key(city), # Normalized city for indexed /search filters
         'roomType': hotel_type,
-        'pricePerNight': float(price_per_night),
+        'pricePerNight': price_per_night,
         'amenities': amenities
     } 
 
     result = mongo.db.rooms.insert_one(hotel_data) # Insert the hotel data into the MongoDB collection
-    hotel_data['_id'] = str(result.inserted_id) # Add the inserted ID to the hotel data
+    hotel_data['_id'] = result.inserted_id # Add the inserted ID to the hotel data
+    name_index.add(result.inserted_id, hotel_name) # Keep the autocomplete index current
+    response_cache.invalidate('rooms') # Cached catalogue responses are now stale
 
     return jsonify({'message': 'Hotel Added Successfully', 'hotel': hotel_data}), 201 # Return success response with hotel data
 
 @admin_bp.route('/hotels-listing', methods = ['GET'])
+@cached_response('rooms')
 def hotel_listing():
     mongo = current_app.mongo # Get the MongoDB instance from the current app context
     hotels = list(mongo.db.rooms.find({}, 
@@ -135,6 +173,64 @@ def delete_hotel(hotel_id):
 
     result = mongo.db.rooms.delete_one({'_id': ObjectId(hotel_id)}) # Delete the hotel by its ID
     if result.deleted_count == 1: # If the deletion was successful, return a success message
+        name_index.remove(hotel_id) # Drop the room from the autocomplete index
+        response_cache.invalidate('rooms') # Cached catalogue responses are now stale
         return jsonify({'message': 'Hotel Deleted'}), 200 # If the hotel was deleted successfully
     else:
-        return jsonify({'message': 'Hotel not found'}), 404 # If the hotel was not found, return an error message
\ No newline at end of file
+        return jsonify({'message': 'Hotel not found'}), 404 # If the hotel was not found, return an error message
+
+@admin_bp.route('/admin/export/<collection>', methods=['GET'])
+@admin_required
+def export_collection(collection):
+    mongo = current_app.mongo # Get the MongoDB instance from the current app context
+    if collection not in transfer.TRANSFER_COLLECTIONS: # Only bookings and rooms can be exported
+        return jsonify({'error': f'Cannot export {collection}'}), 400
+
+    export_format = request.args.get('format', 'ndjson') # ndjson (default) or csv
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format must be ndjson or csv'}), 400
+    try:
+        query = transfer.date_range_filter(collection, request.args) # Optional from/to date range
+    except ValueError:
+        return jsonify({'error': 'Invalid date parameters'}), 400
+
+    cursor = mongo.db[collection].find(query).sort('_id', 1).batch_size(1000) # Documents are fetched a batch at a time while streaming
+    filename = f"{collection}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{export_format}"
+    if export_format == 'csv':
+        body, mimetype = transfer.export_csv(cursor, transfer.TRANSFER_COLLECTIONS[collection]), 'text/csv'
+    else:
+        body, mimetype = transfer.export_ndjson(cursor), 'application/x-ndjson'
+
+    response = Response(stream_with_context(body), mimetype=mimetype) # Stream the export straight from the cursor
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@admin_bp.route('/admin/import/<collection>', methods=['POST'])
+@admin_required
+def import_collection(collection):
+    mongo = current_app.mongo # Get the MongoDB instance from the current app context
+    if collection not in transfer.TRANSFER_COLLECTIONS: # Only bookings and rooms can be imported
+        return jsonify({'error': f'Cannot import {collection}'}), 400
+    try:
+        start_line = max(int(request.args.get('from_line', 1)), 1) # Resume an interrupted import at the reported line
+    except ValueError:
+        return jsonify({'error': 'from_line must be a number'}), 400
+
+    if request.mimetype == 'multipart/form-data': # NDJSON uploaded as a file field
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file part in the request'}), 400
+        stream = request.files['file'].stream
+    else: # NDJSON sent as the raw request body
+        stream = request.stream
+
+    report = transfer.import_ndjson(mongo.db, collection, stream, start_line=start_line) # Parsed line by line and inserted in unordered chunks
+
+    if collection == 'rooms' and report['inserted']:
+        response_cache.invalidate('rooms') # Cached catalogue responses are now stale
+        if report['resume_from'] is None: # After a MongoDB failure the periodic refresh picks the names up instead
+            name_index.rebuild(mongo.db) # Pick up the imported hotel names for autocomplete
+
+    if report['resume_from'] is not None: # Stopped part way: send the same file again with ?from_line=<resume_from>
+        return jsonify(report), 503
+    status = 200 if report['error_count'] == 0 else 207 # 207: some lines were rejected, see the per-line report
+    return jsonify(report), status
@@ -0,0 +1,178 @@
+import csv
+import io
+import sys
+import click
+from datetime import datetime, timedelta
+from bson import ObjectId, json_util
+from bson.json_util import JSONOptions, JSONMode
+from pymongo.errors import BulkWriteError, PyMongoError
+from hotels.names import normalize_name
+from bookings import inventory
+from bookings.statuses import INACTIVE_STATUSES
+
+# Bulk data transfer for admins: exports stream a collection straight from a MongoDB cursor as NDJSON or CSV in
+# constant memory, imports read an NDJSON stream line by line and write it in unordered insert_many chunks.
+# NDJSON uses MongoDB relaxed extended JSON so ObjectIds and dates survive an export/import round trip.
+# They are served by admin_required routes in admin/routes.py and by the export-collection and import-collection
+# CLI commands. Imported bookings reserve their nights on the room calendar like /book-room does; a booking whose
+# nights are held by another booking is rejected.
+#
+# An import that stops part way (MongoDB unreachable, say) reports `resume_from`, the first line whose document may
+# not be stored; every line before it was either stored or listed in `errors`. Running the import again from that
+# line is safe for lines that carry an _id, as exports do: documents already stored are counted in
+# `already_present` instead of being inserted twice, and a booking's own nights count as free. Lines without an _id
+# get a new one on every run.
+
+EXPORT_JSON_OPTIONS = JSONOptions(json_mode=JSONMode.RELAXED)
+IMPORT_CHUNK_SIZE = 1000 # Documents per insert_many call
+MAX_REPORTED_ERRORS = 1000 # Per-line errors listed in the import report; the count is always exact
+DUPLICATE_KEY = 11000 # Write error code of a document whose _id is already stored
+
+TRANSFER_COLLECTIONS = { # Collections that can be exported or imported, with their CSV columns
+    'bookings': ['_id', 'user', 'room_id', 'name', 'address', 'guest_count', 'check_in', 'check_out', 'status',
+                 'pricePerNight', 'total_amount', 'created_at'],
+    'rooms': ['_id', 'hotelName', 'streetAddress', 'city', 'roomType', 'pricePerNight', 'amenities', 'isAvailable'],
+}
+
+def date_range_filter(collection, args): # 'from' / 'to' (YYYY-MM-DD) on created_at for bookings, on the _id timestamp for rooms
+    start = datetime.strptime(args['from'], '%Y-%m-%d') if args.get('from') else None
+    end = datetime.strptime(args['to'], '%Y-%m-%d') + timedelta(days=1) if args.get('to') else None
+    field = 'created_at' if collection == 'bookings' else '_id'
+    condition = {}
+    if start:
+        condition['$gte'] = start if field == 'created_at' else ObjectId.from_datetime(start)
+    if end:
+        condition['$lt'] = end if field == 'created_at' else ObjectId.from_datetime(end)
+    return {field: condition} if condition else {}
+
+def export_ndjson(cursor): # One extended-JSON document per line
+    for doc in cursor:
+        yield json_util.dumps(doc, json_options=EXPORT_JSON_OPTIONS) + '\n'
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, list):
+        return '|'.join(str(item) for item in value)
+    return '' if value is None else str(value)
+
+def export_csv(cursor, columns): # Header row then one row per document, written through a reused buffer
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for doc in cursor:
+        writer.writerow([_csv_value(doc.get(column)) for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def prepare_document(collection, doc): # Keep derived fields consistent with the normal write paths
+    if collection == 'rooms' and doc.get('hotelName'):
+        doc['hotelNameKey'] = normalize_name(doc['hotelName'])
+        doc['cityKey'] = normalize_name(doc.get('city')) or None # Matches hotels.search.city_key
+        doc.setdefault('isAvailable', True)
+    if collection == 'bookings':
+        doc.setdefault('_id', ObjectId()) # The calendar records which booking holds each night
+    return doc
+
+def holds_nights(doc): # Bookings that occupy the calendar; cancelled and expired ones do not
+    return (doc.get('status') not in INACTIVE_STATUSES
+            and isinstance(doc.get('check_in'), datetime) and isinstance(doc.get('check_out'), datetime)
+            and isinstance(doc.get('room_id'), ObjectId))
+
+def _flush(db, collection, docs, line_numbers, report):
+    if not docs:
+        return
+    try:
+        result = db[collection].insert_many(docs, ordered=False) # Unordered: one bad document does not stop the rest
+        report['inserted'] += len(result.inserted_ids)
+    except BulkWriteError as e:
+        details = e.details
+        report['inserted'] += details.get('nInserted', 0)
+        failed = []
+        for error in details.get('writeErrors', []):
+            if error.get('code') == DUPLICATE_KEY: # Stored by an earlier run of this import; its nights are its own
+                report['already_present'] += 1
+                continue
+            _record_error(report, line_numbers[error['index']], error.get('errmsg', 'write error'))
+            failed.append(docs[error['index']])
+        if collection == 'bookings': # Give back the nights reserved for bookings that were not stored
+            inventory.release_stays(db, [doc for doc in failed if holds_nights(doc)])
+
+def _record_error(report, line, message):
+    report['error_count'] += 1
+    if len(report['errors']) < MAX_REPORTED_ERRORS:
+        report['errors'].append({'line': line, 'error': message})
+
+def import_ndjson(db, collection, stream, chunk_size=IMPORT_CHUNK_SIZE, start_line=1): # Parse and insert an NDJSON stream chunk by chunk
+    report = {'inserted': 0, 'already_present': 0, 'error_count': 0, 'errors': [], 'resume_from': None, 'stopped': None}
+    docs = []
+    line_numbers = [] # Source line of each buffered document, to map write errors back
+    line_number = start_line - 1
+    try:
+        for line_number, raw in enumerate(stream, start=1):
+            if line_number < start_line: # Settled by an earlier run
+                continue
+            line = raw.decode('utf-8', errors='replace').strip() if isinstance(raw, bytes) else raw.strip()
+            if not line:
+                continue
+            try:
+                doc = json_util.loads(line)
+                if not isinstance(doc, dict):
+                    raise ValueError('each line must be a JSON object')
+            except Exception as e: # Malformed JSON or extended-JSON values such as a bad $oid
+                _record_error(report, line_number, f"invalid JSON: {e}")
+                continue
+            doc = prepare_document(collection, doc)
+            if collection == 'bookings' and holds_nights(doc):
+                if not inventory.reserve_stay(db, doc['room_id'], doc['check_in'], doc['check_out'], doc['_id'], own_ok=True):
+                    _record_error(report, line_number, 'room is already booked for these dates')
+                    continue
+            docs.append(doc)
+            line_numbers.append(line_number)
+            if len(docs) >= chunk_size:
+                _flush(db, collection, docs, line_numbers, report)
+                docs, line_numbers = [], []
+        _flush(db, collection, docs, line_numbers, report)
+    except PyMongoError as e: # Stop here and say where to pick up; the buffered documents may or may not be stored
+        report['resume_from'] = line_numbers[0] if line_numbers else line_number
+        report['stopped'] = str(e)
+    return report
+
+def init_app(app):
+    @app.cli.command('export-collection')
+    @click.argument('collection', type=click.Choice(list(TRANSFER_COLLECTIONS)))
+    @click.option('--format', 'export_format', type=click.Choice(['ndjson', 'csv']), default='ndjson')
+    @click.option('--from', 'start', help='First created_at day, YYYY-MM-DD')
+    @click.option('--to', 'end', help='Last created_at day, YYYY-MM-DD')
+    @click.option('--output', type=click.File('w', encoding='utf-8'), default='-')
+    def export_collection_command(collection, export_format, start, end, output): # flask export-collection bookings --output bookings.ndjson
+        try:
+            query = date_range_filter(collection, {'from': start, 'to': end})
+        except ValueError:
+            raise click.BadParameter('dates must be YYYY-MM-DD')
+        cursor = app.mongo.db[collection].find(query).sort('_id', 1).batch_size(1000) # A batch at a time, in constant memory
+        if export_format == 'csv':
+            body = export_csv(cursor, TRANSFER_COLLECTIONS[collection])
+        else:
+            body = export_ndjson(cursor)
+        for chunk in body:
+            output.write(chunk)
+
+    @app.cli.command('import-collection')
+    @click.argument('collection', type=click.Choice(list(TRANSFER_COLLECTIONS)))
+    @click.argument('source', type=click.File('rb'), default='-')
+    @click.option('--from-line', 'start_line', type=click.IntRange(min=1), default=1, help='Resume an interrupted import at this line')
+    def import_collection_command(collection, source, start_line): # flask import-collection rooms rooms.ndjson
+        report = import_ndjson(app.mongo.db, collection, source, start_line=start_line)
+        click.echo(f"Inserted {report['inserted']} documents, {report['already_present']} already present, {report['error_count']} errors")
+        for error in report['errors']:
+            click.echo(f"line {error['line']}: {error['error']}", err=True)
+        if report['resume_from'] is not None:
+            click.echo(f"Stopped at line {report['resume_from']}: {report['stopped']}", err=True)
+            click.echo(f"Run again with --from-line {report['resume_from']} to continue", err=True)
+        if collection == 'rooms' and report['inserted']:
+            click.echo('Running workers pick up the new rooms when their response cache and name index refresh')
+        if report['error_count'] or report['resume_from'] is not None:
+            sys.exit(1)
@@ -0,0 +1,136 @@
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Hotel image uploads. The images of one request are uploaded concurrently on a bounded thread pool, straight from
+# the file objects werkzeug spooled the upload into (large files live in temporary files on disk, not in worker
+# memory). If any upload fails, the ones that already succeeded are deleted so no orphaned assets are left behind.
+# A batch that has not finished within timeout seconds fails the same way; uploads still running at that point
+# delete their asset as soon as they complete.
+
+LARGE_UPLOAD_BYTES = 20 * 1024 * 1024 # Above this, Cloudinary's chunked upload is used
+
+class UploadError(Exception): # Raised when at least one image of a batch could not be uploaded
+    pass
+
+def _stream_size(stream): # Size of a seekable file object without reading it
+    position = stream.tell()
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+class CloudinaryUploader:
+    def __init__(self, cloud_name, api_key, api_secret):
+        self._credentials = {'cloud_name': cloud_name, 'api_key': api_key, 'api_secret': api_secret}
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _uploader(self): # The SDK is imported and configured on the first upload, not at start-up
+        with self._lock:
+            if self._module is None:
+                import cloudinary # Imported here so the fake uploader works without the Cloudinary SDK installed
+                import cloudinary.uploader
+                cloudinary.config(**self._credentials) # Configured once per process
+                self._module = cloudinary.uploader
+            return self._module
+
+    def upload(self, stream, filename, folder): # Returns (secure_url, public_id)
+        if _stream_size(stream) > LARGE_UPLOAD_BYTES:
+            result = self._uploader().upload_large(stream, folder=folder, chunk_size=6 * 1024 * 1024) # Sent in chunks
+        else:
+            result = self._uploader().upload(stream, folder=folder)
+        return result['secure_url'], result['public_id']
+
+    def delete(self, public_id):
+        self._uploader().destroy(public_id)
+
+class FakeUploader: # Offline stand-in that reads the stream like the real SDK and simulates network latency
+    def __init__(self, latency=0.0, failure_rate=0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.deleted = deque(maxlen=1000) # Most recent deletions only, so long bench runs stay bounded
+        self._lock = threading.Lock()
+
+    def upload(self, stream, filename, folder):
+        while stream.read(64 * 1024): # Consume the body chunk by chunk
+            pass
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise UploadError(f"fake upload failed for {filename}")
+        public_id = f"{folder}/{uuid.uuid4().hex}"
+        return f"https://fake.cloudinary.local/{public_id}", public_id
+
+    def delete(self, public_id):
+        with self._lock:
+            self.deleted.append(public_id)
+
+class ImageUploadPool:
+    def __init__(self, uploader=None, workers=8, timeout=60.0):
+        self.uploader = uploader
+        self.workers = workers
+        self.timeout = timeout # Seconds a request waits for its whole batch
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self): # Created on first use so forked workers each get their own threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='image-upload')
+            return self._executor
+
+    def upload_all(self, files, folder): # Upload every file concurrently; all succeed or none are kept
+        pool = self._pool()
+        futures = [pool.submit(self.uploader.upload, f.stream, f.filename, folder) for f in files]
+        _, not_done = wait(futures, timeout=self.timeout)
+
+        uploaded = [] # (secure_url, public_id) in the order the files were given
+        errors = []
+        for f, future in zip(files, futures):
+            if future in not_done:
+                if not future.cancel(): # Already running: remove its asset once it lands
+                    future.add_done_callback(self._discard)
+                errors.append(f"{f.filename}: timed out after {self.timeout:g}s")
+                continue
+            error = future.exception()
+            if error is not None:
+                errors.append(f"{f.filename}: {error}")
+            else:
+                uploaded.append(future.result())
+
+        if errors:
+            for _, public_id in uploaded: # Partial failure: remove the assets that made it
+                try:
+                    self.uploader.delete(public_id)
+                except Exception as e:
+                    print("❌ Failed to clean up uploaded image:", public_id, e)
+            raise UploadError('; '.join(errors))
+        return [url for url, _ in uploaded]
+
+    def _discard(self, future): # Done callback for an upload that finished after its request gave up on it
+        if future.cancelled() or future.exception() is not None:
+            return
+        _, public_id = future.result()
+        try:
+            self.uploader.delete(public_id)
+        except Exception as e:
+            print("❌ Failed to clean up uploaded image:", public_id, e)
+
+image_uploads = ImageUploadPool()
+
+def init_app(app):
+    if app.config.get('IMAGE_UPLOADER', 'cloudinary') == 'fake':
+        image_uploads.uploader = FakeUploader(latency=float(app.config.get('FAKE_UPLOAD_LATENCY', 0.0)))
+    else:
+        image_uploads.uploader = CloudinaryUploader(
+            app.config['CLOUDINARY_CLOUD_NAME'],
+            app.config['CLOUDINARY_API_KEY'],
+            app.config['CLOUDINARY_API_SECRET']
+        )
+    image_uploads.workers = int(app.config.get('UPLOAD_WORKERS', 8))
+    image_uploads.timeout = float(app.config.get('UPLOAD_TIMEOUT_SECONDS', 60))
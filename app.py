@@ -1,50 +1,114 @@
-import os 
+import os
+import threading
 from flask import Flask
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager 
-from flask_pymongo import PyMongo 
-from config import Config  
-import sib_api_v3_sdk
-from sib_api_v3_sdk.rest import ApiException
+from flask_jwt_extended import JWTManager
+from flask_pymongo import PyMongo
+from config import Config
 from flask import send_from_directory
-from dotenv import load_dotenv
-load_dotenv()
 
 # Importing blueprints for different routes
-from auth.routes import auth as auth_bp 
+from auth.routes import auth as auth_bp
 from hotels.routes import room_bp
 from bookings.routes import booking_bp
 from payments.routes import payment_bp
 from userProfile.routes import profile_bp
 from admin.routes import admin_bp
 from chatbot.routes import chatbot_bp
+from chatbot import routes as chatbot
 from feedback.routes import feedback_bp
+from observability.routes import metrics_bp
+from observability import metrics
+from database import indexes
+from hotels import names
+from utils import response_cache, json_provider, compression
+from auth import hashing, identity
+from admin import uploads, transfer
+from payments import gateway
+from notifications import outbox
+from bookings import pricing, holds
 
-app = Flask(__name__)
-app.config.from_object(Config)
-print("Mongo DB Connected Successfully")
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
 
+_started_pid = None # Process that last ran start_services
+_start_lock = threading.Lock()
 
-CORS(app, origins=["https://easystay-admin.vercel.app", "https://easystay-snowy.vercel.app", "http://localhost:4200"], supports_credentials = True)
-jwt = JWTManager(app)
-mongo = PyMongo(app)
-app.mongo = mongo
+def start_services(app): # Per-process start-up: index creation and background threads. Runs once in each worker, after the fork
+    global _started_pid
+    if _started_pid == os.getpid(): # Already started in this process
+        return
+    with _start_lock:
+        if _started_pid == os.getpid():
+            return
+        metrics.start(app) # Publish this worker's metrics for multi-worker scrapes
+        indexes.start(app) # Create the indexes every route relies on
+        names.start(app) # Give rooms written before hotelNameKey existed their lookup keys
+        response_cache.start(app) # Cross-worker invalidation watcher, when enabled
+        outbox.start(app) # Start the background email senders
+        holds.start(app) # Start the expired hold sweeper
+        _started_pid = os.getpid()
 
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
+def create_app(config_object=Config):
+    # Building the app does no network I/O and starts no threads, so gunicorn can preload it in the master and fork
+    # workers cheaply. SDK clients (Gemini, Razorpay, Brevo, Cloudinary) are created on first use.
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+
+    CORS(app, origins=["https://easystay-admin.vercel.app", "https://easystay-snowy.vercel.app", "http://localhost:4200"], supports_credentials = True)
+    JWTManager(app)
+    mongo = PyMongo( # One client and connection pool per process, shared by every blueprint through app.mongo
+        app,
+        connect=False, # Connect on first use, so a client built before gunicorn forks holds no sockets
+        maxPoolSize=app.config['MONGO_MAX_POOL_SIZE'],
+        minPoolSize=app.config['MONGO_MIN_POOL_SIZE'],
+        maxIdleTimeMS=app.config['MONGO_MAX_IDLE_TIME_MS'],
+        connectTimeoutMS=app.config['MONGO_CONNECT_TIMEOUT_MS'],
+        serverSelectionTimeoutMS=app.config['MONGO_SERVER_SELECTION_TIMEOUT_MS'],
+        socketTimeoutMS=app.config['MONGO_SOCKET_TIMEOUT_MS'],
+        waitQueueTimeoutMS=app.config['MONGO_WAIT_QUEUE_TIMEOUT_MS'],
+        event_listeners=[metrics.command_listener] # Attribute MongoDB commands to requests
+    )
+    app.mongo = mongo
+    json_provider.init_app(app) # After PyMongo, whose init_app installs its own BSON provider; encodes ObjectId, datetime and Decimal128 directly
+    metrics.init_app(app) # Per-request latency, size and MongoDB command metrics
+    compression.init_app(app) # gzip/br/zstd negotiation; registered after metrics so sizes are measured on the wire
+
+    indexes.init_app(app) # Index and query plan CLI commands
+    names.init_app(app) # Hotel name autocomplete index and backfill command
+    response_cache.init_app(app) # ETag-aware cache for the catalogue endpoints
+    hashing.init_app(app) # Bounded bcrypt pool and cost factor
+    identity.init_app(app) # Per-worker cache of user records for authenticated routes
+    uploads.init_app(app) # Cloudinary uploader, or the offline fake, and the upload pool size
+    transfer.init_app(app) # export-collection and import-collection CLI commands
+    gateway.init_app(app) # Razorpay gateway, or the offline stub
+    outbox.init_app(app) # Background email sender pool
+    pricing.init_app(app) # Weekend and seasonal multipliers for quotes
+    holds.init_app(app) # Hold expiry settings and sweeper CLI commands
+    chatbot.init_app(app) # Intent cache size and TTL
+
+    # Registering the blueprint
+    app.register_blueprint(auth_bp, url_prefix='/auth')
+    app.register_blueprint(room_bp)
+    app.register_blueprint(booking_bp)
+    app.register_blueprint(payment_bp)
+    app.register_blueprint(profile_bp)
+    app.register_blueprint(admin_bp)
+    app.register_blueprint(chatbot_bp)
+    app.register_blueprint(feedback_bp)
+    app.register_blueprint(metrics_bp)
+
+    @app.before_request
+    def ensure_started(): # Fallback for servers without gunicorn's post_worker_init hook (flask run, uvicorn)
+        start_services(app)
+
+    @app.route('/')
+    def index():
+        return "Welcome to EasyStay"
 
-# Registering the blueprint
-app.register_blueprint(auth_bp, url_prefix='/auth')
-app.register_blueprint(room_bp)
-app.register_blueprint(booking_bp)
-app.register_blueprint(payment_bp)
-app.register_blueprint(profile_bp)
-app.register_blueprint(admin_bp)
-app.register_blueprint(chatbot_bp)
-app.register_blueprint(feedback_bp)
+    return app
 
-@app.route('/')
-def index():
-    return "Welcome to EasyStay"
+app = create_app() # `gunicorn app:app` and asgi.py import this instance
 
 if __name__ == "__main__":
+    start_services(app)
     app.run(debug = True, port = 5000, host = '0.0.0.0')
@@ -0,0 +1,8 @@
+# ASGI entry point for the async deployment mode, e.g.
+#   gunicorn -c gunicorn.conf.py asgi:asgi_app   with WORKER_MODE=asgi (uvicorn workers)
+#   uvicorn asgi:asgi_app --workers 2
+# The Flask app is unchanged; async views such as /book-room run their independent I/O concurrently either way.
+from asgiref.wsgi import WsgiToAsgi
+from app import app
+
+asgi_app = WsgiToAsgi(app)
@@ -0,0 +1,105 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import bcrypt
+from observability.metrics import registry
+
+# Password hashing off the request thread. bcrypt releases the GIL while it works, so a small dedicated thread pool
+# runs hashes in parallel without pinning every request worker. Admission control caps how many hashes may be
+# queued or running; past that, callers get HashingBusy straight away and the route answers 503 instead of
+# letting a login spike stall the rest of the API. A hash that does not finish within the timeout raises HashingBusy too.
+
+class HashingBusy(Exception): # Raised when the hashing queue is full or a hash timed out
+    pass
+
+def hash_rounds(hashed): # Cost factor encoded in a bcrypt hash such as $2b$12$...
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+class PasswordHasher:
+    def __init__(self, rounds=12, workers=4, max_pending=32, timeout=10.0):
+        self.rounds = rounds # bcrypt cost factor for new hashes
+        self.workers = workers
+        self.max_pending = max_pending # Hashes allowed to be queued or running at once
+        self.timeout = timeout # Seconds a request waits for its hash
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.rehashed = 0
+
+    def configure(self, rounds, workers, max_pending, timeout):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self.rounds = rounds
+            self.workers = workers
+            self.max_pending = max_pending
+            self.timeout = timeout
+            self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _pool(self): # Created on first use so forked workers each get their own threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+            return self._executor
+
+    def _submit(self, fn, *args):
+        slots = self._slots
+        if not slots.acquire(blocking=False): # Queue is full, fail fast
+            self.rejected += 1
+            raise HashingBusy()
+        try:
+            future = self._pool().submit(fn, *args)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    def _result(self, future):
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout: # Not the builtin TimeoutError before Python 3.11
+            raise HashingBusy()
+
+    def generate_password_hash(self, password):
+        future = self._submit(lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds)).decode('utf-8'))
+        return self._result(future)
+
+    def check_password_hash(self, hashed, password):
+        future = self._submit(lambda: bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8')))
+        return self._result(future)
+
+    def needs_rehash(self, hashed): # True when the stored hash was made with a different cost factor
+        return hash_rounds(hashed) != self.rounds
+
+    def rehash_in_background(self, users, user_id, old_hash, password): # Upgrade a hash after a successful login without delaying it
+        def rehash():
+            new_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds)).decode('utf-8')
+            result = users.update_one({'_id': user_id, 'password': old_hash}, {'$set': {'password': new_hash}}) # Skip it if the password changed meanwhile
+            self.rehashed += result.modified_count
+        try:
+            self._submit(rehash)
+        except HashingBusy:
+            pass # Not urgent; the next login will try again
+
+    def stats(self):
+        return {'rounds': self.rounds, 'workers': self.workers, 'max_pending': self.max_pending,
+                'rejected': self.rejected, 'rehashed': self.rehashed}
+
+password_hasher = PasswordHasher()
+
+def init_app(app):
+    registry.register_collector(lambda: {
+        'password_hash_rejected': ('Hashes refused because the hashing queue was full', {(): password_hasher.rejected}),
+        'password_hash_upgraded': ('Stored hashes upgraded to the configured cost at login', {(): password_hasher.rehashed})
+    })
+    password_hasher.configure(
+        rounds=int(app.config.get('BCRYPT_LOG_ROUNDS', 12)),
+        workers=int(app.config.get('HASH_WORKERS', 4)),
+        max_pending=int(app.config.get('HASH_MAX_PENDING', 32)),
+        timeout=float(app.config.get('HASH_TIMEOUT_SECONDS', 10))
+    )
@@ -0,0 +1,72 @@
+from functools import wraps
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import current_app, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from observability.metrics import registry
+from utils.cache import TTLCache
+
+# Per-process cache of user records keyed by the JWT identity. Records are projected without the password hash,
+# so what is cached is safe to hand to any route. The profile routes of this process invalidate an entry when
+# they change it; the short TTL bounds how long another worker can serve a record that changed elsewhere.
+
+USER_PROJECTION = {'password': 0} # Never cache or return the password hash
+
+class IdentityCache:
+    def __init__(self, maxsize=10000, ttl=60.0):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def configure(self, maxsize, ttl):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get_user(self, db, user_id): # The user's record without the password, or None; raises InvalidId for a malformed id
+        user_id = str(user_id)
+        user = self.cache.get(user_id)
+        if user is None:
+            user = db.users.find_one({'_id': ObjectId(user_id)}, USER_PROJECTION)
+            if user is None: # Unknown users are not cached, so a fresh signup is seen straight away
+                return None
+            self.cache.set(user_id, user)
+        return dict(user) # Callers may modify their copy
+
+    def invalidate(self, user_id):
+        self.cache.pop(str(user_id))
+
+    def stats(self):
+        return self.cache.stats()
+
+identity_cache = IdentityCache()
+
+def admin_required(view): # jwt_required, and the signed-in account's email must be listed in ADMIN_EMAILS
+    @wraps(view)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        try:
+            user = identity_cache.get_user(current_app.mongo.db, get_jwt_identity())
+        except InvalidId:
+            user = None
+        if user is None or (user.get('email') or '').lower() not in current_app.config['ADMIN_EMAIL_SET']:
+            return jsonify({'error': 'Admin access required'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+def identity_metrics(): # Identity cache gauges for /metrics
+    stats = identity_cache.stats()
+    return {
+        'identity_cache_entries': ('User records held by the identity cache', {(): stats['size']}),
+        'identity_cache_lookups': ('Identity cache lookups by result', {
+            (('result', 'hit'),): stats['hits'],
+            (('result', 'miss'),): stats['misses']
+        }),
+        'identity_cache_hit_rate': ('Fraction of identity lookups answered from the cache', {(): stats['hit_rate']})
+    }
+
+def init_app(app):
+    identity_cache.configure(
+        maxsize=int(app.config.get('IDENTITY_CACHE_SIZE', 10000)),
+        ttl=float(app.config.get('IDENTITY_CACHE_TTL_SECONDS', 60))
+    )
+    registry.register_collector(identity_metrics)
+    app.config['ADMIN_EMAIL_SET'] = frozenset(
+        email.strip().lower() for email in app.config.get('ADMIN_EMAILS', '').split(',') if email.strip()
+    )
@@ -1,12 +1,20 @@
 from flask import Blueprint, request, jsonify, current_app
-from flask_bcrypt import Bcrypt 
 from flask_jwt_extended import create_access_token
 from datetime import timedelta 
+from pymongo.errors import DuplicateKeyError
+from auth.hashing import password_hasher, HashingBusy
 
 auth = Blueprint('auth', __name__) #creating a blueprint for the auth routes
-bcrypt = Bcrypt() #to hash passwords
 mongo = None #to store the mongo instance
 
+def email_filter(email): #signup and login find users by email through the email_unique index
+    return {'email': email}
+
+def hashing_busy(): #fast 503 when the hashing pool is saturated, so clients back off instead of piling up
+    response = jsonify({'message': 'Server is busy, please try again shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth.route('/signup', methods=['POST'])
 def signup():
     mongo = current_app.mongo # get the mongo instance from the current app context
@@ -15,17 +23,23 @@ def signup():
     if not data.get('name') or not data.get('email') or not data.get('password') or not data.get('phone'):
         return jsonify({'message': 'Missing name or email or password or phone'}), 400 #implementing basic validation
 
-    if mongo.db.users.find_one({'email': data['email']}): #checking if the email is already exits in the database
+    if mongo.db.users.find_one(email_filter(data['email'])): #checking if the email is already exits in the database
         return jsonify({'message': 'Email already exists'}), 409 #if email already exists, it will return an error message
     
-    hashed_password = bcrypt.generate_password_hash(data['password']).decode('utf-8') #hashing the password using bcrypt
+    try:
+        hashed_password = password_hasher.generate_password_hash(data['password']) #hashing the password with bcrypt on the hashing pool
+    except HashingBusy: #queue full or the hash timed out
+        return hashing_busy()
 
-    result = mongo.db.users.insert_one({
-        'name': data['name'],
-        'email': data['email'],
-        'phone': data['phone'],
-        'password': hashed_password
-    }) #inserting into the users collection in the database
+    try:
+        result = mongo.db.users.insert_one({
+            'name': data['name'],
+            'email': data['email'],
+            'phone': data['phone'],
+            'password': hashed_password
+        }) #inserting into the users collection in the database
+    except DuplicateKeyError: #the unique index on email catches two signups racing for the same address
+        return jsonify({'message': 'Email already exists'}), 409
 
     user_id = result.inserted_id #getting the inserted user id
 
@@ -41,11 +55,16 @@ def login():
     if not data or not data.get('email') or not data.get('password'): #adding basic validation to check if the email and password is presnt in the request
         return jsonify({'message': 'Missing email or password'}), 400 #returning an error message if email or password is not present
 
-    user = mongo.db.users.find_one({ #checking if the user exists in the database
-        'email': data['email']
-    })
+    user = mongo.db.users.find_one(email_filter(data['email'])) #checking if the user exists in the database
+
+    try:
+        password_ok = bool(user) and password_hasher.check_password_hash(user['password'], data['password']) #checking the hashed password on the hashing pool
+    except HashingBusy: #queue full or the hash timed out
+        return hashing_busy()
 
-    if user and bcrypt.check_password_hash(user['password'], data['password']): #checking if the user exists and if the hashed password matches the password provided by the user
+    if password_ok: #checking if the user exists and if the hashed password matches the password provided by the user
+        if password_hasher.needs_rehash(user['password']): #upgrading hashes made with an older cost factor, after the response is decided
+            password_hasher.rehash_in_background(mongo.db.users, user['_id'], user['password'], data['password'])
         token = create_access_token(identity=str(user['_id']), expires_delta=timedelta(hours=12)) #if the user exists and the password matches it will create a jwt totken with the user identity and an expiry time of 12 hours 
         return jsonify({'token': token}), 200 #returning the json response with the token
     return jsonify({'message': "Invalid credentails"}), 401 #if the user does not exist or the password does not match, it will return an error message with a 401 status code 
\ No newline at end of file
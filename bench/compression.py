@@ -0,0 +1,48 @@
+"""Wire size and CPU cost of each response encoding on a /get-rooms sized listing.
+
+The listing is encoded once with the app's Mongo JSON provider, then compressed whole (how buffered and cached responses
+are sent) and streamed one room per chunk (how /get-rooms is sent) with every codec installed here.
+
+    python -m bench.compression --docs 2000 --repeat 10
+"""
+import argparse
+import time
+from bench.json_encoding import app_provider, make_docs
+from utils import compression
+
+def best_cpu(fn, repeat): # Lowest CPU time of `repeat` runs and the last result
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.thread_time()
+        result = fn()
+        best = min(best, time.thread_time() - started)
+    return best, result
+
+def streamed(codec, chunks):
+    return b''.join(compression.compress_stream(codec, chunks[0], iter(chunks[1:]), None))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--docs', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    provider = app_provider()
+    docs = make_docs(args.docs)
+    body = provider.dumps(docs).encode('utf-8')
+    chunks = [b'['] + [(',' if i else '').encode() + provider.dumps(doc).encode('utf-8') for i, doc in enumerate(docs)] + [b']']
+    codecs = compression.available_codecs({})
+    missing = {'br', 'zstd', 'gzip'} - {codec.name for codec in codecs}
+    if missing:
+        print(f"not installed, skipped: {', '.join(sorted(missing))}")
+
+    print(f"identity {len(body):>10} bytes")
+    for codec in codecs:
+        whole_cpu, whole = best_cpu(lambda: compression.compress_body(codec, body), args.repeat)
+        stream_cpu, stream = best_cpu(lambda: streamed(codec, chunks), args.repeat)
+        mb = len(body) / 1e6
+        print(f"{codec.name:<8} whole {len(whole):>10} bytes ({len(whole) / len(body):6.1%}) {whole_cpu * 1000 / mb:7.2f} ms CPU/MB"
+              f" | streamed {len(stream):>10} bytes ({len(stream) / len(body):6.1%}) {stream_cpu * 1000 / mb:7.2f} ms CPU/MB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Drain the email outbox through the stub transport and report throughput.
+
+Needs a local MongoDB (BENCH_MONGO_URI, default mongodb://localhost:27017/easystay_bench); nothing is sent to Brevo.
+
+    python -m bench.email_outbox --messages 2000 --workers 4 --latency 0.05 --failure-rate 0.1
+"""
+import argparse
+import time
+from pymongo import MongoClient
+from database.indexes import ensure_indexes
+from notifications import outbox
+from notifications.transports import StubTransport
+from bench.seed import BENCH_MONGO_URI, DROP_FLAG, check_bench_database
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.05, help='simulated provider round-trip in seconds')
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument(DROP_FLAG, dest='allow_drop', action='store_true', help='use a database not named *_bench')
+    args = parser.parse_args()
+
+    db = MongoClient(BENCH_MONGO_URI).get_default_database()
+    check_bench_database(db, args.allow_drop)
+    db[outbox.OUTBOX_COLLECTION].drop()
+    ensure_indexes(db)
+
+    started = time.perf_counter()
+    for i in range(args.messages):
+        outbox.enqueue(db, {'to_email': f"guest{i}@example.com", 'to_name': 'Guest', 'sender': {}, 'subject': 'bench', 'html': ''})
+    enqueue_seconds = time.perf_counter() - started
+
+    transport = StubTransport(latency=args.latency, failure_rate=args.failure_rate)
+    pool = outbox.OutboxWorkerPool(db, transport, workers=args.workers, batch_size=args.batch_size,
+                                   backoff_seconds=0.01, poll_seconds=0.05)
+    started = time.perf_counter()
+    pool.start()
+    while db[outbox.OUTBOX_COLLECTION].count_documents({'status': {'$in': ['pending', 'sending']}}):
+        time.sleep(0.05)
+    drain_seconds = time.perf_counter() - started
+    pool.stop()
+
+    print(f"enqueue: {args.messages / enqueue_seconds:.0f} msg/s ({enqueue_seconds * 1000 / args.messages:.2f} ms per booking)")
+    print(f"drain:   {args.messages / drain_seconds:.0f} msg/s with {args.workers} workers")
+    print(f"stats:   {pool.stats}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Compare sequential and concurrent /add-hotels style uploads using the fake uploader.
+
+    python -m bench.image_uploads --requests 50 --latency 0.2 --size-kb 800 --workers 8
+"""
+import argparse
+import io
+import time
+from types import SimpleNamespace
+from admin.uploads import FakeUploader, ImageUploadPool
+
+def make_files(count, size_kb): # Four images per request, like the admin form
+    return [SimpleNamespace(stream=io.BytesIO(b'\0' * size_kb * 1024), filename=f"image{i}.jpg") for i in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.2, help='simulated Cloudinary round-trip per image')
+    parser.add_argument('--size-kb', type=int, default=800)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+    uploader = FakeUploader(latency=args.latency)
+
+    started = time.perf_counter()
+    for _ in range(args.requests):
+        for f in make_files(4, args.size_kb):
+            uploader.upload(f.stream, f.filename, 'hotel_images')
+    sequential = (time.perf_counter() - started) / args.requests
+
+    pool = ImageUploadPool(uploader, workers=args.workers)
+    started = time.perf_counter()
+    for _ in range(args.requests):
+        pool.upload_all(make_files(4, args.size_kb), 'hotel_images')
+    concurrent = (time.perf_counter() - started) / args.requests
+
+    print(f"sequential: {sequential * 1000:8.1f} ms per request")
+    print(f"concurrent: {concurrent * 1000:8.1f} ms per request ({sequential / concurrent:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Encoding time for large listings: hand conversion + Flask's default provider vs the Mongo JSON provider.
+
+Documents are shaped like /get-rooms and /get-bookings rows, with ObjectIds and datetimes as pymongo returns them.
+The Mongo provider is the one create_app() installs as app.json, so the run measures what the routes really send.
+
+    python -m bench.json_encoding --docs 5000 --repeat 20
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from utils import json_provider
+
+def make_docs(count):
+    rng = random.Random(5)
+    now = datetime.utcnow().replace(microsecond=0)
+    return [{
+        '_id': ObjectId(),
+        'room_id': ObjectId(),
+        'hotelName': f"Grand Palace {i}",
+        'streetAddress': f"{rng.randint(1, 400)} Main Road",
+        'roomType': rng.choice(['Single Bed', 'Double Bed', 'Suite']),
+        'pricePerNight': rng.randrange(800, 15000, 50),
+        'amenities': rng.sample(['Wi-Fi', 'AC', 'TV', 'Breakfast', 'Parking', 'Pool'], 4),
+        'images': [f"https://res.cloudinary.com/easystay/image/upload/v1/{ObjectId()}.jpg" for _ in range(4)],
+        'check_in': now + timedelta(days=i % 300),
+        'check_out': now + timedelta(days=i % 300 + 2),
+        'created_at': now - timedelta(minutes=i),
+    } for i in range(count)]
+
+def app_provider(): # app.json of the real app, after every extension has run its init_app
+    from bench.loadtest import stub_environment
+    stub_environment(os.environ) # Must be set before the app module is imported
+    from app import create_app
+    provider = create_app().json
+    if not isinstance(provider, json_provider.MongoJSONProvider):
+        raise SystemExit(f"app.json is {type(provider).__name__}, not MongoJSONProvider")
+    return provider
+
+def hand_converted(docs): # What the routes did before: copy every document and stringify ids and dates
+    return [dict(doc, _id=str(doc['_id']), room_id=str(doc['room_id']),
+                 check_in=doc['check_in'].strftime('%Y-%m-%d'), check_out=doc['check_out'].strftime('%Y-%m-%d'),
+                 created_at=doc['created_at'].strftime('%Y-%m-%d %H:%M:%S')) for doc in docs]
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--docs', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    default = DefaultJSONProvider(app)
+    provider = app_provider()
+    docs = make_docs(args.docs)
+
+    results = {'convert + default provider': timed(lambda: default.dumps(hand_converted(docs)), args.repeat)}
+    orjson = json_provider.orjson
+    json_provider.orjson = None
+    results['mongo provider (stdlib)'] = timed(lambda: provider.dumps(docs), args.repeat)
+    json_provider.orjson = orjson
+    if orjson is not None:
+        results['mongo provider (orjson)'] = timed(lambda: provider.dumps(docs), args.repeat)
+    else:
+        print('orjson is not installed, skipping the orjson run')
+
+    baseline = results['convert + default provider']
+    for name, seconds in results.items():
+        print(f"{name:<28} {seconds * 1000:8.2f} ms for {args.docs} docs ({baseline / seconds:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""Offline load test for every blueprint.
+
+Starts the Flask app from app.py in-process against a local MongoDB (BENCH_MONGO_URI), with Brevo, Razorpay,
+Cloudinary and Gemini replaced by their stubs. The database is seeded, then each scenario is driven at the configured
+concurrency and a per-endpoint report of throughput, p50/p95/p99 latency and MongoDB commands per request is printed.
+Reports saved with --output can be compared across commits with --compare.
+
+    python -m bench.loadtest --requests 300 --concurrency 8 --output before.json
+    python -m bench.loadtest --requests 300 --concurrency 8 --compare before.json
+    python -m bench.loadtest --only get-rooms chat --requests 1000
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from bench.seed import BENCH_MONGO_URI, DROP_FLAG
+
+STUB_ENVIRONMENT = {
+    'MONGO_URI': BENCH_MONGO_URI, # Always set, never inherited: seeding drops collections
+    'SECRET_KEY': 'benchmark-secret',
+    'EMAIL_TRANSPORT': 'stub',
+    'EMAIL_OUTBOX_WORKERS': '1',
+    'PAYMENT_GATEWAY': 'stub',
+    'IMAGE_UPLOADER': 'fake',
+    'CHAT_LLM': 'stub',
+    'BCRYPT_LOG_ROUNDS': '4',
+}
+
+def stub_environment(environ): # Stub settings over `environ`; MONGO_URI is forced so an exported one is never used
+    for key, value in STUB_ENVIRONMENT.items():
+        environ.setdefault(key, value)
+    environ['MONGO_URI'] = STUB_ENVIRONMENT['MONGO_URI']
+    return environ
+
+def mongo_commands_seen(): # (commands, requests) attributed so far by the app's per-request metrics
+    from observability import metrics
+    commands = requests = 0
+    for _, series in metrics.mongo_per_request.snapshot(): # series ends with [sum, count]
+        commands += series[-2]
+        requests += series[-1]
+    return commands, requests
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+def build_scenarios(data):
+    """Each scenario returns (method, path, kwargs for the test client, user index or None for anonymous)."""
+    rng = random.Random(7)
+    room_ids = data['room_ids']
+    users = data['users']
+    hotel_names = data['hotel_names']
+    chat_messages = ['hi', 'thanks', 'hotels under 3000', 'show hotels in goa under 5000',
+                     'does {hotel} have wifi', 'what amenities does {hotel} offer']
+
+    def future_stay(): # Far-future dates so booking scenarios rarely collide
+        check_in = date(2030, 1, 1) + timedelta(days=rng.randint(0, 3650))
+        return check_in.isoformat(), (check_in + timedelta(days=rng.randint(1, 4))).isoformat()
+
+    def book_room():
+        check_in, check_out = future_stay()
+        return 'POST', '/book-room', {'json': {'room_id': rng.choice(room_ids), 'check_in': check_in, 'check_out': check_out,
+                                               'guest_count': 2, 'totalAmount': 5000}}, rng.randrange(len(users))
+
+    def calculate_booking():
+        check_in, check_out = future_stay()
+        return 'POST', '/calculate-booking', {'json': {'room_id': rng.choice(room_ids), 'roomType': 'Suite', 'guest_count': 3,
+                                                       'check_in': check_in, 'check_out': check_out}}, rng.randrange(len(users))
+
+    def calculate_booking_batch(): # The search page's shape: many rooms across a few date ranges
+        stays = [future_stay() for _ in range(3)]
+        quotes = [{'room_id': room_id, 'roomType': 'Suite', 'guest_count': 3, 'check_in': check_in, 'check_out': check_out}
+                  for room_id in rng.sample(room_ids, 20) for check_in, check_out in stays]
+        return 'POST', '/calculate-booking/batch', {'json': {'quotes': quotes}}, rng.randrange(len(users))
+
+    def chat():
+        message = rng.choice(chat_messages).format(hotel=rng.choice(hotel_names))
+        return 'POST', '/chat', {'json': {'message': message}}, rng.randrange(len(users))
+
+    def login():
+        user = rng.choice(users)
+        return 'POST', '/auth/login', {'json': {'email': user['email'], 'password': data['password']}}, None
+
+    def create_order():
+        return 'POST', '/api/create-order', {'json': {'amount': rng.randint(1000, 9000), 'room_id': rng.choice(room_ids)}}, rng.randrange(len(users))
+
+    def add_feedback():
+        return 'POST', '/add-feedback', {'json': {'hotel_id': rng.choice(room_ids), 'rating': rng.randint(1, 5), 'comment': 'bench'}}, rng.randrange(len(users))
+
+    return {
+        'get-rooms': lambda: ('GET', '/get-rooms?limit=50', {}, None),
+        'get-rooms-filtered': lambda: ('GET', f"/get-rooms?roomType=Suite&maxPrice={rng.randrange(2000, 15000, 500)}&amenities=Wi-Fi&limit=50", {}, None),
+        'hotels-listing': lambda: ('GET', '/hotels-listing', {}, None),
+        'search': lambda: ('GET', f"/search?city={rng.choice(['Goa', 'Mumbai', 'Delhi'])}&maxPrice={rng.randrange(3000, 15000, 500)}&amenities=Wi-Fi", {}, None),
+        'autocomplete': lambda: ('GET', f"/hotels/autocomplete?q={rng.choice(hotel_names)[:3]}", {}, None),
+        'top-rated': lambda: ('GET', '/hotels/top-rated?limit=10', {}, None),
+        'calculate-booking': calculate_booking,
+        'calculate-booking-batch': calculate_booking_batch,
+        'book-room': book_room,
+        'get-bookings': lambda: ('GET', '/get-bookings', {}, rng.randrange(len(users))),
+        'get-bookings-past': lambda: ('GET', '/get-bookings?section=past&limit=20', {}, rng.randrange(len(users))),
+        'dashboard': lambda: ('GET', '/dashboard', {}, None),
+        'dashboard-page': lambda: ('GET', '/dashboard?limit=50', {}, None),
+        'booking-summary': lambda: ('GET', '/booking-summary', {}, None),
+        'chat': chat,
+        'auth-login': login,
+        'create-order': create_order,
+        'get-feedback': lambda: ('GET', f"/get-feedback/{rng.choice(room_ids)}", {}, rng.randrange(len(users))),
+        'add-feedback': add_feedback,
+        'get-profile': lambda: ('GET', '/get-profile', {}, rng.randrange(len(users))),
+    }
+
+def run_scenario(app, scenario, tokens, requests, concurrency):
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    local = threading.local()
+
+    def one(_):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        method, path, kwargs, user_index = scenario()
+        if user_index is not None:
+            kwargs.setdefault('headers', {})['Authorization'] = f"Bearer {tokens[user_index]}"
+        started = time.perf_counter()
+        response = client.open(path, method=method, **kwargs)
+        response.get_data() # Drain streamed bodies so their cost is measured
+        response.close() # Streamed responses record their metrics on close
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    # Commands are counted by the metrics listener through the request's contextvar, which follows the request into
+    # asgiref and asyncio.to_thread worker threads (/book-room); background senders and sweepers are not counted
+    commands_before, requests_before = mongo_commands_seen()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+    commands_after, requests_after = mongo_commands_seen()
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'throughput_rps': round(requests / wall, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'mongo_ops_per_request': round((commands_after - commands_before) / max(requests_after - requests_before, 1), 2),
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+def print_report(report, baseline=None):
+    header = f"{'endpoint':<20} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mongo/req':>10}  statuses"
+    print(header)
+    print('-' * len(header))
+    for name, row in report['endpoints'].items():
+        line = (f"{name:<20} {row['throughput_rps']:>9} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} "
+                f"{row['mongo_ops_per_request']:>10}  {row['statuses']}")
+        before = (baseline or {}).get('endpoints', {}).get(name)
+        if before:
+            change = (row['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0.0
+            line += f"  p95 {change:+.1f}% vs baseline, mongo/req {before['mongo_ops_per_request']} -> {row['mongo_ops_per_request']}"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--only', nargs='*', help='run only these scenarios')
+    parser.add_argument('--rooms', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--bookings', type=int, default=20000)
+    parser.add_argument('--feedback', type=int, default=10000)
+    parser.add_argument('--output', help='write the JSON report here')
+    parser.add_argument('--compare', help='JSON report of a previous run to compare against')
+    parser.add_argument(DROP_FLAG, dest='allow_drop', action='store_true', help='seed a database not named *_bench')
+    args = parser.parse_args()
+
+    stub_environment(os.environ) # Must be set before the app module is imported
+
+    from app import app # Imported late so the stub environment is in place
+    from flask_jwt_extended import create_access_token
+    from bench.seed import seed
+    from database.indexes import ensure_indexes
+
+    started = time.perf_counter()
+    data = seed(app.mongo.db, rooms=args.rooms, users=args.users, bookings=args.bookings, feedback=args.feedback,
+                allow_drop=args.allow_drop)
+    ensure_indexes(app.mongo.db) # Seeding drops the collections, and their indexes with them
+    print(f"seeded in {time.perf_counter() - started:.1f}s: {args.rooms} rooms, {args.users} users, "
+          f"{args.bookings} bookings, {args.feedback} feedback")
+
+    with app.app_context():
+        tokens = [create_access_token(identity=user['id']) for user in data['users']]
+
+    scenarios = build_scenarios(data)
+    selected = args.only or list(scenarios)
+    report = {'config': vars(args), 'endpoints': {}}
+    for name in selected:
+        report['endpoints'][name] = run_scenario(app, scenarios[name], tokens, args.requests, args.concurrency)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Measure password check throughput through the hashing pool at several bcrypt cost factors.
+
+Runs without MongoDB; it exercises the same PasswordHasher the /auth routes use.
+
+    python -m bench.login_hashing --rounds 10 11 12 13 --workers 4 --clients 16 --logins 200
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from auth.hashing import PasswordHasher, HashingBusy
+
+def run(rounds, workers, clients, logins, max_pending):
+    hasher = PasswordHasher(rounds=rounds, workers=workers, max_pending=max_pending)
+    hashed = bcrypt.hashpw(b'correct horse', bcrypt.gensalt(rounds)).decode('utf-8')
+    rejected = 0
+    latencies = []
+
+    def login(_):
+        started = time.perf_counter()
+        try:
+            hasher.check_password_hash(hashed, 'correct horse')
+        except HashingBusy:
+            return None
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool: # Simulated request workers
+        for latency in pool.map(login, range(logins)):
+            if latency is None:
+                rejected += 1
+            else:
+                latencies.append(latency)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    print(f"cost {rounds:>2}: {len(latencies) / elapsed:8.1f} logins/s  p95 {p95 * 1000:8.1f} ms  rejected {rejected}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 11, 12, 13])
+    parser.add_argument('--workers', type=int, default=4, help='hashing pool size')
+    parser.add_argument('--clients', type=int, default=16, help='concurrent simulated logins')
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--max-pending', type=int, default=32)
+    args = parser.parse_args()
+    for rounds in args.rounds:
+        run(rounds, args.workers, args.clients, args.logins, args.max_pending)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Retry storms against /api/create-order with the stub Razorpay gateway.
+
+Each storm fires the same create-order request --retries times at once for one user, the way double clicks and
+client retries do. The report compares requests sent with the Razorpay calls actually made and the orders stored.
+
+    python -m bench.order_retries --storms 200 --retries 5 --latency 0.3
+    python -m bench.order_retries --storms 200 --retries 5 --client-keys   # send an Idempotency-Key header
+"""
+import argparse
+import os
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from bench.loadtest import stub_environment
+from bench.seed import DROP_FLAG
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--storms', type=int, default=200)
+    parser.add_argument('--retries', type=int, default=5, help='identical requests per storm, sent concurrently')
+    parser.add_argument('--latency', type=float, default=0.3, help='simulated Razorpay round-trip in seconds')
+    parser.add_argument('--client-keys', action='store_true', help='send an Idempotency-Key header instead of relying on the derived key')
+    parser.add_argument(DROP_FLAG, dest='allow_drop', action='store_true', help='seed a database not named *_bench')
+    args = parser.parse_args()
+
+    stub_environment(os.environ) # Must be set before the app module is imported
+    os.environ['PAYMENT_STUB_LATENCY'] = str(args.latency)
+
+    from app import app, start_services
+    from flask_jwt_extended import create_access_token
+    from bench.seed import seed
+
+    data = seed(app.mongo.db, rooms=200, users=100, bookings=0, feedback=0, allow_drop=args.allow_drop)
+    start_services(app) # Indexes, including the unique idempotency key
+    with app.app_context():
+        tokens = [create_access_token(identity=user['id']) for user in data['users']]
+
+    rng = random.Random(11)
+    statuses = {}
+    replayed = 0
+
+    def storm(_):
+        nonlocal replayed
+        headers = {'Authorization': f"Bearer {rng.choice(tokens)}"}
+        if args.client_keys:
+            headers['Idempotency-Key'] = uuid.uuid4().hex
+        payload = {'amount': rng.randint(1000, 9000), 'room_id': rng.choice(data['room_ids'])}
+        with ThreadPoolExecutor(max_workers=args.retries) as retries:
+            responses = list(retries.map(lambda _: app.test_client().post('/api/create-order', json=payload, headers=headers), range(args.retries)))
+        for response in responses:
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            replayed += response.headers.get('Idempotent-Replayed') == 'true'
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(storm, range(args.storms)))
+    elapsed = time.perf_counter() - started
+
+    requests = args.storms * args.retries
+    calls = app.payment_gateway.calls
+    print(f"{requests} requests in {elapsed:.1f}s, statuses {statuses}")
+    print(f"Razorpay calls: {calls} ({requests - calls} saved, {replayed} replayed from MongoDB)")
+    print(f"orders stored: {app.mongo.db.orders.count_documents({})}")
+
+if __name__ == '__main__':
+    main()
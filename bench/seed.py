@@ -0,0 +1,113 @@
+"""Seed a benchmark database with realistic volumes of rooms, users, bookings and feedback.
+
+Seeding drops collections, so the harnesses never use MONGO_URI: they connect to BENCH_MONGO_URI (default
+mongodb://localhost:27017/easystay_bench), and seed() refuses any database whose name does not end in _bench
+unless --i-know-this-drops-data is passed.
+"""
+import os
+import random
+from datetime import datetime, timedelta
+import bcrypt
+from bson import ObjectId
+from pymongo import UpdateOne
+from hotels.names import normalize_name
+
+ROOM_TYPES = ['Single Bed', 'Double Bed', 'Suite']
+AMENITIES = ['Wi-Fi', 'AC', 'TV', 'Breakfast', 'Parking', 'Pool', 'Gym', 'Spa']
+CITIES = ['Hyderabad', 'Bengaluru', 'Chennai', 'Mumbai', 'Goa', 'Delhi', 'Jaipur', 'Kochi']
+NAME_PARTS = ['Grand', 'Royal', 'Palm', 'Sea', 'City', 'Lotus', 'Heritage', 'Silver', 'Sun', 'Orchid']
+NAME_SUFFIXES = ['Palace', 'Residency', 'Inn', 'Suites', 'Retreat', 'Towers', 'Stay', 'Plaza']
+PASSWORD = 'benchmark-password'
+BENCH_MONGO_URI = os.getenv('BENCH_MONGO_URI', 'mongodb://localhost:27017/easystay_bench')
+DROP_FLAG = '--i-know-this-drops-data'
+
+def check_bench_database(db, allow_drop=False): # Stop before dropping anything outside a dedicated bench database
+    if not db.name.endswith('_bench') and not allow_drop:
+        raise SystemExit(f"Refusing to drop collections in '{db.name}': use a database whose name ends in _bench "
+                         f"(BENCH_MONGO_URI) or pass {DROP_FLAG}")
+
+def seed(db, rooms=2000, users=500, bookings=20000, feedback=10000, bcrypt_rounds=4, seed_value=42, allow_drop=False):
+    """Drop and refill the collections the routes read. Returns the ids the scenarios need."""
+    check_bench_database(db, allow_drop)
+    rng = random.Random(seed_value)
+    for collection in ('rooms', 'users', 'bookings', 'feedback', 'orders', 'room_calendar', 'email_outbox'):
+        db[collection].drop()
+
+    room_docs = []
+    for i in range(rooms):
+        hotel_name = f"{rng.choice(NAME_PARTS)} {rng.choice(NAME_SUFFIXES)} {i // 3}"
+        city = rng.choice(CITIES)
+        room_docs.append({
+            '_id': ObjectId(),
+            'hotelName': hotel_name,
+            'hotelNameKey': normalize_name(hotel_name),
+            'streetAddress': f"{rng.randint(1, 400)} Main Road",
+            'city': city,
+            'cityKey': normalize_name(city),
+            'roomType': rng.choice(ROOM_TYPES),
+            'pricePerNight': rng.randrange(800, 15000, 50),
+            'amenities': rng.sample(AMENITIES, rng.randint(2, 6)),
+            'images': [f"https://res.cloudinary.com/easystay/image/upload/v1/hotel_images/{ObjectId()}.jpg" for _ in range(4)],
+            'isAvailable': True,
+        })
+    db.rooms.insert_many(room_docs)
+
+    password_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(bcrypt_rounds)).decode('utf-8') # Low cost keeps seeding fast; /auth/login is benchmarked separately per cost
+    user_docs = [{
+        '_id': ObjectId(),
+        'name': f"Guest {i}",
+        'email': f"guest{i}@example.com",
+        'phone': f"9{i:09d}",
+        'password': password_hash,
+    } for i in range(users)]
+    db.users.insert_many(user_docs)
+
+    now = datetime.utcnow()
+    booking_docs = []
+    for _ in range(bookings):
+        room = rng.choice(room_docs)
+        check_in = (now + timedelta(days=rng.randint(-365, 365))).replace(hour=0, minute=0, second=0, microsecond=0)
+        nights = rng.randint(1, 7)
+        booking_docs.append({
+            'user': str(rng.choice(user_docs)['_id']),
+            'room_id': room['_id'],
+            'pricePerNight': room['pricePerNight'],
+            'image': room['images'][0],
+            'name': room['hotelName'],
+            'address': room['streetAddress'],
+            'guest_count': rng.randint(1, 4),
+            'check_in': check_in,
+            'check_out': check_in + timedelta(days=nights),
+            'status': rng.choice(['pending', 'Paid', 'Paid', 'Cancelled']),
+            'created_at': check_in - timedelta(days=rng.randint(1, 60)),
+            'total_amount': room['pricePerNight'] * nights,
+        })
+    db.bookings.insert_many(booking_docs)
+
+    feedback_docs = [{
+        'hotel_id': rng.choice(room_docs)['_id'],
+        'user_id': rng.choice(user_docs)['_id'],
+        'rating': rng.randint(1, 5),
+        'comment': 'Lovely stay, would come again.',
+        'timeStamp': now - timedelta(minutes=i),
+    } for i in range(feedback)]
+    db.feedback.insert_many(feedback_docs)
+
+    summaries = {} # Same aggregate create_feedback maintains, so /hotels/top-rated has data
+    for doc in feedback_docs:
+        summary = summaries.setdefault(doc['hotel_id'], {'count': 0, 'sum': 0, 'histogram': {}})
+        summary['count'] += 1
+        summary['sum'] += doc['rating']
+        summary['histogram'][str(doc['rating'])] = summary['histogram'].get(str(doc['rating']), 0) + 1
+    if summaries:
+        db.rooms.bulk_write([
+            UpdateOne({'_id': hotel_id}, {'$set': {'ratingSummary': dict(summary, average=round(summary['sum'] / summary['count'], 2))}})
+            for hotel_id, summary in summaries.items()
+        ], ordered=False)
+
+    return {
+        'room_ids': [str(room['_id']) for room in room_docs],
+        'hotel_names': sorted({room['hotelName'] for room in room_docs}),
+        'users': [{'id': str(user['_id']), 'email': user['email']} for user in user_docs],
+        'password': PASSWORD,
+    }
@@ -0,0 +1,69 @@
+"""Measure worker cold start: time to import app.py and build the app, and the resulting RSS, against a budget.
+
+Each sample runs in a fresh interpreter with the stub backends, so no SDK client or MongoDB connection is created.
+With --importtime the slowest imports reported by `python -X importtime` are listed, to find what to defer next.
+Exits with status 1 when the median exceeds the budget, so it can gate CI.
+
+    python -m bench.startup --samples 5 --max-seconds 1.5 --max-rss-mb 120 --importtime
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+with open('/proc/self/status') as f:
+    rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith('VmRSS:'))
+print(json.dumps({'seconds': elapsed, 'rss_bytes': rss, 'modules': len(__import__('sys').modules)}))
+"""
+
+def sample(env):
+    result = subprocess.run([sys.executable, '-c', PROBE], env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def slowest_imports(env, top): # Cumulative microseconds per top-level package from -X importtime
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], env=env, capture_output=True, text=True, check=True)
+    totals = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit() and not name[1:].startswith(' '): # Nested imports are indented; keep top-level ones
+            package = name.strip().split('.')[0]
+            totals[package] = max(totals.get(package, 0), int(cumulative))
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--samples', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=1.5, help='budget for the median import time')
+    parser.add_argument('--max-rss-mb', type=float, default=120, help='budget for the median RSS after import')
+    parser.add_argument('--importtime', action='store_true', help='list the slowest top-level imports')
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    from bench.loadtest import stub_environment
+    env = stub_environment(dict(os.environ))
+
+    samples = [sample(env) for _ in range(args.samples)]
+    seconds = statistics.median(s['seconds'] for s in samples)
+    rss_mb = statistics.median(s['rss_bytes'] for s in samples) / 2**20
+    print(f"import + create_app: median {seconds:.3f}s (budget {args.max_seconds}s), "
+          f"RSS {rss_mb:.1f} MB (budget {args.max_rss_mb} MB), {samples[0]['modules']} modules loaded")
+
+    if args.importtime:
+        for package, micros in slowest_imports(env, args.top):
+            print(f"  {package:<28} {micros / 1000:>8.1f} ms")
+
+    if seconds > args.max_seconds or rss_mb > args.max_rss_mb:
+        print('over budget')
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
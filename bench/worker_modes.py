@@ -0,0 +1,128 @@
+"""Compare the sync, gthread, gevent and ASGI execution modes at an equal number of worker processes.
+
+Each mode is started with gunicorn.conf.py against the stub backends (Gemini and Razorpay answer after a simulated
+latency), then /chat, /book-room and /api/create-order are driven over HTTP. Throughput, p95 latency and the total
+RSS of the gunicorn process tree are reported, so modes can be compared at the same memory budget.
+
+    python -m bench.worker_modes --modes sync gthread gevent asgi --workers 2 --concurrency 32 --requests 400
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pymongo import MongoClient
+from bench.seed import BENCH_MONGO_URI, DROP_FLAG, seed
+from database.indexes import ensure_indexes
+
+def rss_bytes(pid): # Resident memory of a process and all of its children, from /proc
+    total = 0
+    pids = [pid]
+    while pids:
+        current = pids.pop()
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+            with open(f"/proc/{current}/task/{current}/children") as f:
+                pids.extend(int(child) for child in f.read().split())
+        except FileNotFoundError:
+            continue
+    return total
+
+def mint_tokens(secret, user_ids): # Same tokens the app issues, without importing the app in this process
+    from flask import Flask
+    from flask_jwt_extended import JWTManager, create_access_token
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = secret
+    JWTManager(app)
+    with app.app_context():
+        return [create_access_token(identity=user_id) for user_id in user_ids]
+
+def wait_until_up(base_url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(base_url + '/', timeout=1).read()
+            return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError('server did not start')
+
+def drive(base_url, tokens, room_ids, requests, concurrency):
+    rng = random.Random(3)
+
+    def one(i):
+        token = rng.choice(tokens)
+        kind = i % 3
+        if kind == 0:
+            path, body = '/chat', {'message': 'what amenities does the grand palace offer'} # misses the local tiers
+        elif kind == 1:
+            check_in = date(2031, 1, 1) + timedelta(days=rng.randint(0, 5000))
+            path, body = '/book-room', {'room_id': rng.choice(room_ids), 'check_in': check_in.isoformat(),
+                                        'check_out': (check_in + timedelta(days=1)).isoformat(), 'totalAmount': 1000}
+        else:
+            path, body = '/api/create-order', {'amount': rng.randint(1000, 5000), 'room_id': rng.choice(room_ids)}
+        req = urllib.request.Request(base_url + path, data=json.dumps(body).encode('utf-8'), method='POST',
+                                     headers={'Content-Type': 'application/json', 'Authorization': f"Bearer {token}"})
+        started = time.perf_counter()
+        try:
+            urllib.request.urlopen(req, timeout=60).read()
+        except urllib.error.HTTPError as e:
+            e.read()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+    return requests / wall, latencies[int(len(latencies) * 0.95) - 1]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modes', nargs='+', default=['sync', 'gthread', 'gevent', 'asgi'])
+    parser.add_argument('--workers', type=int, default=2, help='worker processes per mode (the memory budget)')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--external-latency', type=float, default=0.2, help='simulated Gemini/Razorpay latency in seconds')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument(DROP_FLAG, dest='allow_drop', action='store_true', help='seed a database not named *_bench')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env['MONGO_URI'] = BENCH_MONGO_URI # Never an exported MONGO_URI: seeding drops collections
+    env.setdefault('SECRET_KEY', 'benchmark-secret')
+    env.update({'EMAIL_TRANSPORT': 'stub', 'PAYMENT_GATEWAY': 'stub', 'IMAGE_UPLOADER': 'fake', 'CHAT_LLM': 'stub',
+                'CHAT_STUB_LATENCY': str(args.external_latency), 'PAYMENT_STUB_LATENCY': str(args.external_latency),
+                'CHAT_INTENT_CACHE_SIZE': '0', 'WEB_CONCURRENCY': str(args.workers), 'BIND': f"127.0.0.1:{args.port}"})
+
+    db = MongoClient(env['MONGO_URI']).get_default_database()
+    data = seed(db, rooms=500, users=100, bookings=2000, feedback=1000, allow_drop=args.allow_drop)
+    ensure_indexes(db)
+    tokens = mint_tokens(env['SECRET_KEY'], [user['id'] for user in data['users']])
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    print(f"{'mode':<8} {'rps':>8} {'p95 ms':>9} {'RSS MB':>8}")
+    for mode in args.modes:
+        target = 'asgi:asgi_app' if mode == 'asgi' else 'app:app'
+        server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', target],
+                                  env=dict(env, WORKER_MODE=mode), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_until_up(base_url)
+            rps, p95 = drive(base_url, tokens, data['room_ids'], args.requests, args.concurrency)
+            print(f"{mode:<8} {rps:>8.1f} {p95 * 1000:>9.1f} {rss_bytes(server.pid) / 2**20:>8.1f}")
+        except Exception as e:
+            print(f"{mode:<8} failed: {e}")
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+if __name__ == '__main__':
+    main()
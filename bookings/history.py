@@ -0,0 +1,82 @@
+from datetime import datetime
+from bson import ObjectId
+from bookings.statuses import INACTIVE_STATUSES
+
+# A user's booking history, split into upcoming, past and cancelled stays and paginated by keyset on
+# (check_in, _id) through the (user, check_in, _id) index. Projection and date formatting happen in the
+# aggregation, so Python only forwards documents. Every item carries its own opaque `cursor`; the cursor of the
+# last item of a full page is the page's next_cursor. Bookings the hold sweeper expired are listed under cancelled:
+# unpaid holds that lapsed are no longer stays.
+
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
+SECTIONS = ('upcoming', 'past', 'cancelled')
+
+BOOKING_FIELDS = {
+    '_id': {'$toString': '$_id'},
+    'room_id': {'$toString': {'$ifNull': ['$room_id', '']}},
+    'guest_count': {'$ifNull': ['$guest_count', '']},
+    'pricePerNight': {'$convert': {'input': '$pricePerNight', 'to': 'int', 'onError': 0, 'onNull': 0}},
+    'image': {'$ifNull': ['$image', '']},
+    'name': {'$ifNull': ['$name', '']},
+    'address': {'$ifNull': ['$address', '']},
+    'check_in': {'$dateToString': {'date': '$check_in', 'format': '%Y-%m-%d', 'onNull': ''}},
+    'check_out': {'$dateToString': {'date': '$check_out', 'format': '%Y-%m-%d', 'onNull': ''}},
+    'created_at': {'$dateToString': {'date': '$created_at', 'format': '%Y-%m-%d %H:%M:%S', 'onNull': ''}},
+    'status': {'$ifNull': ['$status', '']},
+    'totalAmount': {'$convert': {'input': '$total_amount', 'to': 'int', 'onError': 0, 'onNull': 0}},
+    'hold_expires_at': {'$dateToString': {'date': '$hold_expires_at', 'format': '%Y-%m-%dT%H:%M:%SZ', 'onNull': ''}}, # When an unpaid booking lapses
+    'cursor': {'$concat': [{'$dateToString': {'date': '$check_in', 'format': '%Y-%m-%dT%H:%M:%S.%LZ'}}, '|', {'$toString': '$_id'}]},
+}
+
+def decode_cursor(cursor): # 'ISO check_in|booking id' -> (datetime, ObjectId); raises ValueError on a malformed cursor
+    check_in, _, booking_id = cursor.partition('|')
+    return datetime.strptime(check_in, '%Y-%m-%dT%H:%M:%S.%fZ'), ObjectId(booking_id)
+
+def section_filter(user_id, section, today, status=None):
+    if section == 'cancelled':
+        query = {'user': user_id, 'status': {'$in': INACTIVE_STATUSES}, 'check_in': {'$type': 'date'}}
+    else:
+        query = {'user': user_id, 'status': {'$nin': INACTIVE_STATUSES},
+                 'check_in': {'$gte': today} if section == 'upcoming' else {'$lt': today}}
+    if status:
+        query = {'$and': [query, {'status': status}]}
+    return query
+
+def section_sort(section): # Soonest upcoming stay first; most recent past and cancelled stays first
+    direction = 1 if section == 'upcoming' else -1
+    return {'check_in': direction, '_id': direction}
+
+def fetch_section(db, user_id, section, today, limit=HISTORY_PAGE_SIZE, cursor=None, status=None):
+    query = section_filter(user_id, section, today, status)
+    direction = section_sort(section)['check_in']
+    if cursor:
+        last_check_in, last_id = decode_cursor(cursor)
+        op = '$gt' if direction == 1 else '$lt'
+        query = {'$and': [query, {'$or': [
+            {'check_in': {op: last_check_in}},
+            {'check_in': last_check_in, '_id': {op: last_id}}
+        ]}]}
+    bookings = list(db.bookings.aggregate([
+        {'$match': query},
+        {'$sort': section_sort(section)},
+        {'$limit': limit},
+        {'$project': BOOKING_FIELDS},
+    ]))
+    next_cursor = bookings[-1]['cursor'] if len(bookings) == limit else None # A full page means there may be more
+    return {'bookings': bookings, 'next_cursor': next_cursor}
+
+def user_filter(user_id, status=None): # Every booking of the user, including ones without a check-in date
+    query = {'user': user_id}
+    if status:
+        query['status'] = status
+    return query
+
+USER_SORT = {'check_in': 1, '_id': 1}
+
+def fetch_all(db, user_id, status=None): # The whole history in one list, unpaginated, as /get-bookings always returned it
+    return list(db.bookings.aggregate([
+        {'$match': user_filter(user_id, status)},
+        {'$sort': USER_SORT},
+        {'$project': BOOKING_FIELDS},
+    ]))
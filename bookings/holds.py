@@ -0,0 +1,141 @@
+import threading
+import time
+import click
+from datetime import datetime, timedelta
+from bson import ObjectId
+from bookings import inventory
+from bookings.statuses import PENDING, PAID, EXPIRED
+from observability.metrics import registry
+
+# Expiring booking holds. A booking starts `pending` with `hold_expires_at` set BOOKING_HOLD_SECONDS ahead; if it is
+# not paid by then a background sweeper moves it to `Expired` and gives its nights back to the room calendar.
+# Razorpay orders left `created` (or as `pending` placeholders) for as long become `expired` and free their
+# idempotency key.
+#
+# Each sweep works in batches: one read for candidates, one update_many tagging them with the sweep's id (the
+# status condition makes a booking paid in the meantime drop out), one read of what was actually tagged and one
+# unordered bulk_write releasing their calendar nights. Every worker runs a sweeper; the conditional updates and
+# per-sweep tags keep them from releasing the same booking twice. A payment can land between tagging and
+# releasing: reclaim() accepts nights still held by the same booking, and the sweeper hands back the nights of
+# any booking in its batch that was paid while it was releasing them.
+
+swept = registry.counter('holds_expired_total', 'Pending bookings and orders expired by the hold sweeper', ('kind',))
+sweep_duration = registry.histogram('hold_sweep_duration_seconds', 'Duration of one hold sweep over every batch')
+
+def expired_bookings_filter(now): # Unpaid bookings whose hold ran out, through the partial pending_hold_expiry index
+    return {'status': PENDING, 'hold_expires_at': {'$lte': now}}
+
+def expired_orders_filter(cutoff): # Orders left unpaid since before cutoff, through status_created_at
+    return {'status': {'$in': ['created', 'pending']}, 'created_at': {'$lte': cutoff}}
+
+class HoldSweeper:
+    def __init__(self, hold_seconds=1800, interval_seconds=60.0, batch_size=500):
+        self.hold_seconds = hold_seconds # How long a pending booking or created order holds before it expires, 0 disables expiry
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.db = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def hold_expiry(self, now): # hold_expires_at for a booking created at `now`, None when holds never expire
+        return now + timedelta(seconds=self.hold_seconds) if self.hold_seconds else None
+
+    def _expire_bookings(self, now):
+        bookings = self.db.bookings
+        total = 0
+        while True:
+            candidates = [doc['_id'] for doc in bookings.find(expired_bookings_filter(now), {'_id': 1}).limit(self.batch_size)]
+            if not candidates:
+                return total
+            sweep_id = ObjectId()
+            bookings.update_many(
+                {'_id': {'$in': candidates}, **expired_bookings_filter(now)}, # Skips bookings paid since the read
+                {'$set': {'status': EXPIRED, 'expired_at': now, 'expired_by': sweep_id}}
+            )
+            expired = list(bookings.find({'expired_by': sweep_id}, {'room_id': 1, 'check_in': 1, 'check_out': 1}))
+            inventory.release_stays(self.db, expired)
+            self._restore_reclaimed([doc['_id'] for doc in expired])
+            swept.inc('booking', amount=len(expired))
+            total += len(expired)
+            if len(candidates) < self.batch_size:
+                return total
+
+    def _restore_reclaimed(self, booking_ids): # Bookings paid after the read-back lost their nights to release_stays; reserve them again
+        if not booking_ids:
+            return
+        for booking in self.db.bookings.find({'_id': {'$in': booking_ids}, 'status': {'$ne': EXPIRED}},
+                                             {'room_id': 1, 'check_in': 1, 'check_out': 1}):
+            if not inventory.reserve_stay(self.db, booking['room_id'], booking['check_in'], booking['check_out'], booking['_id'], own_ok=True):
+                print("❌ Hold sweeper could not restore the nights of paid booking", booking['_id'])
+
+    def _expire_orders(self, now):
+        result = self.db.orders.update_many(
+            expired_orders_filter(now - timedelta(seconds=self.hold_seconds)),
+            {'$set': {'status': 'expired', 'expired_at': now}, '$unset': {'idempotency_key': ''}}
+        )
+        swept.inc('order', amount=result.modified_count)
+        return result.modified_count
+
+    def sweep(self): # One pass over every expired hold; returns (bookings expired, orders expired)
+        if not self.hold_seconds:
+            return 0, 0
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        try:
+            return self._expire_bookings(now), self._expire_orders(now)
+        finally:
+            sweep_duration.observe(time.perf_counter() - started)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.sweep()
+            except Exception as e: # Keep sweeping after a transient MongoDB error
+                print("❌ Hold sweeper error:", e)
+
+    def start(self):
+        if self.hold_seconds and self.interval_seconds > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='hold-sweeper', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+hold_sweeper = HoldSweeper()
+
+def reclaim(db, booking): # Payment arrived after the hold expired: take the nights back if nobody else has them
+    if not inventory.reserve_stay(db, booking['room_id'], booking['check_in'], booking['check_out'], booking['_id'], own_ok=True): # The sweeper may not have released them yet
+        return False
+    result = db.bookings.update_one({'_id': booking['_id'], 'status': EXPIRED}, {'$set': {'status': PAID}, '$unset': {'expired_by': ''}})
+    if result.modified_count == 0: # Changed by someone else meanwhile; give the nights back
+        inventory.release_stay(db, booking['room_id'], booking['check_in'], booking['check_out'], booking['_id'])
+        return False
+    return True
+
+def init_app(app):
+    hold_sweeper.db = app.mongo.db
+    hold_sweeper.hold_seconds = int(app.config.get('BOOKING_HOLD_SECONDS', 1800))
+    hold_sweeper.interval_seconds = float(app.config.get('HOLD_SWEEP_INTERVAL_SECONDS', 60))
+    hold_sweeper.batch_size = int(app.config.get('HOLD_SWEEP_BATCH_SIZE', 500))
+
+    @app.cli.command('expire-holds')
+    def expire_holds_command(): # flask expire-holds, one sweep now
+        bookings, orders = hold_sweeper.sweep()
+        click.echo(f"Expired {bookings} bookings and {orders} orders")
+
+    @app.cli.command('backfill-hold-expiry')
+    def backfill_hold_expiry_command(): # flask backfill-hold-expiry, for pending bookings made before holds expired
+        if not hold_sweeper.hold_seconds:
+            click.echo('BOOKING_HOLD_SECONDS is 0, holds never expire')
+            return
+        result = app.mongo.db.bookings.update_many(
+            {'status': 'pending', 'hold_expires_at': {'$exists': False}},
+            [{'$set': {'hold_expires_at': {'$add': [{'$ifNull': ['$created_at', '$$NOW']}, hold_sweeper.hold_seconds * 1000]}}}]
+        )
+        click.echo(f"Set hold_expires_at on {result.modified_count} bookings")
+
+def start(app): # Per-process start-up work, run in each worker after it forks
+    hold_sweeper.start()
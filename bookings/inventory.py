@@ -0,0 +1,99 @@
+from datetime import timedelta
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+# Per-room, per-night inventory calendar. Each document is one bucket holding a month of nights for one room:
+#   {'room_id': ObjectId, 'month': '2026-10', 'nights': {'2026-10-18': '<booking id>', ...}}
+# A night is taken when its key exists in the bucket. A stay that fits in one month is reserved with a single
+# conditional upsert, so two concurrent bookings for the same night cannot both succeed: the unique
+# (room_id, month) index declared in database/indexes.py turns a lost race into a DuplicateKeyError. That index is
+# a REQUIRED_INDEXES entry, so a worker does not start serving without it.
+# A stay spanning several months takes its buckets one at a time and gives back the ones already taken when a later
+# one is busy. No night is ever held twice, but the steps are not one transaction (that needs a replica set): while
+# a stay is half reserved, a competing booking for its early nights is refused even if the stay then backs out, and
+# a process that dies between steps leaves those nights held by a booking that was never stored.
+
+CALENDAR_COLLECTION = 'room_calendar'
+
+def stay_nights(check_in, check_out): # Every night of the stay, check-out day excluded
+    nights = []
+    night = check_in
+    while night < check_out:
+        nights.append(night)
+        night += timedelta(days=1)
+    return nights
+
+def group_by_month(nights): # Split the nights of a stay into their month buckets
+    buckets = {}
+    for night in nights:
+        buckets.setdefault(night.strftime('%Y-%m'), []).append(night.strftime('%Y-%m-%d'))
+    return buckets
+
+def calendar_filter(room_id, months): # The buckets of one room for the given months, through room_month_unique
+    return {'room_id': room_id, 'month': {'$in': list(months)}}
+
+def is_available(db, room_id, check_in, check_out): # Index lookup on (room_id, month) instead of scanning bookings
+    buckets = group_by_month(stay_nights(check_in, check_out))
+    calendars = db[CALENDAR_COLLECTION].find(
+        calendar_filter(room_id, buckets),
+        {'month': 1, 'nights': 1}
+    )
+    for calendar in calendars:
+        taken = calendar.get('nights', {})
+        if any(night in taken for night in buckets[calendar['month']]):
+            return False
+    return True
+
+def _reserve_bucket(db, room_id, month, nights, booking_id, own_ok=False): # One atomic conditional update for the nights of one month
+    query = {'room_id': room_id, 'month': month}
+    if own_ok: # Nights this booking already holds count as free
+        query['$and'] = [{'$or': [{f'nights.{night}': {'$exists': False}}, {f'nights.{night}': booking_id}]} for night in nights]
+    else:
+        for night in nights:
+            query[f'nights.{night}'] = {'$exists': False} # Only match while every night is still free
+    update = {'$set': {f'nights.{night}': booking_id for night in nights}}
+    try:
+        result = db[CALENDAR_COLLECTION].update_one(query, update, upsert=True)
+    except DuplicateKeyError:
+        # Either the bucket exists and one of the nights is taken, or another booking created the bucket between our
+        # match and insert (MongoDB does not retry upserts with $exists predicates). The bucket exists now, so a plain
+        # conditional update tells the two apart.
+        result = db[CALENDAR_COLLECTION].update_one(query, update)
+        return result.matched_count == 1
+    return result.matched_count == 1 or result.upserted_id is not None
+
+def _release_update(room_id, month, nights, booking_id): # Filter and update freeing the nights of one month held by this booking
+    query = {'room_id': room_id, 'month': month}
+    for night in nights:
+        query[f'nights.{night}'] = booking_id
+    return query, {'$unset': {f'nights.{night}': '' for night in nights}}
+
+def _release_bucket(db, room_id, month, nights, booking_id):
+    db[CALENDAR_COLLECTION].update_one(*_release_update(room_id, month, nights, booking_id))
+
+def reserve_stay(db, room_id, check_in, check_out, booking_id, own_ok=False): # Reserve every night of the stay or none of them
+    # own_ok also accepts nights already held by booking_id, e.g. an expired booking whose nights are not released yet
+    booking_id = str(booking_id)
+    reserved = []
+    for month, nights in group_by_month(stay_nights(check_in, check_out)).items():
+        if not _reserve_bucket(db, room_id, month, nights, booking_id, own_ok):
+            for held_month, held_nights in reserved: # Undo the months already taken for a stay spanning several buckets
+                _release_bucket(db, room_id, held_month, held_nights, booking_id)
+            return False
+        reserved.append((month, nights))
+    return True
+
+def release_stay(db, room_id, check_in, check_out, booking_id): # Give the nights back, e.g. when a booking is cancelled
+    booking_id = str(booking_id)
+    for month, nights in group_by_month(stay_nights(check_in, check_out)).items():
+        _release_bucket(db, room_id, month, nights, booking_id)
+
+def release_stays(db, bookings): # Free the nights of many bookings in one unordered bulk write; returns the buckets updated
+    operations = [
+        UpdateOne(*_release_update(booking['room_id'], month, nights, str(booking['_id'])))
+        for booking in bookings if booking.get('check_in') and booking.get('check_out')
+        for month, nights in group_by_month(stay_nights(booking['check_in'], booking['check_out'])).items()
+    ]
+    if not operations:
+        return 0
+    return db[CALENDAR_COLLECTION].bulk_write(operations, ordered=False).modified_count
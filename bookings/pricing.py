@@ -0,0 +1,110 @@
+import itertools
+import json
+import threading
+from datetime import date, datetime, timedelta
+
+# Capacity and pricing rules shared by /calculate-booking, the batch quote endpoint and the chatbot.
+#
+# A stay costs pricePerNight x rooms required x the sum of the per-night multipliers of its nights. Multipliers
+# come from a pricing calendar: PRICING_WEEKEND_MULTIPLIER applies to Friday and Saturday nights and
+# PRICING_SEASONAL_MULTIPLIERS ({"12": 1.25, ...}, keyed by month) to every night of a month. Both default to
+# 1.0, which prices a stay at exactly pricePerNight x nights x rooms. Each year's calendar is built once as a
+# prefix-sum array, so pricing any date range is two lookups per year it spans, whatever its length.
+
+ROOM_CAPACITY = {'Single Bed': 1, 'Double Bed': 2, 'Suite': 4} # Guests per room of each type
+DEFAULT_CAPACITY = 2
+
+class QuoteError(Exception): # Carries the message and HTTP status the route should answer with
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+def room_capacity(room_type):
+    return ROOM_CAPACITY.get(room_type, DEFAULT_CAPACITY)
+
+def rooms_required(room_type, guest_count): # Rooms needed to fit every guest
+    capacity = room_capacity(room_type)
+    return (int(guest_count) + capacity - 1) // capacity
+
+def _money(value): # Whole amounts stay ints so default pricing answers exactly as before
+    value = round(value, 2)
+    return int(value) if float(value).is_integer() else value
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+class PricingRules:
+    def __init__(self, weekend_multiplier=1.0, seasonal_multipliers=None):
+        self._years = {} # year -> prefix sums of the nightly multipliers, index 0 = before 1 January
+        self._lock = threading.Lock()
+        self.configure(weekend_multiplier, seasonal_multipliers)
+
+    def configure(self, weekend_multiplier=1.0, seasonal_multipliers=None):
+        with self._lock:
+            self.weekend_multiplier = float(weekend_multiplier)
+            self.seasonal_multipliers = {int(month): float(value) for month, value in (seasonal_multipliers or {}).items()}
+            self._years = {} # Rules changed, rebuild calendars on demand
+
+    def night_multiplier(self, night):
+        multiplier = self.seasonal_multipliers.get(night.month, 1.0)
+        if night.weekday() in (4, 5): # Friday and Saturday nights
+            multiplier *= self.weekend_multiplier
+        return multiplier
+
+    def _year(self, year): # Cached prefix sums for one calendar year
+        prefix = self._years.get(year)
+        if prefix is None:
+            first = date(year, 1, 1)
+            days = (date(year + 1, 1, 1) - first).days
+            prefix = [0.0] + list(itertools.accumulate(self.night_multiplier(first + timedelta(days=i)) for i in range(days)))
+            with self._lock:
+                self._years[year] = prefix
+        return prefix
+
+    def stay_factor(self, check_in, check_out): # Sum of the multipliers of every night, check-out day excluded
+        factor = 0.0
+        night = check_in
+        while night < check_out:
+            year_end = date(night.year + 1, 1, 1)
+            segment_end = min(check_out, year_end)
+            prefix = self._year(night.year)
+            start = night.timetuple().tm_yday - 1
+            factor += prefix[start + (segment_end - night).days] - prefix[start]
+            night = segment_end
+        return factor
+
+    def quote(self, room, room_type, guest_count, check_in, check_out): # Price one stay in a room document holding pricePerNight
+        try:
+            check_in, check_out = _as_date(check_in), _as_date(check_out)
+            guests = int(guest_count)
+        except (TypeError, ValueError):
+            raise QuoteError('Invalid dates or guest count', 400)
+        nights = (check_out - check_in).days
+        if nights <= 0:
+            raise QuoteError('Invalid dates', 400)
+        if guests <= 0:
+            raise QuoteError('Invalid guest count', 400)
+
+        rooms = rooms_required(room_type, guests)
+        price_per_night = room['pricePerNight']
+        return {
+            'rooms_required': rooms,
+            'guest_count': guest_count,
+            'nights': nights,
+            'price_per_night': price_per_night,
+            'total_amount': _money(price_per_night * rooms * self.stay_factor(check_in, check_out))
+        }
+
+pricing = PricingRules()
+
+def init_app(app):
+    seasonal = app.config.get('PRICING_SEASONAL_MULTIPLIERS') or '{}'
+    pricing.configure(
+        weekend_multiplier=float(app.config.get('PRICING_WEEKEND_MULTIPLIER', 1.0)),
+        seasonal_multipliers=json.loads(seasonal) if isinstance(seasonal, str) else seasonal
+    )
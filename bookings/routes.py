@@ -1,83 +1,22 @@
 from flask import Blueprint, request, jsonify, current_app 
 from datetime import datetime 
 from bson.objectid import ObjectId 
+from bson.errors import InvalidId
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sib_api_v3_sdk.rest import ApiException
-import sib_api_v3_sdk
-from pprint import pprint
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
+from bookings import inventory, service, history
+from bookings.statuses import CANCELLED
+from bookings.pricing import pricing, QuoteError
 
 #This is the booking routes file this includes the routes for booking a room, getting bookings, updating payment status,
-# cancelling a booking, calculating booking, and sending email notificiations using Brevo
+# cancelling a booking and calculating booking. Booking creation itself lives in bookings/service.py
 
 booking_bp = Blueprint('booking', __name__) #creating a blueprint for the booking routes
 
-def send_brevo_email(to_email, username, booking_id, name, address, check_in, price):
-    configuration = sib_api_v3_sdk.Configuration() #setting up the configuration for Brevo API
-    configuration.api_key['api-key'] = os.getenv("BREVO_API_KEY") #getting the Brevo API key from the environment variables
-
-    api_instance = sib_api_v3_sdk.TransactionalEmailsApi( #creating an instance of the TransactionalEmailsApi
-        sib_api_v3_sdk.ApiClient(configuration)
-    )
-
-    send_smtp_email = sib_api_v3_sdk.SendSmtpEmail( #creating an instance of the SendSmtpEmail class
-        to=[{"email": to_email, "name": username}],
-        sender={"name": "EasyStay", "email": "sakethsampath2006@gmail.com"},
-        subject="🏨 Your Hotel Booking is Confirmed!",
-        html_content=f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; color: #333;">
-                <h2 style="color: #2C3E50;">Hello <span>{username}</span>,</h2>
-
-                <p style="font-size: 16px;">
-                <strong>Thank you</strong> for your booking! Below are your booking details:
-                </p>
-
-                <table style="font-size: 16px; margin-top: 10px;">
-                <tr>
-                    <td><strong>🔖 Booking ID:</strong></td>
-                    <td>{booking_id}</td>
-                </tr>
-                <tr>
-                    <td><strong>🏨 Hotel Name:</strong></td>
-                    <td>{name}</td>
-                </tr>
-                <tr>
-                    <td><strong>📍 Location:</strong></td>
-                    <td>{address}</td>
-                </tr>
-                <tr>
-                    <td><strong>📅 Check-in Date:</strong></td>
-                    <td>{check_in.strftime('%d %B %Y')}</td>
-                </tr>
-                <tr>
-                    <td><strong>💰 Booking Amount:</strong></td>
-                    <td>₹{price}</td>
-                </tr>
-                </table>
-
-                <p style="margin-top: 20px; font-size: 16px;">
-                We look forward to welcoming you to <strong>{name}</strong>.<br>
-                If you need to make any changes, feel free to contact us.
-                </p>
-
-                <p style="font-size: 16px;">Best regards,<br><strong>The EasyStay Team</strong></p>
-            </body>
-            </html>
-            """
-            )
-    try:
-        response = api_instance.send_transac_email(send_smtp_email) #sending the email using Brevo API
-        print("✅ Email sent:", response)
-    except ApiException as e:
-        print("❌ Email sending failed:", e) #handling any exceptions that occur while sending the email
+MAX_BATCH_QUOTES = 200 #upper bound on the tuples one batch quote request may price
 
 @booking_bp.route('/book-room', methods=['POST', 'OPTIONS'])
 @jwt_required()
-def book_room():
+async def book_room():
     if request.method == 'OPTIONS': # Handle CORS preflight request
         return jsonify({'message': 'CORS preflight successful'}), 200
 
@@ -85,60 +24,58 @@ def book_room():
     data = request.get_json() #getting the json data from the client request
     user_id = get_jwt_identity() #getting the user id from the jwt token
 
-    booking = { #creating a booking dictionary to store the booking data
-        'user': user_id,
-        'room_id': ObjectId(data['room_id']),
-        'pricePerNight': data.get('pricePerNight'),
-        'image': data.get('image', ''),
-        'name': data.get('name', ''),
-        'address': data.get('address', ''),
-        'guest_count': data.get('guest_count', ''),
-        'check_in': datetime.strptime(data['check_in'], '%Y-%m-%d'),
-        'check_out': datetime.strptime(data['check_out'], '%Y-%m-%d'),
-        'status': 'pending',
-        'created_at': datetime.utcnow(),
-        'total_amount': data.get('totalAmount')
-        }
-    result = mongo.db.bookings.insert_one(booking) #inserting the booking data into the bookings collection in the database
-    user = mongo.db.users.find_one({'_id': ObjectId(user_id)}) #finding the user in the users collection using the user id 
-    username = user['name']
-    useremail = user['email']
-
-    send_brevo_email(useremail, username, str(result.inserted_id), booking['name'], booking['address'], booking['check_in'], booking['total_amount']) #
-
+    try:
+        booking_id = await service.create_booking_async(mongo, user_id, data) #validating, reserving and storing the booking, with the room and guest lookups running concurrently
+    except service.BookingError as e:
+        return jsonify({'message': e.message}), e.status
 
     return jsonify({ #returning a json response with a success message and the booking id
         'message': 'Room booked successfully',
-        'booking_id': str(result.inserted_id)
+        'booking_id': str(booking_id)
     }), 201 
 
+@booking_bp.route('/room-availability/<room_id>', methods=['GET'])
+def room_availability(room_id):
+    mongo = current_app.mongo #getting the instance of mongodb from the current app context
+
+    try:
+        room_obj_id = ObjectId(room_id) #converting the room id to an ObjectId
+        check_in = datetime.strptime(request.args['check_in'], '%Y-%m-%d') #parsing the check in date
+        check_out = datetime.strptime(request.args['check_out'], '%Y-%m-%d') #parsing the check out date
+    except (KeyError, ValueError, InvalidId):
+        return jsonify({'message': 'Invalid room ID or dates'}), 400
+
+    if check_out <= check_in:
+        return jsonify({'message': 'Invalid dates'}), 400
+
+    available = inventory.is_available(mongo.db, room_obj_id, check_in, check_out) #checking the calendar buckets for the stay
+    return jsonify({'room_id': room_id, 'available': available}), 200
+
 @booking_bp.route('/get-bookings', methods=['GET'])
 @jwt_required()
 def get_bookings():
     mongo = current_app.mongo #getting the instance of mongodb from teh current app context
     user_id = get_jwt_identity() #getting the user id from the jwt token
 
-    bookings = mongo.db.bookings.find({'user': user_id}) #finding the bookings for the user in the bokings collection using the user id
-
-    booking_list = [] #to store the bookings in a list
-
-    for booking in bookings:
-        booking_list.append({
-            '_id': str(booking.get('_id', '')),
-            'room_id': str(booking.get('room_id', '')),
-            'guest_count': booking.get('guest_count', ''),
-            'pricePerNight': int(booking.get('pricePerNight', 0) or 0),
-            'image': booking.get('image', ''),
-            'name': booking.get('name', ''),
-            'address': booking.get('address', ''),
-            'check_in': booking.get('check_in').strftime('%Y-%m-%d') if booking.get('check_in') else '',
-            'check_out': booking.get('check_out').strftime('%Y-%m-%d') if booking.get('check_out') else '',
-            'created_at': booking.get('created_at').strftime('%Y-%m-%d %H:%M:%S') if booking.get('created_at') else '',
-            'status': booking.get('status', ''),
-            'totalAmount': int(booking.get('total_amount', 0) or 0)
-        })
-    
-    return jsonify({'message': 'Bookings retrieved successfully', "bookings": booking_list}), 200 #returning a json response with a success message and the list of bookings
+    section = request.args.get('section') #upcoming, past or cancelled; all three when not given
+    status = request.args.get('status') #optional exact status filter, e.g. Paid or pending
+    if section is not None and section not in history.SECTIONS:
+        return jsonify({'message': f"section must be one of {', '.join(history.SECTIONS)}"}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', history.HISTORY_PAGE_SIZE)), 1), history.HISTORY_MAX_PAGE_SIZE)
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) #stays checking in today count as upcoming
+        if section: #one page of one section, continuing after the cursor if given
+            page = history.fetch_section(mongo.db, user_id, section, today, limit, request.args.get('cursor'), status)
+            return jsonify({'message': 'Bookings retrieved successfully', 'section': section, **page}), 200
+        sections = {name: history.fetch_section(mongo.db, user_id, name, today, limit, status=status) for name in history.SECTIONS} #first page of every section
+    except (ValueError, InvalidId):
+        return jsonify({'message': 'Invalid limit or cursor'}), 400
+
+    return jsonify({
+        'message': 'Bookings retrieved successfully',
+        **sections,
+        'bookings': history.fetch_all(mongo.db, user_id, status) #every booking, unpaginated, for clients that read the flat list
+    }), 200 #returning a json response with a success message and the bookings of each section
 
 @booking_bp.route('/update-pay', methods=['PUT', 'OPTIONS'])
 @jwt_required()
@@ -187,7 +124,9 @@ def cancel_booking(booking_id):
         if booking.get('status') == "Paid": #checking if the booking status is paid
             return jsonify({'message': "Cannot cancel a paid booking"}), 400 
         
-        mongo.db.bookings.update_one({'_id': ObjectId(booking_id)},{'$set': {'status': "Cancelled"}}) #updating the booking status to cancelled in the bookings collection
+        mongo.db.bookings.update_one({'_id': ObjectId(booking_id)},{'$set': {'status': CANCELLED}}) #updating the booking status to cancelled in the bookings collection
+        if booking.get('check_in') and booking.get('check_out'): #releasing the nights the booking was holding
+            inventory.release_stay(mongo.db, booking['room_id'], booking['check_in'], booking['check_out'], booking['_id'])
         
         return jsonify({'message': 'Booking Cancelled Successfully'}), 200 #returning a json response with a success message
 
@@ -214,32 +153,52 @@ def calculate_booking():
     if not room_type or not guest_count or not check_in or not check_out: #handling the case where any of the required parameters are missing
         return jsonify({'message': 'Missing required parameters'}), 400
         
-    booking = mongo.db.rooms.find_one({'_id': room_obj_id, 'roomType': room_type}, {'_id': 0, 'pricePerNight': 1}) #finding the room in the rooms collection using the room id and room type, returning only the price per night
-    if not booking:
+    room = mongo.db.rooms.find_one({'_id': room_obj_id, 'roomType': room_type}, {'_id': 0, 'pricePerNight': 1}) #finding the room in the rooms collection using the room id and room type, returning only the price per night
+    if not room:
         return jsonify({'message': "Room type not found"}), 404
-    
-    rooms_capacity = { #defining the capacity of each room type
-        'Single Bed': 1,
-        'Double Bed': 2,
-        "Suite": 4
-    }
-
-    check_in = datetime.strptime(check_in, "%Y-%m-%d") #converting the check in date to a datetime object
-    check_out = datetime.strptime(check_out, "%Y-%m-%d") #converting the check out date to a datetime object
-
-    nights = (check_out - check_in).days #calculating the number of nights between check in and check out
- 
-    if nights <= 0:
-        return jsonify({'message': 'Invalid dates'}), 400 
-    
-    capacity = rooms_capacity.get(room_type) #getting the capacity of the room type from the rooms_capacity dictionary
-    rooms_required = (int(guest_count) + capacity - 1) // capacity #calculating the number of rooms required based on the guest count and room capacity
-    price_per_night = booking['pricePerNight'] #getting the price per night from the booking data
-    total_price = price_per_night * nights * rooms_required #calculating the total price based on the price per night, number of nights, and number of rooms required
-    return jsonify({
-        'rooms_required': rooms_required,
-        'guest_count': guest_count,
-        'nights': nights,
-        'price_per_night': price_per_night,
-        'total_amount': total_price
-    }), 200 #returning a json response with the number of rooms required, guest count, number of nights, price per night, and total amount
\ No newline at end of file
+
+    try:
+        quote = pricing.quote(room, room_type, guest_count, check_in, check_out) #pricing the stay with the shared capacity and pricing calendar rules
+    except QuoteError as e:
+        return jsonify({'message': e.message}), e.status
+    return jsonify(quote), 200 #returning a json response with the number of rooms required, guest count, number of nights, price per night, and total amount
+
+@booking_bp.route('/calculate-booking/batch', methods = ['POST'])
+@jwt_required()
+def calculate_booking_batch(): #pricing many (room, room type, guests, dates) tuples with a single rooms query
+    data = request.get_json(silent=True) or {}
+    items = data.get('quotes')
+    if not isinstance(items, list) or not items:
+        return jsonify({'message': 'quotes must be a non-empty list'}), 400
+    if len(items) > MAX_BATCH_QUOTES:
+        return jsonify({'message': f'At most {MAX_BATCH_QUOTES} quotes per request'}), 400
+
+    parsed = [] #each item with its room ObjectId, None when the id is missing or invalid
+    for item in items:
+        item = item if isinstance(item, dict) else {}
+        try:
+            room_id = ObjectId(item['room_id']) if item.get('room_id') else None
+        except Exception:
+            room_id = None
+        parsed.append((item, room_id))
+    room_ids = list({room_id for _, room_id in parsed if room_id})
+    rooms = {room['_id']: room for room in current_app.mongo.db.rooms.find({'_id': {'$in': room_ids}}, {'pricePerNight': 1, 'roomType': 1})} #every room in one query
+
+    quotes = []
+    for index, (item, room_id) in enumerate(parsed):
+        result = {'index': index, 'room_id': item.get('room_id')}
+        room_type = item.get('roomType')
+        room = rooms.get(room_id)
+        if room_id is None:
+            result.update(error='Invalid room ID', status=400)
+        elif not room_type or not item.get('guest_count') or not item.get('check_in') or not item.get('check_out'):
+            result.update(error='Missing required parameters', status=400)
+        elif not room or room.get('roomType') != room_type:
+            result.update(error='Room type not found', status=404)
+        else:
+            try:
+                result.update(pricing.quote(room, room_type, item['guest_count'], item['check_in'], item['check_out']))
+            except QuoteError as e:
+                result.update(error=e.message, status=e.status)
+        quotes.append(result)
+    return jsonify({'quotes': quotes}), 200
@@ -0,0 +1,141 @@
+import asyncio
+from datetime import datetime
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from bookings import inventory, holds
+from notifications import outbox
+from auth.identity import identity_cache
+
+#This is the booking service. It creates bookings in-process for both the /book-room route and the chatbot, with the same
+# validation and side effects: the stay is reserved on the room calendar, the booking is stored and the confirmation email is queued
+
+class BookingError(Exception): #raised when a booking cannot be created, carries the HTTP status the route should answer with
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+def booking_confirmation_email(to_email, username, booking_id, name, address, check_in, price): #building the confirmation email that the outbox workers will send
+    return {
+        'to_email': to_email,
+        'to_name': username,
+        'sender': {"name": "EasyStay", "email": "sakethsampath2006@gmail.com"},
+        'subject': "🏨 Your Hotel Booking is Confirmed!",
+        'html': f"""
+            <html>
+            <body style="font-family: Arial, sans-serif; color: #333;">
+                <h2 style="color: #2C3E50;">Hello <span>{username}</span>,</h2>
+
+                <p style="font-size: 16px;">
+                <strong>Thank you</strong> for your booking! Below are your booking details:
+                </p>
+
+                <table style="font-size: 16px; margin-top: 10px;">
+                <tr>
+                    <td><strong>🔖 Booking ID:</strong></td>
+                    <td>{booking_id}</td>
+                </tr>
+                <tr>
+                    <td><strong>🏨 Hotel Name:</strong></td>
+                    <td>{name}</td>
+                </tr>
+                <tr>
+                    <td><strong>📍 Location:</strong></td>
+                    <td>{address}</td>
+                </tr>
+                <tr>
+                    <td><strong>📅 Check-in Date:</strong></td>
+                    <td>{check_in.strftime('%d %B %Y')}</td>
+                </tr>
+                <tr>
+                    <td><strong>💰 Booking Amount:</strong></td>
+                    <td>₹{price}</td>
+                </tr>
+                </table>
+
+                <p style="margin-top: 20px; font-size: 16px;">
+                We look forward to welcoming you to <strong>{name}</strong>.<br>
+                If you need to make any changes, feel free to contact us.
+                </p>
+
+                <p style="font-size: 16px;">Best regards,<br><strong>The EasyStay Team</strong></p>
+            </body>
+            </html>
+            """
+    }
+
+def parse_booking_request(data): #validating the room id and stay dates of a booking payload
+    try:
+        room_id = ObjectId(data['room_id']) #converting the room id to an ObjectId
+        check_in = datetime.strptime(data['check_in'], '%Y-%m-%d') #parsing the check in date
+        check_out = datetime.strptime(data['check_out'], '%Y-%m-%d') #parsing the check out date
+    except (KeyError, TypeError, ValueError, InvalidId):
+        raise BookingError('Invalid room ID or dates', 400)
+
+    if check_out <= check_in: #the stay must be at least one night long
+        raise BookingError('Invalid dates', 400)
+    return room_id, check_in, check_out
+
+def check_room_bookable(mongo, room_id): #making sure the room exists and is open for booking
+    room = mongo.db.rooms.find_one({'_id': room_id}, {'isAvailable': 1})
+    if not room:
+        raise BookingError('Room not found', 404)
+    if room.get('isAvailable') is False:
+        raise BookingError('Room is not available for booking', 409)
+    return room
+
+def find_guest(mongo, user_id): #finding the name and email the confirmation is addressed to
+    user = identity_cache.get_user(mongo.db, user_id) #usually answered from this worker's identity cache
+    if not user:
+        raise BookingError('User not found', 404)
+    return user
+
+def store_booking(mongo, user_id, data, room_id, check_in, check_out): #reserving the stay on the calendar and inserting the booking
+    booking_id = ObjectId() #generating the booking id up front so the calendar can record who holds each night
+    if not inventory.reserve_stay(mongo.db, room_id, check_in, check_out, booking_id): #atomically reserving every night of the stay
+        raise BookingError('Room is already booked for the selected dates', 409)
+
+    now = datetime.utcnow()
+    booking = { #creating a booking dictionary to store the booking data
+        '_id': booking_id,
+        'user': user_id,
+        'room_id': room_id,
+        'pricePerNight': data.get('pricePerNight'),
+        'image': data.get('image', ''),
+        'name': data.get('name', ''),
+        'address': data.get('address', ''),
+        'guest_count': data.get('guest_count', ''),
+        'check_in': check_in,
+        'check_out': check_out,
+        'status': 'pending',
+        'created_at': now,
+        'hold_expires_at': holds.hold_sweeper.hold_expiry(now), #the sweeper expires the booking and frees its nights if it is not paid by then
+        'total_amount': data.get('totalAmount')
+        }
+    try:
+        mongo.db.bookings.insert_one(booking) #inserting the booking data into the bookings collection in the database
+    except Exception:
+        inventory.release_stay(mongo.db, room_id, check_in, check_out, booking_id) #giving the nights back if the booking could not be stored
+        raise
+    return booking
+
+def queue_confirmation(mongo, user, booking): #queueing the confirmation email, the outbox workers deliver it in the background
+    outbox.enqueue(mongo.db, booking_confirmation_email(user['email'], user['name'], str(booking['_id']), booking['name'], booking['address'], booking['check_in'], booking['total_amount']))
+
+def create_booking(mongo, user_id, data): #creating a booking from the same payload /book-room accepts and returning its id
+    room_id, check_in, check_out = parse_booking_request(data)
+    check_room_bookable(mongo, room_id)
+    user = find_guest(mongo, user_id)
+    booking = store_booking(mongo, user_id, data, room_id, check_in, check_out)
+    queue_confirmation(mongo, user, booking)
+    return booking['_id']
+
+async def create_booking_async(mongo, user_id, data): #same steps as create_booking, with the independent lookups running concurrently
+    room_id, check_in, check_out = parse_booking_request(data)
+    _, user = await asyncio.gather( #the room check and the guest lookup do not depend on each other
+        asyncio.to_thread(check_room_bookable, mongo, room_id),
+        asyncio.to_thread(find_guest, mongo, user_id)
+    )
+    booking = await asyncio.to_thread(store_booking, mongo, user_id, data, room_id, check_in, check_out)
+    await asyncio.to_thread(queue_confirmation, mongo, user, booking)
+    return booking['_id']
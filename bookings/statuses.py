@@ -0,0 +1,7 @@
+# Booking status values shared by the booking, payment, hold sweeper and history code paths
+
+PENDING = 'pending'
+PAID = 'Paid'
+CANCELLED = 'Cancelled'
+EXPIRED = 'Expired' # Set by the hold sweeper on an unpaid booking whose hold ran out
+INACTIVE_STATUSES = [CANCELLED, EXPIRED] # Bookings that no longer hold calendar nights
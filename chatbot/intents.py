@@ -0,0 +1,127 @@
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+from utils.cache import TTLCache
+
+# Tiered intent engine for /chat:
+#   1. a deterministic local parser for greetings, farewells, simple searches and plainly worded bookings
+#   2. a cache of intents the LLM already parsed, keyed by the normalized message
+#   3. the LLM, only for messages that miss both tiers
+
+GREETING_RE = re.compile(r"^(hi+|hello+|hey+|hiya|namaste|good (morning|afternoon|evening))( there)?( bot)?$")
+FAREWELL_RE = re.compile(r"^((ok(ay)? )?(thanks?|thank you|thx|ty)( (so|very) much)?( a lot)?|bye+|goodbye|good bye|see you|see ya|that'?s all)$")
+PRICE_WORDS = r"(?:under|below|less than|within|up to|upto|max|maximum|cheaper than)"
+SEARCH_RE = re.compile(
+    r"^(?:(?:show|find|list|search|get|any)(?: me)?(?: for)? )?"
+    r"(?:(?:some|the|all|available|cheap|good) )*"
+    r"(?:hotels?|rooms?|stays?)"
+    r"(?: in (?P<city>[a-z][a-z ]*?))?"
+    r"(?: " + PRICE_WORDS + r" (?:rs |inr )?₹? ?(?P<price>\d[\d,]*))?"
+    r"(?: in (?P<city_after>[a-z][a-z ]*?))?$"
+)
+BOOK_RE = re.compile(
+    r"^(?:please )?(?:book|reserve) (?:a room (?:at|in) )?(?P<hotel>.+?)"
+    r" from (?P<check_in>.+?) (?:to|till|until) (?P<check_out>.+?)"
+    r"(?: for (?P<guests>\d+) (?:guests?|people|persons|adults))?$"
+)
+
+class StubModel: # Offline stand-in for the Gemini model with the same generate_content interface
+    def __init__(self, latency=0.0):
+        self.latency = latency # Simulated model latency in seconds
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls += 1
+        return SimpleNamespace(text=json.dumps({'intent': 'check_amenities', 'hotel': None}))
+
+def normalize_message(message): # Lower-case, drop punctuation and collapse whitespace so equivalent messages share a key
+    text = message.lower().replace('₹', ' ₹')
+    text = re.sub(r"[^\w₹' ]+", ' ', text)
+    return re.sub(r"\s+", ' ', text).strip()
+
+def parse_locally(normalized): # Tier 1: answer the easy messages without a network call
+    if GREETING_RE.match(normalized):
+        return {'intent': 'greetings'}
+    if FAREWELL_RE.match(normalized):
+        return {'intent': 'farewell'}
+
+    match = SEARCH_RE.match(normalized)
+    if match:
+        parsed = {'intent': 'search_hotels'}
+        city = match.group('city') or match.group('city_after')
+        if city:
+            parsed['city'] = city.title()
+        if match.group('price'):
+            parsed['price'] = match.group('price').replace(',', '')
+        return parsed
+
+    match = BOOK_RE.match(normalized)
+    if match:
+        import dateparser # For parsing natural language dates; imported on first use because it is slow to load
+        check_in = dateparser.parse(match.group('check_in'), settings={'PREFER_DATES_FROM': 'future'})
+        check_out = dateparser.parse(match.group('check_out'), settings={'PREFER_DATES_FROM': 'future'})
+        if check_in and check_out: # Only claim the message when both dates are unambiguous
+            parsed = {
+                'intent': 'book_hotel',
+                'hotel': match.group('hotel'),
+                'check_in': check_in.strftime('%Y-%m-%d'),
+                'check_out': check_out.strftime('%Y-%m-%d')
+            }
+            if match.group('guests'):
+                parsed['guest_count'] = int(match.group('guests'))
+            return parsed
+    return None
+
+class IntentEngine:
+    def __init__(self, llm_parse, cache_size=1024, cache_ttl=600.0):
+        self.llm_parse = llm_parse # Callable turning a message into an intent dict through the LLM
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl) # Short TTL because relative dates ("tomorrow") go stale
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.cache_hits = 0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+
+    def resolve(self, message): # Returns (parsed intent, tier that answered)
+        normalized = normalize_message(message or '')
+
+        parsed = parse_locally(normalized)
+        if parsed is not None:
+            with self._lock:
+                self.local_hits += 1
+            return parsed, 'local'
+
+        cached = self.cache.get(normalized)
+        if cached is not None:
+            with self._lock:
+                self.cache_hits += 1
+            return dict(cached), 'cache'
+
+        started = time.perf_counter()
+        parsed = self.llm_parse(message)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_seconds += elapsed
+        self.cache.set(normalized, dict(parsed))
+        return parsed, 'llm'
+
+    def stats(self):
+        with self._lock:
+            total = self.local_hits + self.cache_hits + self.llm_calls
+            avg_llm = self.llm_seconds / self.llm_calls if self.llm_calls else 0.0
+            return {
+                'messages': total,
+                'local_hits': self.local_hits,
+                'cache_hits': self.cache_hits,
+                'llm_calls': self.llm_calls,
+                'local_hit_rate': round(self.local_hits / total, 4) if total else 0.0,
+                'cache_hit_rate': round(self.cache_hits / total, 4) if total else 0.0,
+                'avg_llm_seconds': round(avg_llm, 4),
+                'estimated_seconds_saved': round(avg_llm * (self.local_hits + self.cache_hits), 2), # LLM time the first two tiers avoided
+                'cache': self.cache.stats()
+            }
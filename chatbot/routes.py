@@ -1,17 +1,34 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-import google.generativeai as genai # For Google Gemini API
-import os
 import json
-import requests
+import threading
 from bson import ObjectId # For MongoDB ObjectId
-import dateparser # For parsing natural language dates
+from chatbot.intents import IntentEngine, StubModel # Tiered intent parsing
+from utils.cache import TTLCache # Intent cache sized from the config
+from bookings import service as booking_service # In-process booking creation
+from hotels.names import find_room_by_name # Indexed hotel name lookup
+from hotels import search # Shared hotel search engine
+from bookings.pricing import pricing, QuoteError # Shared capacity and pricing rules
+from observability.metrics import registry, timed_external # Metrics for the model calls and intent tiers
 
 chatbot_bp = Blueprint("chatbot", __name__)
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY")) # Configure the Google Gemini API key
-model = genai.GenerativeModel(model_name="models/gemini-2.5-pro") # Initialize the model for generating responses
+_model = None
+_model_lock = threading.Lock()
+
+def get_model(): # The model is created on the first message that reaches it, so start-up never imports the Gemini SDK
+    global _model
+    with _model_lock:
+        if _model is None:
+            config = current_app.config
+            if config.get("CHAT_LLM", "gemini") == "stub": # Offline model for load tests
+                _model = StubModel(latency=float(config.get("CHAT_STUB_LATENCY", 0)))
+            else:
+                import google.generativeai as genai # For Google Gemini API
+                genai.configure(api_key=config.get("GEMINI_API_KEY")) # Configure the Google Gemini API key
+                _model = genai.GenerativeModel(model_name="models/gemini-2.5-pro") # Initialize the model for generating responses
+        return _model
 
 def parse_user_intent(message: str): # Function to parse user intent from the message
     prompt = f"""
@@ -33,46 +50,57 @@ Respond only with a JSON object.
 
 User query: "{message}"
     """
-    response = model.generate_content(prompt)
+    with timed_external('gemini'): # Time the model call
+        response = get_model().generate_content(prompt)
     cleaned = response.text.strip().strip("```").strip("json").strip()
-    return cleaned
+    return json.loads(cleaned) # Convert the model output to a JSON object
+
+intent_engine = IntentEngine(parse_user_intent) # Local parser and intent cache in front of the LLM, sized by init_app
+
+def intent_metrics(): # Intent tier counters for /metrics
+    stats = intent_engine.stats()
+    return {
+        'chat_intents_resolved': ('Chat messages resolved per intent tier', {
+            (('tier', 'local'),): stats['local_hits'],
+            (('tier', 'cache'),): stats['cache_hits'],
+            (('tier', 'llm'),): stats['llm_calls']
+        }),
+        'chat_intent_llm_seconds_saved': ('Estimated model time avoided by the local parser and cache', {(): stats['estimated_seconds_saved']})
+    }
+
+def init_app(app):
+    intent_engine.cache = TTLCache( # Short TTL because relative dates ("tomorrow") go stale
+        maxsize=int(app.config.get('CHAT_INTENT_CACHE_SIZE', 1024)),
+        ttl=float(app.config.get('CHAT_INTENT_CACHE_TTL', 600))
+    )
+    registry.register_collector(intent_metrics)
 
 @chatbot_bp.route('/chat', methods=['POST'])
 @jwt_required()
 def chat():
     user_data = request.get_json() # Get user data from the request
     user_msg = user_data.get("message") # Extract user message
-    access_token = request.headers.get("Authorization") # Get the JWT token from the request headers
     user_id = get_jwt_identity() # Get the user ID from the JWT token
 
-    if not access_token.startswith("Bearer "): # Ensure the token starts with "Bearer "
-        access_token = f"Bearer {access_token}" 
-
-    headers = {"Authorization": access_token} # Prepare headers for the booking API request
-
     try:
-        parsed_str = parse_user_intent(user_msg) # Parse the user intent from the message
-        parsed = json.loads(parsed_str) # Convert the parsed string to a JSON object
+        parsed, tier = intent_engine.resolve(user_msg) # Parse the user intent locally, from the cache, or with the LLM
     except Exception as e: # Handle any parsing errors
         return jsonify({"reply": "Sorry, I couldn't understand that. Can you rephrase?"})
 
     intent = parsed.get("intent") # Get the intent from the parsed data
     db = current_app.mongo.db # Get the MongoDB database instance
-    hotels_collection = db.rooms # Get the hotels collection from the database
 
     if intent == "search_hotels": # If the intent is to search for hotels
         city = parsed.get("city") # Get the city from the parsed data
         max_price = parsed.get("price") # Get the maximum price if specified
 
-        query = {} # Prepare the query for searching hotels
-        if city:
-            query["city"] = city
-        if max_price: # If a maximum price is specified, filter hotels by price
-            max_price_number = int(''.join(filter(str.isdigit, str(max_price))))
-            query["pricePerNight"] = {"$lte": max_price_number}
-
-        hotels = list(hotels_collection.find(query)) # Find hotels matching the query
-        hotel_list = [{"hotelName": h["hotelName"], "pricePerNight": h["pricePerNight"]} for h in hotels]
+        try:
+            max_price_number = int(''.join(filter(str.isdigit, str(max_price)))) if max_price else None
+        except ValueError: # No digits in the price the model extracted
+            max_price_number = None
+        query = search.build_search_filter(city=city, max_price=max_price_number) # Same indexed filters as /search
+        page = search.search_rooms(db, query, sort='price_asc', limit=search.SEARCH_MAX_PAGE_SIZE, facets=False) # Cheapest matches first
+        hotel_list = [{"hotelName": h["hotelName"], "pricePerNight": h["pricePerNight"]} for h in page["results"]]
 
         reply_text = f"Here are hotels under ₹{max_price}:" if max_price else "Here are available hotels:" # Format the reply text
         return jsonify({"reply": reply_text, "hotels": hotel_list}) # Return the list of hotels found
@@ -80,7 +108,7 @@ def chat():
     elif intent == "check_amenities": # If the intent is to check amenities
         hotel_name = parsed.get("hotel") # Get the hotel name from the parsed data
 
-        hotel = hotels_collection.find_one({"hotelName": {"$regex": f"^{hotel_name}$", "$options": "i"}}) # Find the hotel by name using a case-insensitive regex search
+        hotel = find_room_by_name(db, hotel_name) # Find the hotel by its normalized name through the hotelNameKey index
         if hotel:
             amenities = hotel.get("amenities", []) # Get the amenities of the hotel
             return jsonify({"reply": f"{hotel_name} offers: {', '.join(amenities)}"}) # Return the amenities found
@@ -103,27 +131,27 @@ def chat():
         if not hotel_name or not check_in_str or not check_out_str: # If any required information is missing, return an error message   
             return jsonify({"reply": "Please provide hotel name, check-in and check-out dates to book the hotel."})
 
-        room = hotels_collection.find_one({"hotelName": {"$regex": f"^{hotel_name}$", "$options": "i"}}) # Find the hotel by name using a case-insensitive regex search
+        room = find_room_by_name(db, hotel_name) # Find the hotel by its normalized name through the hotelNameKey index
         if not room:
             return jsonify({"reply": f"Sorry, I couldn’t find a hotel named '{hotel_name}'."})
 
         try:
+            import dateparser # For parsing natural language dates; imported on first use because it is slow to load
             check_in = dateparser.parse(check_in_str) # Parse the check-in date
             check_out = dateparser.parse(check_out_str) # Parse the check-out date
             if not check_in or not check_out:
                 return jsonify({"reply": "⚠️ Please provide valid check-in and check-out dates."})
 
-            nights = (check_out - check_in).days # Calculate the number of nights between check-in and check-out
-            if nights <= 0:
+            if check_out.date() <= check_in.date():
                 return jsonify({"reply": "❌ Check-out date must be after check-in date."})
-            
-            room_type = room.get("roomType", "Double Bed") # Get the room type from the hotel data, defaulting to "Double Bed"
-            rooms_capacity = {"Single Bed": 1, "Double Bed": 2, "Suite": 4} # Define the capacity of each room type
-            capacity = rooms_capacity.get(room_type, 2) # Get the capacity of the specified room type, defaulting to 2 if not found
-            rooms_required = (int(guest_count) + capacity - 1) // capacity # Calculate the number of rooms required based on guest count and room capacity
 
-            price = room.get("pricePerNight", 0) # Get the price per night from the hotel data, defaulting to 0 if not found
-            total_amount = price * nights * rooms_required # Calculate the total amount based on price per night, number of nights, and number of rooms required
+            room_type = room.get("roomType", "Double Bed") # Get the room type from the hotel data, defaulting to "Double Bed"
+            try:
+                quote = pricing.quote(room, room_type, guest_count, check_in, check_out) # Same capacity and pricing calendar rules as /calculate-booking
+            except QuoteError as e:
+                return jsonify({"reply": f"❌ {e.message}"})
+            price = quote["price_per_night"]
+            total_amount = quote["total_amount"]
 
             booking_payload = { 
                 "user": user_id,
@@ -140,20 +168,15 @@ def chat():
                 "totalAmount": total_amount
             } # Prepare the booking payload with all necessary details
 
-            booking_response = requests.post(
-                "https://hotel-booking-backend-74ai.onrender.com/book-room",
-                headers=headers,
-                json=booking_payload
-            ) # Send the booking request to the booking API
-
-            if booking_response.status_code == 201:
-                booking_id = booking_response.json().get("booking_id")
-                return jsonify({
-                    "reply": f"✅ Booking confirmed at {hotel_name} from {check_in.strftime('%Y-%m-%d')} to {check_out.strftime('%Y-%m-%d')} for {guest_count} guests\n💰 Total: ₹{total_amount}\n🆔 Booking ID: `{booking_id}`"
-                })
-            else:
-                print("Booking API error:", booking_response.text)
-                return jsonify({"reply": "❌ Booking failed. Please try again later."})
+            try:
+                booking_id = booking_service.create_booking(current_app.mongo, user_id, booking_payload) # Create the booking in-process, same validation and side effects as /book-room
+            except booking_service.BookingError as e:
+                print("Booking error:", e.message)
+                return jsonify({"reply": f"❌ Booking failed: {e.message}"})
+
+            return jsonify({
+                "reply": f"✅ Booking confirmed at {hotel_name} from {check_in.strftime('%Y-%m-%d')} to {check_out.strftime('%Y-%m-%d')} for {guest_count} guests\n💰 Total: ₹{total_amount}\n🆔 Booking ID: `{booking_id}`"
+            })
 
         except Exception as e:
             print("Booking error:", e)
@@ -164,3 +187,8 @@ def chat():
 
     else: # If the intent is not recognized
         return jsonify({"reply": "I'm here to help you search, check amenities, and book hotels. Try asking a hotel-related question!"})
+
+@chatbot_bp.route('/chat/intent-stats', methods=['GET'])
+@jwt_required()
+def intent_stats(): # Hit rates of the local parser and intent cache, and the LLM time they saved
+    return jsonify(intent_engine.stats()), 200
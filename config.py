@@ -6,6 +6,62 @@ load_dotenv() # Load environment variables from the .env file
 class Config: # Configuration class to hold application settings
     SECRET_KEY = os.getenv('SECRET_KEY')
     MONGO_URI = os.getenv('MONGO_URI')
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 20)) # Connections per worker process; size to threads per worker plus background senders
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 60000)) # Idle connections are closed so quiet workers hold no sockets
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)) # Fail fast instead of hanging for 30s when MongoDB is down
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 20000))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 2000)) # How long a request waits for a free pooled connection
     CLOUDINARY_CLOUD_NAME = os.getenv('CLOUDINARY_CLOUD_NAME')
     CLOUDINARY_API_KEY = os.getenv('CLOUDINARY_API_KEY')
-    CLOUDINARY_API_SECRET = os.getenv('CLOUDINARY_API_SECRET')
\ No newline at end of file
+    CLOUDINARY_API_SECRET = os.getenv('CLOUDINARY_API_SECRET')
+    BREVO_API_KEY = os.getenv('BREVO_API_KEY')
+    EMAIL_TRANSPORT = os.getenv('EMAIL_TRANSPORT', 'brevo') # 'brevo' or 'stub' for offline runs
+    EMAIL_OUTBOX_WORKERS = int(os.getenv('EMAIL_OUTBOX_WORKERS', 2)) # Sender threads per process, 0 disables sending
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 10))
+    EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5)) # Attempts before a message is dead-lettered
+    EMAIL_OUTBOX_BACKOFF_SECONDS = float(os.getenv('EMAIL_OUTBOX_BACKOFF_SECONDS', 2.0))
+    CREATE_INDEXES_ON_STARTUP = os.getenv('CREATE_INDEXES_ON_STARTUP', 'true').lower() == 'true'
+    QUERY_PLAN_GUARD = os.getenv('QUERY_PLAN_GUARD', 'false').lower() == 'true' # Fail start-up if a hot query would COLLSCAN
+    NAME_INDEX_REFRESH_SECONDS = float(os.getenv('NAME_INDEX_REFRESH_SECONDS', 300)) # How often the autocomplete index re-reads rooms
+    RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 16 * 1024 * 1024)) # Memory bound for cached response bodies
+    RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRY_BYTES', 1024 * 1024)) # Larger responses stream uncached
+    RESPONSE_CACHE_ROOMS_MAX_ENTRY_BYTES = int(os.getenv('RESPONSE_CACHE_ROOMS_MAX_ENTRY_BYTES', 8 * 1024 * 1024)) # Catalogue responses, so the whole /get-rooms list gets an ETag and 304s
+    RESPONSE_CACHE_MAX_AGE_SECONDS = float(os.getenv('RESPONSE_CACHE_MAX_AGE_SECONDS', 30)) # Bounds staleness after a write served by another worker
+    RESPONSE_CACHE_CHANGE_STREAM = os.getenv('RESPONSE_CACHE_CHANGE_STREAM', 'false').lower() == 'true' # Invalidate across workers (needs a replica set)
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true' # Off when a proxy in front already compresses
+    COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', 1024)) # Smaller bodies are sent uncompressed
+    COMPRESSION_ENCODINGS = os.getenv('COMPRESSION_ENCODINGS', 'br,zstd,gzip') # Server preference; br and zstd need their modules installed
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+    COMPRESSION_ZSTD_LEVEL = int(os.getenv('COMPRESSION_ZSTD_LEVEL', 3))
+    COMPRESSION_CACHE_ENTRIES = int(os.getenv('COMPRESSION_CACHE_ENTRIES', 128)) # Compressed bodies of ETag responses kept per worker
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12)) # bcrypt cost; existing hashes are upgraded at login when it changes
+    HASH_WORKERS = int(os.getenv('HASH_WORKERS', 4)) # Threads hashing passwords per process
+    HASH_MAX_PENDING = int(os.getenv('HASH_MAX_PENDING', 32)) # Queued or running hashes before logins get a 503
+    HASH_TIMEOUT_SECONDS = float(os.getenv('HASH_TIMEOUT_SECONDS', 10))
+    IDENTITY_CACHE_SIZE = int(os.getenv('IDENTITY_CACHE_SIZE', 10000)) # User records cached per worker for authenticated routes
+    IDENTITY_CACHE_TTL_SECONDS = float(os.getenv('IDENTITY_CACHE_TTL_SECONDS', 60)) # Bounds staleness after a profile change in another worker
+    ADMIN_EMAILS = os.getenv('ADMIN_EMAILS', '') # Comma-separated accounts allowed to use admin_required routes; empty allows no one
+    IMAGE_UPLOADER = os.getenv('IMAGE_UPLOADER', 'cloudinary') # 'cloudinary' or 'fake' for offline runs
+    UPLOAD_WORKERS = int(os.getenv('UPLOAD_WORKERS', 8)) # Concurrent image uploads per process
+    UPLOAD_TIMEOUT_SECONDS = float(os.getenv('UPLOAD_TIMEOUT_SECONDS', 60)) # An /add-hotels batch not uploaded by then fails and is cleaned up
+    PAYMENT_GATEWAY = os.getenv('PAYMENT_GATEWAY', 'razorpay') # 'razorpay' or 'stub' for offline runs
+    RAZORPAY_KEY_ID = os.getenv('RAZORPAY_KEY_ID', 'rzp_test_L0PKrkZl2dGUmB')
+    RAZORPAY_KEY_SECRET = os.getenv('RAZORPAY_KEY_SECRET', 'HQwPn5DMeQiCB1eiiZyGZ1ni')
+    PRICING_WEEKEND_MULTIPLIER = float(os.getenv('PRICING_WEEKEND_MULTIPLIER', 1.0)) # Applied to Friday and Saturday nights
+    PRICING_SEASONAL_MULTIPLIERS = os.getenv('PRICING_SEASONAL_MULTIPLIERS', '{}') # JSON keyed by month number, e.g. {"12": 1.25}
+    BOOKING_HOLD_SECONDS = int(os.getenv('BOOKING_HOLD_SECONDS', 1800)) # Unpaid bookings and orders expire after this, 0 keeps them forever
+    HOLD_SWEEP_INTERVAL_SECONDS = float(os.getenv('HOLD_SWEEP_INTERVAL_SECONDS', 60)) # How often each worker sweeps expired holds
+    HOLD_SWEEP_BATCH_SIZE = int(os.getenv('HOLD_SWEEP_BATCH_SIZE', 500)) # Bookings expired per update_many/bulk_write round
+    ORDER_IDEMPOTENCY_WINDOW_SECONDS = int(os.getenv('ORDER_IDEMPOTENCY_WINDOW_SECONDS', 900)) # Repeated create-order requests within this window reuse the order
+    SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', 0)) # Log requests slower than this with their query breakdown, 0 disables
+    METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR', '') # Shared directory that lets one scrape sum every gunicorn worker
+    METRICS_FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', 5)) # How often each worker publishes its metrics there
+    GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+    CHAT_LLM = os.getenv('CHAT_LLM', 'gemini') # 'gemini' or 'stub' for offline runs
+    CHAT_STUB_LATENCY = float(os.getenv('CHAT_STUB_LATENCY', 0))
+    CHAT_INTENT_CACHE_SIZE = int(os.getenv('CHAT_INTENT_CACHE_SIZE', 1024)) # Parsed intents kept per worker, 0 disables the cache
+    CHAT_INTENT_CACHE_TTL = float(os.getenv('CHAT_INTENT_CACHE_TTL', 600)) # Short, because relative dates ("tomorrow") go stale
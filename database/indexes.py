@@ -0,0 +1,189 @@
+import click
+from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+# Every index the application relies on, declared in one place. ensure_indexes is idempotent: MongoDB skips an
+# index that already exists with the same keys and options, so it is safe to run on every start-up. An index that
+# cannot be built, such as email_unique on a database that already holds duplicate emails, is reported and
+# skipped so the app still starts; `flask report-duplicate-emails` lists what blocks the unique index. The
+# exceptions are REQUIRED_INDEXES: the app refuses to start without them.
+
+INDEXES = {
+    'users': [
+        IndexModel([('email', ASCENDING)], unique=True, name='email_unique'), # signup / login
+    ],
+    'rooms': [
+        IndexModel([('pricePerNight', ASCENDING), ('_id', ASCENDING)], name='price_id'), # price filters and price-sorted catalogue pages
+        IndexModel([('hotelNameKey', ASCENDING)], name='hotel_name_key'), # chatbot exact name lookups
+        IndexModel([('ratingSummary.average', DESCENDING), ('ratingSummary.count', DESCENDING)], name='rating_average'), # top-rated hotels
+        IndexModel([('cityKey', ASCENDING), ('roomType', ASCENDING), ('pricePerNight', ASCENDING)], name='city_type_price'), # /search by city and room type
+        IndexModel([('cityKey', ASCENDING), ('pricePerNight', ASCENDING)], name='city_price'), # /search and chatbot by city, price-sorted
+        IndexModel([('roomType', ASCENDING), ('pricePerNight', ASCENDING)], name='type_price'), # /search by room type anywhere
+    ],
+    'bookings': [
+        IndexModel([('user', ASCENDING), ('check_in', ASCENDING), ('_id', ASCENDING)], name='user_check_in'), # get_bookings sections and keyset pages
+        IndexModel([('created_at', DESCENDING), ('_id', DESCENDING)], name='created_at_id'), # admin dashboard and booking summary date ranges
+        IndexModel([('status', ASCENDING), ('hold_expires_at', ASCENDING)], name='pending_hold_expiry', # hold sweeper
+                   partialFilterExpression={'status': 'pending'}), # only unpaid bookings are indexed
+        IndexModel([('expired_by', ASCENDING)], name='expired_by', sparse=True), # hold sweeper batch read-back
+    ],
+    'feedback': [
+        IndexModel([('hotel_id', ASCENDING), ('_id', DESCENDING)], name='hotel_id_id'), # get_feedback pages
+    ],
+    'orders': [
+        IndexModel([('razorpay_order_id', ASCENDING)], name='razorpay_order_id'), # confirm_booking
+        IndexModel([('idempotency_key', ASCENDING)], unique=True, name='idempotency_key_unique', # one live order per create-order request
+                   partialFilterExpression={'idempotency_key': {'$exists': True}}), # orders from before keys existed, and retired keys, are left out
+        IndexModel([('status', ASCENDING), ('created_at', ASCENDING)], name='status_created_at'), # hold sweeper
+    ],
+    'room_calendar': [
+        IndexModel([('room_id', ASCENDING), ('month', ASCENDING)], unique=True, name='room_month_unique'), # conflict-free reservations
+    ],
+    'email_outbox': [
+        IndexModel([('status', ASCENDING), ('next_attempt_at', ASCENDING)], name='status_next_attempt'), # outbox workers
+    ],
+}
+
+# Indexes that keep the data correct rather than fast. bookings/inventory.py relies on room_month_unique to turn
+# two concurrent reservations of the same night into a DuplicateKeyError; without it both would succeed.
+REQUIRED_INDEXES = [
+    ('room_calendar', 'room_month_unique'),
+]
+
+RETIRED_INDEXES = { # Indexes earlier versions created that no query uses any more; dropped by ensure_indexes
+    'rooms': ['hotel_name_ci'], # Name lookups go through hotelNameKey (see hotels/names.py)
+    'bookings': ['user'], # Superseded by user_check_in
+}
+
+def query_shapes(): # The filter and sort of each hot query, built by the same functions the routes and workers call
+    # Imported here: the route modules are only needed when plans are checked, and importing them at module level
+    # would tie this module to every blueprint.
+    from bson import ObjectId
+    from admin.routes import DASHBOARD_SORT, booking_date_filter
+    from auth.routes import email_filter
+    from bookings import history
+    from bookings.holds import expired_bookings_filter, expired_orders_filter
+    from bookings.inventory import CALENDAR_COLLECTION, calendar_filter
+    from feedback.routes import FEEDBACK_SORT, feedback_filter
+    from hotels import search
+    from hotels.names import name_filter, normalize_name
+    from hotels.routes import TOP_RATED_SORT, build_room_filter, room_sort, top_rated_filter
+    from notifications.outbox import OUTBOX_COLLECTION, OUTBOX_SORT, due_filter
+    from payments.orders import key_filter
+    from payments.routes import order_filter
+
+    now = datetime(2026, 1, 1)
+    user_id = str(ObjectId())
+    search_filter, search_sort = search.parse_search_args({'city': 'Goa', 'maxPrice': '5000'})[:2]
+    typed_filter, typed_sort = search.parse_search_args({'city': 'Goa', 'roomType': 'Suite', 'amenities': 'Wi-Fi'})[:2]
+    shapes = [
+        ('auth.signup / auth.login', 'users', email_filter('guest@example.com'), None),
+        ('room.get_all_rooms', 'rooms', build_room_filter({'minPrice': '1000', 'maxPrice': '5000'}), room_sort('pricePerNight', 1)),
+        ('room.get_all_rooms (catalogue)', 'rooms', build_room_filter({}), room_sort('_id', 1)),
+        ('room.search_hotels (city)', 'rooms', search_filter, search.SEARCH_SORTS[search_sort]),
+        ('room.search_hotels (city and type)', 'rooms', typed_filter, search.SEARCH_SORTS[typed_sort]),
+        ('room.search_hotels (type)', 'rooms', search.build_search_filter(room_type='Suite', min_price=1000), search.SEARCH_SORTS['price_asc']),
+        ('chatbot.chat (search_hotels)', 'rooms', search.build_search_filter(max_price=2000), search.SEARCH_SORTS['price_asc']),
+        ('chatbot.chat (hotel by name)', 'rooms', name_filter(normalize_name('Grand Palace')), None),
+        ('room.top_rated_hotels', 'rooms', top_rated_filter(1), TOP_RATED_SORT),
+        ('admin.dashboard', 'bookings', booking_date_filter({'from': '2026-01-01'}), DASHBOARD_SORT),
+        ('feedback.get_feedback', 'feedback', feedback_filter(ObjectId()), FEEDBACK_SORT),
+        ('payments.confirm_booking', 'orders', order_filter('order_x'), None),
+        ('payments.create_order', 'orders', key_filter('f' * 64), None),
+        ('booking.book_room (calendar)', CALENDAR_COLLECTION, calendar_filter(ObjectId(), ['2026-01', '2026-02']), None),
+        ('hold sweeper (bookings)', 'bookings', expired_bookings_filter(now), None),
+        ('hold sweeper (orders)', 'orders', expired_orders_filter(now), None),
+        ('email outbox workers', OUTBOX_COLLECTION, due_filter(now), OUTBOX_SORT),
+    ] + [
+        (f"booking.get_bookings ({section})", 'bookings', history.section_filter(user_id, section, now), history.section_sort(section))
+        for section in history.SECTIONS
+    ] + [
+        ('booking.get_bookings (flat list)', 'bookings', history.user_filter(user_id), history.USER_SORT),
+    ]
+    return [{'route': route, 'collection': collection, 'filter': query, 'sort': dict(sort) if sort else None}
+            for route, collection, query, sort in shapes]
+
+def ensure_indexes(db): # Create any missing index; existing ones are left alone. Returns the ones that failed
+    failures = []
+    for collection, models in INDEXES.items():
+        for model in models: # One at a time, so a failing index does not hold back the others
+            try:
+                db[collection].create_indexes([model])
+            except OperationFailure as e: # Duplicate keys for a unique index, or a conflicting existing index
+                failures.append((collection, model.document['name'], str(e)))
+    for collection, names in RETIRED_INDEXES.items():
+        existing = db[collection].index_information()
+        for name in names:
+            if name in existing:
+                db[collection].drop_index(name)
+    return failures
+
+def missing_required_indexes(db): # REQUIRED_INDEXES that do not exist, as (collection, name)
+    return [(collection, name) for collection, name in REQUIRED_INDEXES if name not in db[collection].index_information()]
+
+def _plan_stages(plan): # Yield every stage name in an explain() plan tree
+    yield plan.get('stage')
+    for key in ('inputStage', 'queryPlan'):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get('inputStages', []):
+        yield from _plan_stages(child)
+
+def check_query_plans(db): # Explain every hot query shape and return the ones that would scan a collection
+    violations = []
+    for shape in query_shapes():
+        command = {'find': shape['collection'], 'filter': shape['filter']}
+        if shape['sort']:
+            command['sort'] = shape['sort']
+        explained = db.command('explain', command, verbosity='queryPlanner')
+        stages = set(_plan_stages(explained['queryPlanner']['winningPlan']))
+        if 'COLLSCAN' in stages:
+            violations.append(shape)
+    return violations
+
+def start(app): # Create indexes, check the required ones and, in test mode, enforce the plan guard; run per process, after the fork
+    db = app.mongo.db
+    if app.config.get('CREATE_INDEXES_ON_STARTUP', True):
+        for collection, name, error in ensure_indexes(db): # Serve without the index rather than fail every request
+            print(f"❌ Could not build index {name} on {collection}:", error)
+
+    missing = missing_required_indexes(db) # Also checked when start-up creation is off and indexes are built by a deploy step
+    if missing:
+        names = ', '.join(f"{name} on {collection}" for collection, name in missing)
+        raise RuntimeError(f"Required indexes are missing: {names}. Run `flask create-indexes` and fix what it reports")
+
+    if app.config.get('TESTING') or app.config.get('QUERY_PLAN_GUARD'):
+        violations = check_query_plans(db)
+        if violations:
+            routes = ', '.join(shape['route'] for shape in violations)
+            raise RuntimeError(f"Query shapes resolved to COLLSCAN: {routes}")
+
+def init_app(app): # Register the CLI commands; MongoDB is not touched until start()
+    @app.cli.command('create-indexes')
+    def create_indexes_command(): # flask create-indexes
+        failures = ensure_indexes(app.mongo.db)
+        for collection, name, error in failures:
+            click.echo(f"Could not build {name} on {collection}: {error}", err=True)
+        if failures:
+            raise SystemExit(1)
+        click.echo('Indexes are up to date')
+
+    @app.cli.command('report-duplicate-emails')
+    def report_duplicate_emails_command(): # flask report-duplicate-emails, accounts to merge before email_unique can be built
+        duplicates = list(app.mongo.db.users.aggregate([
+            {'$group': {'_id': '$email', 'ids': {'$push': '$_id'}, 'count': {'$sum': 1}}},
+            {'$match': {'count': {'$gt': 1}}},
+        ], allowDiskUse=True))
+        for duplicate in duplicates:
+            click.echo(f"{duplicate['_id']}: {', '.join(str(user_id) for user_id in duplicate['ids'])}")
+        click.echo(f"{len(duplicates)} emails are used by more than one account")
+
+    @app.cli.command('check-query-plans')
+    def check_query_plans_command(): # flask check-query-plans
+        violations = check_query_plans(app.mongo.db)
+        for shape in violations:
+            click.echo(f"COLLSCAN: {shape['route']} on {shape['collection']} {shape['filter']}")
+        if violations:
+            raise SystemExit(1)
+        click.echo('Every query shape uses an index')
@@ -1,10 +1,25 @@
+import click
 from flask import Flask, current_app, Blueprint, request, jsonify
 from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+from utils.response_cache import response_cache
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 
 feedback_bp = Blueprint('feedback', __name__) # Blueprint for feedback routes
 
+def rating_update(rating): # Update pipeline adding one rating to the per-hotel aggregate on the room document
+    star = f'ratingSummary.histogram.{rating}'
+    return [
+        {'$set': {
+            'ratingSummary.count': {'$add': [{'$ifNull': ['$ratingSummary.count', 0]}, 1]},
+            'ratingSummary.sum': {'$add': [{'$ifNull': ['$ratingSummary.sum', 0]}, rating]},
+            star: {'$add': [{'$ifNull': [f'${star}', 0]}, 1]}
+        }},
+        {'$set': {'ratingSummary.average': {'$round': [{'$divide': ['$ratingSummary.sum', '$ratingSummary.count']}, 2]}}} # Kept precomputed so top-rated can sort on an index
+    ]
+
 @feedback_bp.route("/add-feedback", methods = ['POST'])
 @jwt_required()
 def create_feedback():
@@ -12,22 +27,85 @@ def create_feedback():
     data = request.get_json() # Get the JSON data from the request
     user_id = get_jwt_identity() # Get the user ID from the JWT token
 
+    try:
+        hotel_id = ObjectId(data['hotel_id']) # Convert the hotel ID to an ObjectId
+        rating = int(data['rating']) # Ratings are whole stars
+    except (KeyError, TypeError, ValueError, InvalidId):
+        return jsonify({'message': 'Invalid hotel ID or rating'}), 400
+    if rating < 1 or rating > 5:
+        return jsonify({'message': 'Rating must be between 1 and 5'}), 400
+
     feedback = {
-        'hotel_id': ObjectId(data['hotel_id']),
+        'hotel_id': hotel_id,
         'user_id': ObjectId(user_id),
-        'rating': int(data['rating']),
-        'comment': data['comment'],
+        'rating': rating,
+        'comment': data.get('comment', ''),
         'timeStamp': datetime.utcnow()
     } # Create a feedback dictionary with hotel ID, user ID, rating, comment, and timestamp
 
-    result = mongo.db.feedback.insert_one(feedback) # Insert the feedback into the MongoDB collection
-    if(result): # If the insertion is successful, return a success message
-        return jsonify({'message': 'Feedback Submitted Successfully'}), 200 
-    return jsonify({'message': 'Error Submitting the Feedback'}), 400 
+    result = mongo.db.feedback.insert_one(feedback) # Insert the feedback first, so a failed insert never counts in the aggregate
+    if not result.acknowledged:
+        return jsonify({'message': 'Error Submitting the Feedback'}), 400
+
+    updated = mongo.db.rooms.update_one({'_id': hotel_id}, rating_update(rating)) # Atomically fold the rating into the hotel's aggregate
+    if updated.matched_count == 0:
+        mongo.db.feedback.delete_one({'_id': result.inserted_id}) # No such hotel, take the feedback back out
+        return jsonify({'message': 'Hotel not found'}), 404
+    response_cache.invalidate('rooms') # Catalogue responses include the rating aggregate
+    return jsonify({'message': 'Feedback Submitted Successfully'}), 200
+
+FEEDBACK_PAGE_SIZE = 20 # Default number of feedback entries per page
+FEEDBACK_MAX_PAGE_SIZE = 100 # Upper bound on the page size a client can request
+FEEDBACK_SORT = [('_id', -1)] # Newest first, served by the (hotel_id, _id) index
+
+def feedback_filter(hotel_id, cursor=None): # One hotel's feedback, after the cursor's entry when given
+    query = {'hotel_id': ObjectId(hotel_id)}
+    if cursor:
+        query['_id'] = {'$lt': ObjectId(cursor)} # Newest first, so the next page holds older entries
+    return query
 
 @feedback_bp.route('/get-feedback/<hotel_id>', methods = ['GET'])
 @jwt_required()
 def get_feedback(hotel_id):
     mongo = current_app.mongo # Get the MongoDB instance from the current app context
-    feedbacks = list(mongo.db.feedback.find({'hotel_id': ObjectId(hotel_id)}, {'_id': 0, 'rating': 1, 'comment': 1, 'timestamp': 1})) # Find feedbacks for the specified hotel ID, excluding the MongoDB ID field
-    return jsonify(feedbacks), 200 # Return the list of feedbacks as JSON response
+
+    paginated = 'cursor' in request.args or 'limit' in request.args # Without them: every entry as a bare list, as before
+    try:
+        query = feedback_filter(hotel_id, request.args.get('cursor')) # cursor: _id of the last feedback on the previous page
+        limit = min(max(int(request.args.get('limit', FEEDBACK_PAGE_SIZE)), 1), FEEDBACK_MAX_PAGE_SIZE)
+    except (ValueError, InvalidId):
+        return jsonify({'message': 'Invalid hotel ID, cursor or limit'}), 400
+
+    if not paginated:
+        feedbacks = mongo.db.feedback.find(query, {'_id': 0, 'rating': 1, 'comment': 1, 'timeStamp': 1}).sort(FEEDBACK_SORT)
+        return jsonify(list(feedbacks)), 200 # Original response shape for clients that iterate a list
+
+    feedbacks = list(mongo.db.feedback.find(query, {'rating': 1, 'comment': 1, 'timeStamp': 1}).sort(FEEDBACK_SORT).limit(limit)) # One page, served by the (hotel_id, _id) index
+    next_cursor = str(feedbacks[-1]['_id']) if len(feedbacks) == limit else None # A full page means there may be more
+
+    return jsonify({'feedback': feedbacks, 'next_cursor': next_cursor}), 200 # Return the page of feedback as JSON response
+
+@feedback_bp.cli.command('rebuild-ratings')
+def rebuild_ratings(): # flask feedback rebuild-ratings, recomputes every hotel's aggregate from the feedback collection
+    mongo = current_app.mongo
+    pipeline = [
+        {'$group': {'_id': {'hotel': '$hotel_id', 'rating': '$rating'}, 'count': {'$sum': 1}}},
+        {'$group': {
+            '_id': '$_id.hotel',
+            'count': {'$sum': '$count'},
+            'sum': {'$sum': {'$multiply': ['$_id.rating', '$count']}},
+            'histogram': {'$push': {'k': {'$toString': '$_id.rating'}, 'v': '$count'}}
+        }}
+    ]
+    updates = [
+        UpdateOne({'_id': summary['_id']}, {'$set': {'ratingSummary': {
+            'count': summary['count'],
+            'sum': summary['sum'],
+            'histogram': {item['k']: item['v'] for item in summary['histogram']},
+            'average': round(summary['sum'] / summary['count'], 2)
+        }}})
+        for summary in mongo.db.feedback.aggregate(pipeline)
+    ]
+    if updates:
+        mongo.db.rooms.bulk_write(updates, ordered=False)
+    click.echo(f"Rebuilt rating aggregates for {len(updates)} hotels")
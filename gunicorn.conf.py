@@ -0,0 +1,37 @@
+import glob
+import os
+
+# Gunicorn settings for the supported execution modes, picked with WORKER_MODE:
+#   sync    - one request per worker process (the previous default)
+#   gthread - WEB_THREADS requests per worker on threads; I/O-bound routes overlap while waiting on MongoDB or APIs
+#   gevent  - cooperative greenlets, WORKER_CONNECTIONS requests per worker (requires `pip install gevent`)
+#   asgi    - uvicorn workers serving asgi:asgi_app (requires `pip install uvicorn`)
+# Compare them at equal memory by keeping WEB_CONCURRENCY (worker processes) fixed: see bench/worker_modes.py.
+
+worker_mode = os.getenv('WORKER_MODE', 'sync')
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+bind = os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+preload_app = os.getenv('PRELOAD_APP', 'true').lower() == 'true' # Import the app once in the master; workers share its pages
+
+if worker_mode == 'gthread':
+    worker_class = 'gthread'
+    threads = int(os.getenv('WEB_THREADS', 8))
+elif worker_mode == 'gevent':
+    worker_class = 'gevent'
+    worker_connections = int(os.getenv('WORKER_CONNECTIONS', 100))
+elif worker_mode == 'asgi':
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    worker_class = 'sync'
+
+def post_worker_init(worker): # Index creation and background threads run in each worker, after the fork
+    from app import app, start_services
+    start_services(app)
+
+def on_starting(server): # Metrics snapshots of a previous run would be summed into this one's totals
+    directory = os.getenv('METRICS_MULTIPROC_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, 'metrics-*.json*')):
+            os.remove(path)
@@ -0,0 +1,116 @@
+import bisect
+import re
+import threading
+import time
+import unicodedata
+import click
+from pymongo import UpdateOne
+
+# Hotel name lookups. Every room stores `hotelNameKey`, a normalized form of its hotel name, so exact lookups are
+# plain equality matches on an ordinary index. Autocomplete is served from an in-memory sorted array of
+# (key, name) pairs that is updated incrementally by the write paths of this process and re-read from MongoDB
+# every NAME_INDEX_REFRESH_SECONDS to pick up rooms written by other workers.
+
+def normalize_name(name): # Case-folded, accent-free, single-spaced form of a hotel name
+    text = unicodedata.normalize('NFKD', str(name or ''))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return re.sub(r"\s+", ' ', text.casefold()).strip()
+
+def name_filter(key): # Rooms whose normalized name is key, through the hotel_name_key index
+    return {'hotelNameKey': key}
+
+def find_room_by_name(db, name, projection=None): # Exact, case-insensitive hotel lookup backed by the hotelNameKey index
+    key = normalize_name(name)
+    if not key:
+        return None
+    return db.rooms.find_one(name_filter(key), projection)
+
+class HotelNameIndex:
+    def __init__(self, refresh_seconds=300.0):
+        self.refresh_seconds = refresh_seconds
+        self._keys = [] # Sorted normalized names, parallel to _entries
+        self._entries = [] # (key, room_id, hotel name)
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def rebuild(self, db): # Load every hotel name from MongoDB, reading only the fields the index needs
+        entries = sorted(
+            (room.get('hotelNameKey') or normalize_name(room.get('hotelName')), str(room['_id']), room.get('hotelName', ''))
+            for room in db.rooms.find({}, {'hotelName': 1, 'hotelNameKey': 1})
+            if room.get('hotelName')
+        )
+        with self._lock:
+            self._entries = entries
+            self._keys = [entry[0] for entry in entries]
+            self._loaded_at = time.monotonic()
+
+    def _ensure_fresh(self, db):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self.rebuild(db)
+
+    def add(self, room_id, name): # Insert one room without rebuilding the whole index
+        entry = (normalize_name(name), str(room_id), name)
+        with self._lock:
+            if self._loaded_at is None:
+                return # Not built yet; the first search loads everything anyway
+            position = bisect.bisect_left(self._entries, entry)
+            self._entries.insert(position, entry)
+            self._keys.insert(position, entry[0])
+
+    def remove(self, room_id): # Drop one room from the index
+        room_id = str(room_id)
+        with self._lock:
+            for position, entry in enumerate(self._entries):
+                if entry[1] == room_id:
+                    del self._entries[position]
+                    del self._keys[position]
+                    break
+
+    def search(self, db, prefix, limit=10): # Distinct hotel names starting with prefix, in alphabetical order
+        self._ensure_fresh(db)
+        key = normalize_name(prefix)
+        results = []
+        seen = set()
+        with self._lock:
+            position = bisect.bisect_left(self._keys, key)
+            while position < len(self._keys) and self._keys[position].startswith(key) and len(results) < limit:
+                entry_key, room_id, name = self._entries[position]
+                if entry_key not in seen: # Several rooms usually share one hotel name
+                    seen.add(entry_key)
+                    results.append({'hotelName': name, 'room_id': room_id})
+                position += 1
+        return results
+
+name_index = HotelNameIndex()
+
+def _backfill(rooms, query, field, source, batch_size=1000): # Set field from normalize_name(source) in unordered batches
+    updated = 0
+    operations = []
+    for room in rooms.find(query, {source: 1}):
+        operations.append(UpdateOne({'_id': room['_id']}, {'$set': {field: normalize_name(room.get(source)) or None}}))
+        if len(operations) >= batch_size:
+            updated += rooms.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += rooms.bulk_write(operations, ordered=False).modified_count
+    return updated
+
+def backfill_name_keys(db): # hotelNameKey and cityKey for rooms written before they existed; returns the counts updated
+    names = _backfill(db.rooms, {'hotelName': {'$exists': True}, 'hotelNameKey': {'$exists': False}}, 'hotelNameKey', 'hotelName')
+    cities = _backfill(db.rooms, {'city': {'$exists': True}, 'cityKey': {'$exists': False}}, 'cityKey', 'city') # cityKey backs /search
+    return names, cities
+
+def init_app(app):
+    name_index.refresh_seconds = float(app.config.get('NAME_INDEX_REFRESH_SECONDS', 300))
+
+    @app.cli.command('backfill-hotel-name-keys')
+    def backfill_hotel_name_keys(): # flask backfill-hotel-name-keys, for rooms written before hotelNameKey existed
+        names, cities = backfill_name_keys(app.mongo.db)
+        click.echo(f"Backfilled hotelNameKey on {names} rooms")
+        click.echo(f"Backfilled cityKey on {cities} rooms")
+
+def start(app): # Per-process start-up work: name lookups only match rooms that carry hotelNameKey
+    try:
+        backfill_name_keys(app.mongo.db) # A couple of index lookups once every room has its keys
+    except Exception as e: # Lookups of the rooms left over fail until the next start or a manual backfill
+        print("❌ Hotel name key backfill error:", e)
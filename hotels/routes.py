@@ -1,6 +1,13 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING
 from datetime import datetime
+import base64
+import json
+from hotels.names import normalize_name, name_index
+from hotels import search
+from utils.response_cache import cached_response, response_cache
 
 room_bp = Blueprint('room', __name__)
 
@@ -10,7 +17,10 @@ def add_room():
     data = request.get_json() # Get the JSON data from the request
     new_room = {
         'hotelName': data['hotelName'],
+        'hotelNameKey': normalize_name(data['hotelName']), # Normalized name for indexed exact lookups
         'streetAddress': data['streetAddress'],
+        'city': data.get('city'),
+        'cityKey': search.city_key(data.get('city')), # Normalized city for indexed /search filters
         'roomType': data['roomType'],
         'pricePerNight': data['pricePerNight'],
         'amenities': data.get('amenities', []),
@@ -18,21 +28,173 @@ def add_room():
         'isAvailable': True,
     } # Create a new room dictionary with the provided data
     result = mongo.db.rooms.insert_one(new_room) # Insert the new room into the MongoDB collection
+    name_index.add(result.inserted_id, new_room['hotelName']) # Keep the autocomplete index current
+    response_cache.invalidate('rooms') # Cached catalogue pages are now stale
     return jsonify({ # Return a success message and the ID of the new room
         'message': 'Room added successfully',
         'room_id': str(result.inserted_id)
     }), 201
 
+@room_bp.route('/hotels/autocomplete', methods=['GET'])
+def autocomplete_hotels():
+    mongo = current_app.mongo # Get the MongoDB instance from the current app context
+    prefix = request.args.get('q', '') # Get the typed prefix from the query string
+    if not prefix.strip():
+        return jsonify([]), 200
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+    except ValueError:
+        return jsonify({'message': 'limit must be a number'}), 400
+    return jsonify(name_index.search(mongo.db, prefix, limit)), 200 # Served from the in-memory prefix index
+
+TOP_RATED_SORT = [('ratingSummary.average', DESCENDING), ('ratingSummary.count', DESCENDING)] # Walks the rating_average index
+
+def top_rated_filter(min_reviews):
+    return {'ratingSummary.count': {'$gte': min_reviews}}
+
+@room_bp.route('/hotels/top-rated', methods=['GET'])
+def top_rated_hotels():
+    mongo = current_app.mongo # Get the MongoDB instance from the current app context
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50) # Number of hotels to return
+        min_reviews = max(int(request.args.get('minReviews', 1)), 1) # Ignore hotels with too few ratings to be meaningful
+    except ValueError:
+        return jsonify({'message': 'limit and minReviews must be numbers'}), 400
+
+    hotels = mongo.db.rooms.find( # Walks the ratingSummary.average index from the top, reading about `limit` documents
+        top_rated_filter(min_reviews),
+        {'hotelName': 1, 'streetAddress': 1, 'roomType': 1, 'pricePerNight': 1, 'images': {'$slice': 1}, 'ratingSummary': 1}
+    ).sort(TOP_RATED_SORT).limit(limit)
+
+    return jsonify(list(hotels)), 200 # ObjectIds are encoded by the app's JSON provider
+
+@room_bp.route('/search', methods=['GET'])
+@cached_response('rooms')
+def search_hotels():
+    mongo = current_app.mongo # Get the MongoDB instance from the current app context
+    try:
+        query, sort, page, limit, facets = search.parse_search_args(request.args) # city, minPrice, maxPrice, roomType, amenities, sort, page, limit
+    except (ValueError, TypeError) as e:
+        return jsonify({'message': f'Invalid search parameters: {e}'}), 400
+    return jsonify(search.search_rooms(mongo.db, query, sort, page, limit, facets)), 200 # Page and facet counts from one aggregation
+
+ROOMS_PAGE_SIZE = 50 # Default number of rooms returned per page
+ROOMS_MAX_PAGE_SIZE = 200 # Upper bound on the page size a client can request
+ROOM_SORT_FIELDS = {'_id', 'pricePerNight'} # Fields the catalogue can be keyset-paginated on
+ROOMS_PAGINATION_PARAMS = ('limit', 'cursor', 'sort', 'order', 'includeCount') # Any of these asks for the paginated response
+ROOM_FIELDS = {'hotelName', 'streetAddress', 'city', 'roomType', 'pricePerNight', 'amenities', 'images', 'isAvailable'} # Fields a client may project
+
+def encode_cursor(room, sort_field): # Build an opaque cursor pointing just after the given room
+    position = {'id': str(room['_id'])}
+    if sort_field != '_id':
+        position['value'] = room.get(sort_field)
+    return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor): # Turn an opaque cursor back into its (value, ObjectId) position
+    position = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    return position.get('value'), ObjectId(position['id'])
+
+def build_room_filter(args): # Translate the query string filters into a MongoDB query
+    query = {}
+    room_type = args.get('roomType')
+    if room_type:
+        query['roomType'] = room_type
+
+    price_range = {}
+    if args.get('minPrice'):
+        price_range['$gte'] = float(args['minPrice'])
+    if args.get('maxPrice'):
+        price_range['$lte'] = float(args['maxPrice'])
+    if price_range:
+        query['pricePerNight'] = price_range
+
+    amenities = [a.strip() for a in args.get('amenities', '').split(',') if a.strip()]
+    if amenities:
+        query['amenities'] = {'$all': amenities} # Rooms must offer every requested amenity
+    return query
+
+def build_room_projection(args): # Only fetch the fields the client asked for (always including the cursor fields)
+    fields = [f.strip() for f in args.get('fields', '').split(',') if f.strip()]
+    if not fields:
+        return None
+    unknown = set(fields) - ROOM_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return {field: 1 for field in fields}
+
+def room_sort(sort_field, direction): # _id breaks ties so keyset pages never skip or repeat a room
+    return [(sort_field, direction)] if sort_field == '_id' else [(sort_field, direction), ('_id', direction)]
+
+def keyset_condition(sort_field, direction, cursor): # Condition selecting the rows that come after the cursor
+    value, last_id = decode_cursor(cursor)
+    op = '$gt' if direction == ASCENDING else '$lt'
+    if sort_field == '_id':
+        return {'_id': {op: last_id}}
+    return {'$or': [
+        {sort_field: {op: value}},
+        {sort_field: value, '_id': {op: last_id}}
+    ]}
+
 @room_bp.route('/get-rooms', methods = ['GET'])
+@cached_response('rooms')
 def get_all_rooms():
     mongo = current_app.mongo # Get the MongoDB instance from the current app context
-    rooms = mongo.db.rooms.find({}) # Find all rooms in the database
+    args = request.args
+    paginated = any(param in args for param in ROOMS_PAGINATION_PARAMS) # Without them: the whole catalogue as a bare list, as before
+
+    sort_field = args.get('sort', '_id') # Field to paginate on
+    if sort_field not in ROOM_SORT_FIELDS:
+        return jsonify({'message': f"Cannot sort by '{sort_field}'"}), 400
+    direction = DESCENDING if args.get('order') == 'desc' else ASCENDING
+
+    try:
+        limit = min(int(args.get('limit', ROOMS_PAGE_SIZE)), ROOMS_MAX_PAGE_SIZE) # Clamp the page size
+        query = build_room_filter(args)
+        projection = build_room_projection(args)
+        cursor = args.get('cursor')
+        page_query = dict(query)
+        if cursor: # Continue after the last room of the previous page
+            page_query = {'$and': [query, keyset_condition(sort_field, direction, cursor)]}
+    except (ValueError, TypeError, KeyError, InvalidId):
+        return jsonify({'message': 'Invalid pagination or filter parameters'}), 400
+    if limit <= 0:
+        return jsonify({'message': 'limit must be positive'}), 400
+
+    if projection is not None and sort_field != '_id':
+        projection[sort_field] = 1 # The cursor needs the sort value even if the client did not ask for it
+
+    total = None
+    if args.get('includeCount') in ('1', 'true'): # Counting is opt-in because it touches every matching room
+        total = mongo.db.rooms.count_documents(query)
+
+    rooms = mongo.db.rooms.find(page_query, projection).sort(room_sort(sort_field, direction)) # Lazily iterated cursor, one batch at a time
+    if paginated:
+        rooms = rooms.limit(limit)
+    encode = current_app.json.dumps
+
+    def generate_list(): # Original response shape for clients that iterate a bare array of every room
+        yield '['
+        for count, room in enumerate(rooms):
+            yield (',' if count else '') + encode(room)
+        yield ']'
 
-    if not rooms: # If no rooms are found, return a 404 error
-        return jsonify({'message': 'No rooms found'}), 404
+    def generate(): # Stream the page out as the cursor produces it instead of building one big list
+        yield '{"rooms": ['
+        last_room = None
+        count = 0
+        for room in rooms:
+            if last_room is not None:
+                yield ','
+            last_room = room
+            count += 1
+            yield encode(room) # ObjectIds are encoded by the app's JSON provider
+        next_cursor = None
+        if last_room is not None and count == limit: # A full page means there may be more rooms after it
+            next_cursor = encode_cursor(last_room, sort_field)
+        yield '], "next_cursor": ' + encode(next_cursor)
+        if total is not None:
+            yield ', "total": ' + encode(total)
+        yield '}'
 
-    room_list = [] # Prepare a list to hold room data
-    for room in rooms:  # Iterate through each room
-        room['_id'] = str(room['_id']) # Convert ObjectId to string for JSON serialization
-        room_list.append(room) # Append the room data to the list
-    return jsonify(room_list), 200 # Return the list of rooms as a JSON response
\ No newline at end of file
+    body = generate() if paginated else generate_list()
+    return Response(stream_with_context(body), status=200, mimetype='application/json') # Return the rooms as a streamed JSON response
@@ -0,0 +1,107 @@
+from hotels.names import normalize_name
+
+# Multi-criteria hotel search shared by /search and the chatbot. One aggregation matches on the indexed
+# fields, then a $facet stage returns the requested page together with counts per room type, per amenity and
+# per price bucket over the same matches, so the results and the filter sidebar cost a single round-trip.
+#
+# The $match can use the compound indexes declared in database/indexes.py: equality fields first (cityKey,
+# roomType), then pricePerNight for the range and the price sorts.
+
+SEARCH_SORTS = {
+    'price_asc': {'pricePerNight': 1, '_id': 1},
+    'price_desc': {'pricePerNight': -1, '_id': 1},
+    'rating': {'ratingSummary.average': -1, '_id': 1},
+    'newest': {'_id': -1},
+}
+PRICE_BUCKETS = [0, 1000, 2000, 3000, 5000, 8000, 12000] # Lower bounds of the price facet buckets
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 50
+
+RESULT_FIELDS = { # What a search result carries; the full room is one /get-rooms call away
+    '_id': {'$toString': '$_id'},
+    'hotelName': 1,
+    'streetAddress': 1,
+    'city': 1,
+    'roomType': 1,
+    'pricePerNight': 1,
+    'amenities': 1,
+    'image': {'$arrayElemAt': ['$images', 0]},
+    'rating': '$ratingSummary.average',
+}
+
+def city_key(city): # Cities are matched case- and accent-insensitively, like hotel names
+    return normalize_name(city) or None
+
+def build_search_filter(city=None, min_price=None, max_price=None, room_type=None, amenities=None):
+    query = {}
+    if city:
+        query['cityKey'] = city_key(city)
+    if room_type:
+        query['roomType'] = room_type
+    price_range = {}
+    if min_price is not None:
+        price_range['$gte'] = float(min_price)
+    if max_price is not None:
+        price_range['$lte'] = float(max_price)
+    if price_range:
+        query['pricePerNight'] = price_range
+    if amenities:
+        query['amenities'] = {'$all': list(amenities)} # Rooms must offer every requested amenity
+    return query
+
+def parse_search_args(args): # Query string -> (filter, sort, page, limit, facets); raises ValueError on bad input
+    amenities = [a.strip() for a in args.get('amenities', '').split(',') if a.strip()]
+    query = build_search_filter(
+        city=args.get('city'),
+        min_price=args.get('minPrice') or None,
+        max_price=args.get('maxPrice') or None,
+        room_type=args.get('roomType'),
+        amenities=amenities
+    )
+    sort = args.get('sort', 'price_asc')
+    if sort not in SEARCH_SORTS:
+        raise ValueError(f"Cannot sort by '{sort}'")
+    page = max(int(args.get('page', 1)), 1)
+    limit = min(max(int(args.get('limit', SEARCH_PAGE_SIZE)), 1), SEARCH_MAX_PAGE_SIZE)
+    facets = args.get('facets', 'true').lower() != 'false'
+    return query, sort, page, limit, facets
+
+def search_rooms(db, query, sort='price_asc', page=1, limit=SEARCH_PAGE_SIZE, facets=True):
+    results = [{'$sort': SEARCH_SORTS[sort]}, {'$skip': (page - 1) * limit}, {'$limit': limit}, {'$project': RESULT_FIELDS}]
+    if not facets: # The chatbot only needs the page
+        return {'results': list(db.rooms.aggregate([{'$match': query}] + results))}
+
+    pipeline = [
+        {'$match': query},
+        {'$facet': {
+            'results': results,
+            'total': [{'$count': 'count'}],
+            'roomTypes': [{'$sortByCount': '$roomType'}],
+            'amenities': [{'$unwind': '$amenities'}, {'$sortByCount': '$amenities'}],
+            'priceBuckets': [{'$bucket': {
+                'groupBy': '$pricePerNight',
+                'boundaries': PRICE_BUCKETS + [float('inf')],
+                'default': 'other',
+                'output': {'count': {'$sum': 1}}
+            }}],
+        }},
+    ]
+    facet = next(db.rooms.aggregate(pipeline), {})
+    total = facet.get('total') or [{'count': 0}]
+    return {
+        'results': facet.get('results', []),
+        'total': total[0]['count'],
+        'page': page,
+        'facets': {
+            'roomType': {row['_id']: row['count'] for row in facet.get('roomTypes', []) if row['_id'] is not None},
+            'amenities': {row['_id']: row['count'] for row in facet.get('amenities', [])},
+            'price': [_price_bucket(row) for row in facet.get('priceBuckets', [])],
+        }
+    }
+
+def _price_bucket(row): # {'_id': 2000, 'count': 7} -> {'min': 2000, 'max': 3000, 'count': 7}
+    if row['_id'] == 'other':
+        return {'min': None, 'max': None, 'count': row['count']}
+    position = PRICE_BUCKETS.index(row['_id'])
+    upper = PRICE_BUCKETS[position + 1] if position + 1 < len(PRICE_BUCKETS) else None
+    return {'min': row['_id'], 'max': upper, 'count': row['count']}
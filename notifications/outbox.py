@@ -0,0 +1,158 @@
+import random
+import threading
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, ReturnDocument
+from notifications.transports import create_transport
+from observability.metrics import registry, timed_external
+
+# Durable email outbox. Requests only insert a document into `email_outbox`; a bounded pool of background
+# threads claims pending messages one at a time, sends them through one shared transport and retries failures
+# with exponential backoff until they are either sent or dead-lettered. Each claim takes a lease that starts just
+# before its own send, so a slow provider never lets the lease of a message still waiting in line run out; the
+# outcome is only written while the lease is still ours, so a reclaimed message is not overwritten by its old owner.
+#
+# Message lifecycle: pending -> sending -> sent
+#                                       -> pending (retry scheduled)  -> ... -> dead
+
+OUTBOX_COLLECTION = 'email_outbox'
+
+OUTBOX_SORT = [('next_attempt_at', ASCENDING)] # Longest-waiting message first
+
+def due_filter(now): # Messages due for a send attempt, including ones whose lease ran out, through status_next_attempt
+    return {'$or': [
+        {'status': 'pending', 'next_attempt_at': {'$lte': now}},
+        {'status': 'sending', 'locked_until': {'$lt': now}} # A worker died while holding this message
+    ]}
+
+_wakeup = threading.Event() # Lets workers in this process pick up a freshly queued message without waiting a poll
+
+def enqueue(db, message, kind='email'): # Store a message for delivery; this is all a request handler has to do
+    now = datetime.utcnow()
+    result = db[OUTBOX_COLLECTION].insert_one({
+        'kind': kind,
+        'message': message,
+        'status': 'pending',
+        'attempts': 0,
+        'next_attempt_at': now,
+        'created_at': now
+    })
+    _wakeup.set()
+    return result.inserted_id
+
+class OutboxWorkerPool:
+    def __init__(self, db, transport, workers=2, batch_size=10, max_attempts=5, backoff_seconds=2.0,
+                 max_backoff_seconds=300.0, lease_seconds=60.0, poll_seconds=5.0):
+        self.db = db
+        self.transport = transport
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.lease_seconds = lease_seconds # How long a claimed message stays invisible to other workers
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._threads = []
+        self.stats = {'sent': 0, 'retried': 0, 'dead': 0}
+        self._stats_lock = threading.Lock()
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"email-outbox-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        _wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def claim(self): # Atomically claim the next due message, including one whose lease ran out; None when there is none
+        now = datetime.utcnow()
+        return self.db[OUTBOX_COLLECTION].find_one_and_update(
+            due_filter(now),
+            {'$set': {'status': 'sending', 'locked_until': now + timedelta(seconds=self.lease_seconds)},
+             '$inc': {'attempts': 1}},
+            sort=OUTBOX_SORT,
+            return_document=ReturnDocument.AFTER
+        )
+
+    def backoff(self, attempts): # Exponential backoff with jitter, capped
+        delay = min(self.backoff_seconds * (2 ** (attempts - 1)), self.max_backoff_seconds)
+        return delay * random.uniform(0.5, 1.0)
+
+    def deliver(self, doc):
+        collection = self.db[OUTBOX_COLLECTION]
+        lease = {'_id': doc['_id'], 'status': 'sending', 'locked_until': doc['locked_until']} # Matches only while we hold it
+        try:
+            with timed_external('brevo'): # Time the provider round-trip
+                self.transport.send(doc['message'])
+        except Exception as e:
+            if doc['attempts'] >= self.max_attempts: # Out of retries, park it for inspection
+                collection.update_one(lease, {
+                    '$set': {'status': 'dead', 'last_error': str(e), 'dead_at': datetime.utcnow()},
+                    '$unset': {'locked_until': ''}
+                })
+                self._count('dead')
+            else:
+                collection.update_one(lease, {
+                    '$set': {'status': 'pending', 'last_error': str(e),
+                             'next_attempt_at': datetime.utcnow() + timedelta(seconds=self.backoff(doc['attempts']))},
+                    '$unset': {'locked_until': ''}
+                })
+                self._count('retried')
+            return False
+        collection.update_one(lease, {
+            '$set': {'status': 'sent', 'sent_at': datetime.utcnow()},
+            '$unset': {'locked_until': '', 'last_error': ''}
+        })
+        self._count('sent')
+        return True
+
+    def drain_once(self): # Claim and deliver up to batch_size messages, one at a time; returns how many were processed
+        processed = 0
+        while processed < self.batch_size and not self._stop.is_set():
+            doc = self.claim()
+            if doc is None:
+                break
+            self.deliver(doc)
+            processed += 1
+        return processed
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                processed = self.drain_once()
+            except Exception as e: # Keep the worker alive through transient database errors
+                print("❌ Email outbox worker error:", e)
+                processed = 0
+            if processed == 0:
+                _wakeup.wait(self.poll_seconds)
+                _wakeup.clear()
+
+def init_app(app): # Build the sender pool; its threads are started per process by start()
+    db = app.mongo.db
+    workers = int(app.config.get('EMAIL_OUTBOX_WORKERS', 2))
+    pool = OutboxWorkerPool(
+        db,
+        create_transport(app.config),
+        workers=workers,
+        batch_size=int(app.config.get('EMAIL_OUTBOX_BATCH_SIZE', 10)),
+        max_attempts=int(app.config.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 5)),
+        backoff_seconds=float(app.config.get('EMAIL_OUTBOX_BACKOFF_SECONDS', 2.0))
+    )
+    app.email_outbox = pool
+    registry.register_collector(lambda: {
+        'email_outbox_processed': ('Outbox messages processed by this process', {(('result', key),): value for key, value in pool.stats.items()})
+    })
+    return pool
+
+def start(app): # Per-process start-up work, run in each worker after it forks
+    if app.email_outbox.workers > 0:
+        app.email_outbox.start()
@@ -0,0 +1,73 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+
+# Email transports used by the outbox workers. The Brevo transport keeps one API client for the life of the
+# process; the stub transport never leaves the machine so the pipeline can be exercised and benchmarked offline.
+
+class TransportError(Exception): # Raised when a message could not be handed to the provider
+    pass
+
+class BrevoTransport:
+    def __init__(self, api_key=None):
+        self._api_key = api_key or os.getenv("BREVO_API_KEY")
+        self._api = None
+        self._lock = threading.Lock()
+
+    def _client(self): # The SDK is imported and configured on the first send, not at start-up
+        with self._lock:
+            if self._api is None:
+                import sib_api_v3_sdk # Imported here so the stub transport works without the Brevo SDK installed
+                from sib_api_v3_sdk.rest import ApiException
+
+                configuration = sib_api_v3_sdk.Configuration() #setting up the configuration for Brevo API once
+                configuration.api_key['api-key'] = self._api_key
+                self._sdk = sib_api_v3_sdk
+                self._api_exception = ApiException
+                self._api = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration)) #reused by every send
+            return self._api
+
+    def send(self, message):
+        api = self._client()
+        email = self._sdk.SendSmtpEmail(
+            to=[{"email": message['to_email'], "name": message.get('to_name', '')}],
+            sender=message['sender'],
+            subject=message['subject'],
+            html_content=message['html']
+        )
+        try:
+            return api.send_transac_email(email)
+        except self._api_exception as e:
+            raise TransportError(str(e)) from e
+
+class StubTransport:
+    def __init__(self, latency=0.0, failure_rate=0.0):
+        self.latency = latency # Simulated provider round-trip in seconds
+        self.failure_rate = failure_rate # Fraction of sends that fail, to exercise retries and dead-lettering
+        self.sent = deque(maxlen=1000) # Most recent messages only, so long stub and bench runs stay bounded
+        self.sent_count = 0
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise TransportError('stub transport failure')
+        with self._lock:
+            self.sent.append(message)
+            self.sent_count += 1
+            message_id = f"stub-{self.sent_count}"
+        return {'message_id': message_id}
+
+def create_transport(config): # Pick the transport from the EMAIL_TRANSPORT setting
+    name = config.get('EMAIL_TRANSPORT', 'brevo')
+    if name == 'stub':
+        return StubTransport(
+            latency=float(config.get('EMAIL_STUB_LATENCY', 0.0)),
+            failure_rate=float(config.get('EMAIL_STUB_FAILURE_RATE', 0.0))
+        )
+    if name == 'brevo':
+        return BrevoTransport(config.get('BREVO_API_KEY'))
+    raise ValueError(f"Unknown EMAIL_TRANSPORT '{name}'")
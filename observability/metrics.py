@@ -0,0 +1,292 @@
+import contextvars
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from flask import request
+from pymongo import monitoring
+
+# Request, MongoDB and external-call instrumentation rendered in the Prometheus text format. A pymongo
+# CommandListener attributes every MongoDB command to the request that issued it, so an endpoint that suddenly
+# needs fifty commands per request (an N+1 pattern) shows up in mongo_commands_per_request and in the slow log.
+#
+# Metrics live in each process. Under gunicorn, a scrape reaches one random worker, so with METRICS_MULTIPROC_DIR
+# set every worker publishes its counters and histograms to a JSON file in that shared directory (every
+# METRICS_FLUSH_SECONDS, and right before it renders a scrape) and /metrics sums the files of all workers.
+# Files of workers that exited are kept, so totals never go backwards; gunicorn.conf.py empties the directory
+# when the master starts. Gauges from collectors describe the answering process only and carry a `pid` label;
+# without a shared directory every worker has to be scraped on its own.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+def _label_text(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{str(value)}"'.replace('\n', ' ') for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._values.items())
+
+    def render(self, values=None): # values: label values -> count merged from every worker, defaults to this process
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.snapshot() if values is None else values.items()):
+            lines.append(f"{self.name}{_label_text(self.labels, label_values)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {} # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return [(label_values, list(series)) for label_values, series in self._series.items()]
+
+    def render(self, values=None): # values: label values -> series merged from every worker, defaults to this process
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self.snapshot() if values is None else values.items()):
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_label_text(self.labels + ('le',), label_values + (bound,))} {count}")
+            lines.append(f"{self.name}_bucket{_label_text(self.labels + ('le',), label_values + ('+Inf',))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, label_values)} {series[-2]}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, label_values)} {series[-1]}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = [] # (definition site, callable) pairs; callables return {name: (help, {label tuple or (): value})} gauges read at scrape time
+        self.multiprocess_dir = None # Shared directory where every worker publishes its counters and histograms
+
+    def counter(self, name, help_text, labels=()):
+        metric = Counter(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector): # Idempotent: create_app() may run several times in one process (tests, benches)
+        key = (collector.__module__, collector.__qualname__) # Where it is defined, so a fresh lambda from a second init_app replaces the first
+        self._collectors = [existing for existing in self._collectors if existing[0] != key] + [(key, collector)]
+
+    def write_snapshot(self): # Publish this process's counters and histograms for the other workers' scrapes
+        if not self.multiprocess_dir:
+            return
+        data = {metric.name: [[list(label_values), value] for label_values, value in metric.snapshot()] for metric in self._metrics}
+        path = os.path.join(self.multiprocess_dir, f"metrics-{os.getpid()}.json")
+        with open(path + '.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(path + '.tmp', path) # Readers never see a half-written file
+
+    def _merged(self): # metric name -> {label values: value or series}, summed over every worker's snapshot
+        merged = {}
+        for path in glob.glob(os.path.join(self.multiprocess_dir, 'metrics-*.json')):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError): # Removed or replaced while we read it
+                continue
+            for name, series in data.items():
+                target = merged.setdefault(name, {})
+                for label_values, value in series:
+                    key = tuple(label_values)
+                    current = target.get(key)
+                    if current is None:
+                        target[key] = value
+                    elif isinstance(value, list): # Histogram buckets, sum and count
+                        target[key] = [a + b for a, b in zip(current, value)]
+                    else:
+                        target[key] = current + value
+        return merged
+
+    def render(self):
+        lines = []
+        merged = None
+        if self.multiprocess_dir:
+            self.write_snapshot()
+            merged = self._merged()
+        for metric in self._metrics:
+            lines.extend(metric.render(None if merged is None else merged.get(metric.name, {})))
+        pid = ('pid', os.getpid()) # Gauges describe the answering worker
+        for _, collector in self._collectors:
+            try:
+                gauges = collector()
+            except Exception as e: # A broken collector must not take /metrics down
+                lines.append(f"# collector error: {e}")
+                continue
+            for name, (help_text, values) in gauges.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} gauge")
+                for label_pairs, value in values.items():
+                    labels = '{' + ','.join(f'{k}="{v}"' for k, v in tuple(label_pairs) + (pid,)) + '}'
+                    lines.append(f"{name}{labels} {value}")
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+http_requests = registry.counter('http_requests_total', 'HTTP requests by endpoint and status', ('method', 'endpoint', 'status'))
+http_duration = registry.histogram('http_request_duration_seconds', 'Request duration including streamed bodies', ('method', 'endpoint'))
+http_response_size = registry.histogram('http_response_size_bytes', 'Response payload size', ('endpoint',), SIZE_BUCKETS)
+mongo_per_request = registry.histogram('mongo_commands_per_request', 'MongoDB commands issued while serving one request', ('endpoint',), COUNT_BUCKETS)
+mongo_duration = registry.histogram('mongo_command_duration_seconds', 'MongoDB command duration', ('command', 'collection'))
+mongo_failures = registry.counter('mongo_command_failures_total', 'Failed MongoDB commands', ('command',))
+external_duration = registry.histogram('external_call_duration_seconds', 'Calls to external services', ('service', 'outcome'))
+
+_current = contextvars.ContextVar('request_metrics', default=None) # Per-request breakdown, None outside requests
+
+class MongoCommandListener(monitoring.CommandListener):
+    def __init__(self):
+        self._pending = {} # request_id -> collection, to label the finished event
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        with self._lock:
+            self._pending[event.request_id] = collection if isinstance(collection, str) else ''
+
+    def _finish(self, event, failed):
+        with self._lock:
+            collection = self._pending.pop(event.request_id, '')
+        seconds = event.duration_micros / 1e6
+        mongo_duration.observe(seconds, event.command_name, collection)
+        if failed:
+            mongo_failures.inc(event.command_name)
+        stats = _current.get()
+        if stats is not None: # Attribute the command to the request running on this thread
+            stats['mongo_commands'] += 1
+            stats['mongo_seconds'] += seconds
+            key = f"{event.command_name} {collection}".strip()
+            stats['mongo_breakdown'][key] = stats['mongo_breakdown'].get(key, 0) + 1
+
+    def succeeded(self, event):
+        self._finish(event, False)
+
+    def failed(self, event):
+        self._finish(event, True)
+
+command_listener = MongoCommandListener()
+
+@contextmanager
+def timed_external(service): # Time a call to Brevo, Razorpay, Cloudinary, Gemini...
+    started = time.perf_counter()
+    outcome = 'ok'
+    try:
+        yield
+    except Exception:
+        outcome = 'error'
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        external_duration.observe(seconds, service, outcome)
+        stats = _current.get()
+        if stats is not None:
+            stats['external'][service] = stats['external'].get(service, 0.0) + seconds
+
+def _finish_request(stats, method, endpoint, status, size, slow_seconds, app):
+    duration = time.perf_counter() - stats['started']
+    http_requests.inc(method, endpoint, status)
+    http_duration.observe(duration, method, endpoint)
+    if size is not None:
+        http_response_size.observe(size, endpoint)
+    mongo_per_request.observe(stats['mongo_commands'], endpoint)
+    if slow_seconds and duration >= slow_seconds:
+        app.logger.warning(
+            "Slow request %s %s %s took %.0f ms: %d mongo commands (%.0f ms) %s, external %s",
+            method, stats['path'], status, duration * 1000,
+            stats['mongo_commands'], stats['mongo_seconds'] * 1000, stats['mongo_breakdown'],
+            {service: round(seconds * 1000) for service, seconds in stats['external'].items()}
+        )
+
+def _count_bytes(chunks, source, sent): # Pass a streamed body through, adding up the bytes sent in sent[0]
+    try:
+        for chunk in chunks:
+            sent[0] += len(chunk)
+            yield chunk
+    finally:
+        if hasattr(source, 'close'): # The original body may hold a MongoDB cursor and the request context
+            source.close()
+
+def _flush_snapshots(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            registry.write_snapshot()
+        except OSError as e: # Keep serving; the next scrape writes the snapshot again
+            print("❌ Metrics snapshot error:", e)
+
+def init_app(app):
+    slow_seconds = float(app.config.get('SLOW_REQUEST_MS', 0)) / 1000 # 0 disables the slow-request log
+    registry.multiprocess_dir = app.config.get('METRICS_MULTIPROC_DIR') or None
+
+    @app.before_request
+    def start_request_metrics():
+        _current.set({
+            'started': time.perf_counter(),
+            'path': request.path,
+            'mongo_commands': 0,
+            'mongo_seconds': 0.0,
+            'mongo_breakdown': {},
+            'external': {}
+        })
+
+    @app.after_request
+    def record_request_metrics(response):
+        stats = _current.get()
+        if stats is None:
+            return response
+        endpoint = request.endpoint or 'unmatched'
+        method = request.method
+        status = response.status_code
+        if response.is_streamed: # Measure time and size until the last chunk is sent
+            sent = [0]
+            response.response = _count_bytes(response.iter_encoded(), response.response, sent)
+            response.call_on_close(lambda: _finish_request(stats, method, endpoint, status, sent[0], slow_seconds, app))
+        else:
+            _finish_request(stats, method, endpoint, status, response.content_length, slow_seconds, app)
+        return response
+
+    @app.teardown_request
+    def clear_request_metrics(exc):
+        _current.set(None)
+
+def start(app): # Per-process start-up work: publish this worker's metrics for scrapes answered by the others
+    if registry.multiprocess_dir:
+        os.makedirs(registry.multiprocess_dir, exist_ok=True)
+        interval = float(app.config.get('METRICS_FLUSH_SECONDS', 5))
+        threading.Thread(target=_flush_snapshots, args=(interval,), name='metrics-snapshot', daemon=True).start()
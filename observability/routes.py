@@ -0,0 +1,8 @@
+from flask import Blueprint, Response
+from observability.metrics import registry
+
+metrics_bp = Blueprint('metrics', __name__) # Blueprint for the Prometheus scrape endpoint
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4') # Prometheus text exposition format
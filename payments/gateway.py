@@ -0,0 +1,60 @@
+import itertools
+import threading
+import time
+
+# Payment gateway used by the payment routes. RazorpayGateway wraps the real SDK client; StubGateway answers
+# locally with Razorpay-shaped orders so payments can be load-tested offline, and counts how often it was called.
+
+class RazorpayGateway:
+    def __init__(self, key_id, key_secret):
+        self._auth = (key_id, key_secret)
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self): # Built on the first order rather than at start-up
+        with self._lock:
+            if self._client is None:
+                import razorpay # Imported here so the stub gateway works without the Razorpay SDK installed
+                self._client = razorpay.Client(auth=self._auth)
+            return self._client
+
+    def create_order(self, payload):
+        return self.client.order.create(payload)
+
+class StubGateway:
+    def __init__(self, latency=0.0):
+        self.latency = latency # Simulated Razorpay round-trip in seconds
+        self.calls = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def create_order(self, payload):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            order_number = next(self._ids)
+        return {
+            'id': f"order_stub{order_number:010d}",
+            'entity': 'order',
+            'amount': payload['amount'],
+            'amount_paid': 0,
+            'amount_due': payload['amount'],
+            'currency': payload.get('currency', 'INR'),
+            'receipt': payload.get('receipt'),
+            'status': 'created',
+            'attempts': 0,
+            'created_at': int(time.time())
+        }
+
+gateway = None # Set by init_app
+
+def init_app(app):
+    global gateway
+    if app.config.get('PAYMENT_GATEWAY', 'razorpay') == 'stub':
+        gateway = StubGateway(latency=float(app.config.get('PAYMENT_STUB_LATENCY', 0.0)))
+    else:
+        gateway = RazorpayGateway(app.config['RAZORPAY_KEY_ID'], app.config['RAZORPAY_KEY_SECRET'])
+    app.payment_gateway = gateway
+    return gateway
@@ -0,0 +1,110 @@
+import hashlib
+import time
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+from observability.metrics import registry, timed_external
+
+# Idempotent Razorpay order creation. Every order carries an idempotency key: the client's Idempotency-Key header
+# when it sends one, otherwise a key derived from (user, room, booking, amount). A placeholder order is inserted
+# under the key before Razorpay is called, so the unique index lets exactly one of several concurrent retries make
+# the external call; the others read the finished order back from MongoDB. A key is honoured for
+# ORDER_IDEMPOTENCY_WINDOW_SECONDS, after which it is retired and the same request creates a fresh order.
+#
+# Order lifecycle: pending (placeholder, Razorpay call in flight) -> created -> paid
+
+PENDING_LEASE_SECONDS = 30 # A placeholder older than this belongs to a request that died mid-call
+PENDING_WAIT_SECONDS = 5.0 # How long a retry waits for the in-flight request that owns its key
+PENDING_POLL_SECONDS = 0.05
+
+order_requests = registry.counter('order_create_requests_total', 'Order creation requests by outcome', ('outcome',))
+
+class OrderError(Exception): # Carries the message and HTTP status the route should answer with
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+def key_filter(key): # The order holding an idempotency key, through the idempotency_key_unique index
+    return {'idempotency_key': key}
+
+def idempotency_key(user_id, amount, room_id, booking_id=None, client_key=None): # Scoped to the user so keys never collide across accounts
+    if client_key:
+        raw = f"client:{user_id}:{client_key}"
+    else:
+        raw = f"derived:{user_id}:{room_id}:{booking_id or ''}:{amount}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def _retire(orders, existing, now): # Free the key of a stale order so a new one can claim it; no-op if another request got there first
+    return orders.update_one(
+        {'_id': existing['_id'], 'idempotency_key': existing['idempotency_key'], 'status': existing['status']},
+        {'$unset': {'idempotency_key': ''}, '$set': {'idempotency_retired_at': now}}
+    ).modified_count == 1
+
+def _is_stale(existing, now):
+    if existing['idempotency_expires_at'] <= now:
+        return True
+    if existing['status'] == 'pending':
+        return existing['created_at'] <= now - timedelta(seconds=PENDING_LEASE_SECONDS)
+    return existing['status'] != 'created' # A paid or failed order is never handed out again
+
+def _wait_for_pending(orders, key): # Another request is calling Razorpay for this key; wait for its result
+    deadline = time.monotonic() + PENDING_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(PENDING_POLL_SECONDS)
+        existing = orders.find_one(key_filter(key))
+        if existing is None or existing['status'] != 'pending':
+            return existing
+    raise OrderError('An order for this request is still being created, retry shortly', 409)
+
+def create_order(db, gateway, user_id, room_id, amount, key, window_seconds, booking_id=None): # Returns (razorpay order, replayed)
+    orders = db.orders
+    for _ in range(3): # Insert the placeholder, or reuse / retire whatever already holds the key
+        now = datetime.utcnow()
+        placeholder = {
+            'idempotency_key': key,
+            'idempotency_expires_at': now + timedelta(seconds=window_seconds),
+            'amount': amount,
+            'room_id': room_id,
+            'user_id': user_id,
+            'status': 'pending',
+            'created_at': now
+        }
+        if booking_id is not None:
+            placeholder['booking_id'] = booking_id
+        try:
+            orders.insert_one(placeholder)
+            break
+        except DuplicateKeyError:
+            existing = orders.find_one(key_filter(key))
+            if existing is None: # Retired between our insert and read
+                continue
+            if existing['amount'] != amount or existing['room_id'] != room_id:
+                order_requests.inc('mismatch')
+                raise OrderError('Idempotency-Key was already used for a different order', 422)
+            if existing['status'] == 'pending' and not _is_stale(existing, now):
+                existing = _wait_for_pending(orders, key)
+                if existing is None:
+                    continue
+            if _is_stale(existing, now):
+                _retire(orders, existing, now)
+                continue
+            order_requests.inc('replayed')
+            return existing['razorpay_order'], True
+    else:
+        raise OrderError('Could not create the order, retry shortly', 409)
+
+    try:
+        with timed_external('razorpay'): # Time the Razorpay round-trip
+            order = gateway.create_order({'amount': amount, 'currency': 'INR', 'payment_capture': 1})
+    except Exception:
+        orders.delete_one({'_id': placeholder['_id'], 'status': 'pending'}) # Let a retry call Razorpay again
+        order_requests.inc('failed')
+        raise
+
+    orders.update_one({'_id': placeholder['_id']}, {'$set': {
+        'razorpay_order_id': order['id'],
+        'razorpay_order': order, # Replays answer with exactly what the first request returned
+        'status': 'created'
+    }})
+    order_requests.inc('created')
+    return order, False
@@ -2,13 +2,17 @@ from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
 from bson.objectid import ObjectId
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import razorpay 
 from flask_cors import cross_origin
+from payments import orders
+from bookings import holds
+from bookings.statuses import EXPIRED
 
 
 payment_bp = Blueprint('payments', __name__) # Blueprint for payment routes
 
-razorpay_client = razorpay.Client(auth = ("rzp_test_L0PKrkZl2dGUmB", 'HQwPn5DMeQiCB1eiiZyGZ1ni')) # Initialize Razorpay client with API key and secret
+def order_filter(razorpay_order_id): # The order Razorpay reports on, through the razorpay_order_id index
+    return {"razorpay_order_id": razorpay_order_id}
+
 
 @payment_bp.route("/api/create-order", methods=['POST', 'OPTIONS']) 
 @cross_origin(origin='http://localhost:4200', supports_credentials=True) # Allow CORS for local development
@@ -23,23 +27,21 @@ def create_order():
 
     amount = int(data['amount']) * 100 # Convert amount to paise
     room_id = ObjectId(data['room_id']) # Convert room ID to ObjectId
+    booking_id = ObjectId(data['booking_id']) if data.get('booking_id') else None # Optional, narrows the derived key to one booking
 
-    order = razorpay_client.order.create({ # Create a new order with Razorpay
-        'amount': amount,
-        'currency': 'INR',
-        'payment_capture': 1
-    })
-
-    mongo.db.orders.insert_one({ # Insert the order details into the MongoDB collection
-        "razorpay_order_id": order["id"],
-        "amount": amount,
-        "room_id": room_id,
-        "user_id": ObjectId(user_id),
-        "status": "created",
-        "created_at": datetime.utcnow()
-    })
+    key = orders.idempotency_key(user_id, amount, room_id, booking_id, request.headers.get('Idempotency-Key')) # Client key, or one derived from the request
+    try:
+        order, replayed = orders.create_order( # Reuse the order of a repeated request, otherwise create one with Razorpay
+            mongo.db, current_app.payment_gateway, ObjectId(user_id), room_id, amount, key,
+            current_app.config['ORDER_IDEMPOTENCY_WINDOW_SECONDS'], booking_id
+        )
+    except orders.OrderError as e:
+        return jsonify({'error': e.message}), e.status
 
-    return jsonify(order) # Return the order details as JSON response
+    response = jsonify(order) # Return the order details as JSON response
+    if replayed:
+        response.headers['Idempotent-Replayed'] = 'true'
+    return response
 
 @payment_bp.route("/api/confirm-booking", methods=['POST'])
 def confirm_booking():
@@ -47,21 +49,31 @@ def confirm_booking():
     mongo = current_app.mongo # Get the MongoDB instance from the current app context
 
     try:
-        result = mongo.db.orders.update_one( # Update the order status in the database
-            {"razorpay_order_id": data["razorpay_order_id"]},
-            {
-                "$set": {
-                    "status": "paid",
-                    "razorpay_payment_id": data["razorpay_payment_id"],
-                    "razorpay_signature": data["razorpay_signature"],
-                    "paid_at": datetime.utcnow()
-                }
-            }
+        booking_id = ObjectId(data["booking_id"])
+        booking_update = mongo.db.bookings.update_one( # Update the booking status to "Paid" unless its hold already expired
+            {"_id": booking_id, "status": {"$ne": EXPIRED}},
+            {"$set": {"status": "Paid"}}
         )
+        reclaimed = True
+        if booking_update.matched_count == 0:
+            expired = mongo.db.bookings.find_one({"_id": booking_id, "status": EXPIRED}, {"room_id": 1, "check_in": 1, "check_out": 1})
+            reclaimed = not expired or holds.reclaim(mongo.db, expired) # False when the nights were released and booked by someone else
 
-        mongo.db.bookings.update_one( # Update the booking status to "Paid"
-            {"_id": ObjectId(data["booking_id"])},
-            {"$set": {"status": "Paid"}}
+        payment = {
+            "razorpay_payment_id": data["razorpay_payment_id"],
+            "razorpay_signature": data["razorpay_signature"]
+        }
+        if not reclaimed: # Money taken but no room to give: keep the payment on the order so it can be refunded
+            mongo.db.orders.update_one(
+                order_filter(data["razorpay_order_id"]),
+                {"$set": {**payment, "status": "refund_due", "refund_reason": "hold expired and the room was rebooked",
+                          "refund_due_at": datetime.utcnow()}}
+            )
+            return jsonify({"error": "Booking hold expired and the room is no longer available"}), 409
+
+        result = mongo.db.orders.update_one( # Mark the order paid only once the booking holds its nights
+            order_filter(data["razorpay_order_id"]),
+            {"$set": {**payment, "status": "paid", "paid_at": datetime.utcnow()}}
         )
 
         if result.matched_count == 0: # If no order was found with the given Razorpay order ID
@@ -0,0 +1,52 @@
+import os
+
+# Offline settings, applied before config.py reads the environment. MONGO_URI only has to parse: the fixtures put
+# an in-memory mongomock database in place of the real one, so no MongoDB server is needed.
+TEST_ENVIRONMENT = {
+    'MONGO_URI': 'mongodb://localhost:27017/easystay_test',
+    'SECRET_KEY': 'test-secret',
+    'EMAIL_TRANSPORT': 'stub',
+    'EMAIL_OUTBOX_WORKERS': '0',
+    'PAYMENT_GATEWAY': 'stub',
+    'IMAGE_UPLOADER': 'fake',
+    'CHAT_LLM': 'stub',
+    'BCRYPT_LOG_ROUNDS': '4',
+    'HOLD_SWEEP_INTERVAL_SECONDS': '0',
+}
+os.environ.update(TEST_ENVIRONMENT)
+
+import mongomock
+import pytest
+from bson import ObjectId
+from flask_jwt_extended import create_access_token
+from app import create_app
+from bookings import holds
+from database.indexes import ensure_indexes
+from utils.response_cache import response_cache
+
+def use_database(app, db): # Point the app and its background helpers at `db`, with the indexes start-up would build
+    ensure_indexes(db) # start_services runs once per process, so later apps' databases would not get them from it
+    app.mongo.db = db
+    holds.hold_sweeper.db = db
+    app.email_outbox.db = db
+
+@pytest.fixture
+def app():
+    app = create_app()
+    use_database(app, mongomock.MongoClient()['easystay_test'])
+    response_cache.clear()
+    return app
+
+@pytest.fixture
+def db(app):
+    return app.mongo.db
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers(app):
+    with app.app_context():
+        token = create_access_token(identity=str(ObjectId()))
+    return {'Authorization': f'Bearer {token}'}
@@ -0,0 +1,24 @@
+from datetime import datetime, timedelta
+from bson import ObjectId
+from flask_jwt_extended import create_access_token
+from bookings import history
+
+def test_flat_list_holds_every_booking(app, client, db, monkeypatch):
+    monkeypatch.setattr(history, 'BOOKING_FIELDS', {'status': 1, 'cursor': {'$toString': '$_id'}}) # mongomock has no $convert
+    user_id = str(ObjectId())
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+    start = datetime(2020, 1, 1)
+    db.bookings.insert_many(
+        [{'user': user_id, 'status': 'Paid', 'check_in': start + timedelta(days=i), 'check_out': start + timedelta(days=i + 1)}
+         for i in range(history.HISTORY_PAGE_SIZE + 5)] # More past stays than one section page
+        + [{'user': user_id, 'status': 'Expired', 'check_in': start, 'check_out': start + timedelta(days=1)},
+           {'user': user_id, 'status': 'pending'}] # Listed in no section without a check-in date
+    )
+
+    body = client.get('/get-bookings', headers=headers).get_json()
+
+    assert len(body['past']['bookings']) == history.HISTORY_PAGE_SIZE
+    assert body['past']['next_cursor']
+    assert len(body['cancelled']['bookings']) == 1
+    assert len(body['bookings']) == history.HISTORY_PAGE_SIZE + 7
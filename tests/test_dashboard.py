@@ -0,0 +1,27 @@
+from admin import routes
+
+def add_bookings(db, count):
+    return db.bookings.insert_many([{'name': f"Hotel {i}", 'pricePerNight': i, 'status': 'Paid'} for i in range(count)]).inserted_ids
+
+def test_without_a_cursor_every_booking_is_listed(client, db, monkeypatch):
+    monkeypatch.setattr(routes, 'DASHBOARD_USER_LOOKUP', {'$addFields': {'user_doc': []}}) # mongomock has no $convert
+    add_bookings(db, routes.DASHBOARD_PAGE_SIZE + 5)
+
+    body = client.get('/dashboard').get_json()
+
+    assert len(body) == routes.DASHBOARD_PAGE_SIZE + 5
+    assert body[0] == {'user_name': 'Unknown', 'hotel_name': f"Hotel {routes.DASHBOARD_PAGE_SIZE + 4}", 'amount': routes.DASHBOARD_PAGE_SIZE + 4, 'payment_status': 'Paid'}
+
+def test_cursor_pages_cover_every_booking_once(client, db, monkeypatch):
+    monkeypatch.setattr(routes, 'DASHBOARD_USER_LOOKUP', {'$addFields': {'user_doc': []}})
+    add_bookings(db, 7)
+
+    first = client.get('/dashboard?limit=3&includeCount=1').get_json()
+    second = client.get(f"/dashboard?limit=3&cursor={first['next_cursor']}").get_json()
+    third = client.get(f"/dashboard?limit=3&cursor={second['next_cursor']}").get_json()
+
+    assert first['total'] == 7
+    names = [booking['hotel_name'] for page in (first, second, third) for booking in page['bookings']]
+    assert names == [f"Hotel {i}" for i in reversed(range(7))]
+    assert third['next_cursor'] is None
+    assert client.get('/dashboard?cursor=nope').status_code == 400
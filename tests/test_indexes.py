@@ -0,0 +1,20 @@
+import pytest
+from bson import ObjectId
+from database import indexes
+
+def test_start_builds_required_indexes(app, db):
+    indexes.start(app)
+    assert indexes.missing_required_indexes(db) == []
+
+def test_start_refuses_without_room_month_unique(app, db):
+    db.room_calendar.drop() # Takes its indexes with it
+    app.config['CREATE_INDEXES_ON_STARTUP'] = False # Indexes are left to a deploy step that has not run
+    with pytest.raises(RuntimeError, match='room_month_unique'):
+        indexes.start(app)
+
+def test_start_refuses_when_room_month_unique_cannot_be_built(app, db):
+    db.room_calendar.drop()
+    room_id = ObjectId()
+    db.room_calendar.insert_many([{'room_id': room_id, 'month': '2026-10'}, {'room_id': room_id, 'month': '2026-10'}])
+    with pytest.raises(RuntimeError, match='room_month_unique'):
+        indexes.start(app)
@@ -0,0 +1,21 @@
+from datetime import datetime
+from bson import ObjectId
+from utils.json_provider import MongoJSONProvider
+
+def test_app_uses_mongo_json_provider(app):
+    assert type(app.json) is MongoJSONProvider # Flask-PyMongo installs its own BSON provider; ours must win
+
+def test_ids_and_dates_on_the_wire(client, db, auth_headers):
+    hotel_id = db.rooms.insert_one({'hotelName': 'Grand Palace'}).inserted_id
+    feedback_id = db.feedback.insert_one({
+        'hotel_id': hotel_id, 'user_id': ObjectId(), 'rating': 4, 'comment': 'Nice',
+        'timeStamp': datetime(2026, 1, 2, 3, 4, 5)
+    }).inserted_id
+
+    response = client.get(f'/get-feedback/{hotel_id}?limit=5', headers=auth_headers)
+
+    assert response.status_code == 200
+    entry = response.get_json()['feedback'][0]
+    assert entry['_id'] == str(feedback_id)
+    assert entry['timeStamp'] == '2026-01-02T03:04:05Z'
+    assert f'"_id":"{feedback_id}"' in response.get_data(as_text=True) # Plain strings, not {"$oid": ...} / {"$date": ...}
@@ -0,0 +1,24 @@
+import gzip
+from observability import metrics
+from utils.response_cache import response_cache
+
+def observed_sizes(endpoint): # (sum, count) of http_response_size_bytes for endpoint
+    for labels, series in metrics.http_response_size.snapshot():
+        if labels == (endpoint,):
+            return series[-2], series[-1]
+    return 0, 0
+
+def test_streamed_response_size_is_recorded(client, db):
+    response_cache.enabled = False # Keep /get-rooms streaming
+    db.rooms.insert_many([{'hotelName': f"Hotel {i}", 'pricePerNight': 1000 + i} for i in range(50)])
+    before = observed_sizes('room.get_all_rooms')
+
+    response = client.get('/get-rooms', headers={'Accept-Encoding': 'gzip'})
+    assert response.is_streamed
+    body = response.get_data()
+    response.close()
+
+    total, count = observed_sizes('room.get_all_rooms')
+    assert count == before[1] + 1
+    assert total - before[0] == len(body) # Bytes on the wire, after compression
+    assert len(gzip.decompress(body)) > len(body)
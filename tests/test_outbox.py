@@ -0,0 +1,41 @@
+import mongomock
+from datetime import datetime, timedelta
+from notifications import outbox
+from notifications.transports import StubTransport
+
+MESSAGE = {'to_email': 'guest@example.com', 'to_name': 'Guest', 'sender': {}, 'subject': 'Booking', 'html': ''}
+
+def make_pool(db, transport, **kwargs):
+    return outbox.OutboxWorkerPool(db, transport, workers=0, **kwargs)
+
+def test_messages_are_claimed_one_at_a_time():
+    db = mongomock.MongoClient()['easystay_test']
+    ids = [outbox.enqueue(db, dict(MESSAGE, subject=str(i))) for i in range(3)]
+    statuses_at_send = []
+
+    class RecordingTransport(StubTransport):
+        def send(self, message): # A batch claim would already have leased the messages still waiting
+            statuses_at_send.append([doc['status'] for doc in db[outbox.OUTBOX_COLLECTION].find({'_id': {'$in': ids}}).sort('_id', 1)])
+            super().send(message)
+
+    pool = make_pool(db, RecordingTransport(), batch_size=10)
+    assert pool.drain_once() == 3
+    assert statuses_at_send == [
+        ['sending', 'pending', 'pending'],
+        ['sent', 'sending', 'pending'],
+        ['sent', 'sent', 'sending'],
+    ]
+
+def test_outcome_is_not_written_after_the_lease_is_lost():
+    db = mongomock.MongoClient()['easystay_test']
+    message_id = outbox.enqueue(db, MESSAGE)
+    pool = make_pool(db, StubTransport())
+    doc = pool.claim()
+    new_lease = datetime.utcnow().replace(microsecond=0) + timedelta(minutes=5) # Another worker reclaimed it after ours ran out
+    db[outbox.OUTBOX_COLLECTION].update_one({'_id': message_id}, {'$set': {'locked_until': new_lease}})
+
+    pool.deliver(doc)
+
+    stored = db[outbox.OUTBOX_COLLECTION].find_one({'_id': message_id})
+    assert stored['status'] == 'sending' # Left to the worker that holds the lease now
+    assert stored['locked_until'] == new_lease
@@ -0,0 +1,39 @@
+from datetime import datetime
+from bson import ObjectId
+from bookings import inventory
+
+CHECK_IN, CHECK_OUT = datetime(2026, 11, 2), datetime(2026, 11, 4)
+
+def expired_booking(db, room_id):
+    booking_id = db.bookings.insert_one({'room_id': room_id, 'status': 'Expired', 'check_in': CHECK_IN, 'check_out': CHECK_OUT}).inserted_id
+    db.orders.insert_one({'razorpay_order_id': 'order_1', 'status': 'expired'})
+    return booking_id
+
+def confirm(client, booking_id):
+    return client.post('/api/confirm-booking', json={
+        'razorpay_order_id': 'order_1', 'razorpay_payment_id': 'pay_1', 'razorpay_signature': 'sig', 'booking_id': str(booking_id)
+    })
+
+def test_late_payment_reclaims_free_nights(client, db):
+    room_id = ObjectId()
+    booking_id = expired_booking(db, room_id)
+
+    response = confirm(client, booking_id)
+
+    assert response.status_code == 200
+    assert db.bookings.find_one({'_id': booking_id})['status'] == 'Paid'
+    assert db.orders.find_one({'razorpay_order_id': 'order_1'})['status'] == 'paid'
+    assert not inventory.is_available(db, room_id, CHECK_IN, CHECK_OUT)
+
+def test_late_payment_for_rebooked_nights_is_recorded_for_refund(client, db):
+    room_id = ObjectId()
+    booking_id = expired_booking(db, room_id)
+    assert inventory.reserve_stay(db, room_id, CHECK_IN, CHECK_OUT, ObjectId()) # Someone else took the released nights
+
+    response = confirm(client, booking_id)
+
+    assert response.status_code == 409
+    assert db.bookings.find_one({'_id': booking_id})['status'] == 'Expired'
+    order = db.orders.find_one({'razorpay_order_id': 'order_1'})
+    assert order['status'] == 'refund_due'
+    assert order['razorpay_payment_id'] == 'pay_1'
@@ -0,0 +1,47 @@
+import os
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import ServerSelectionTimeoutError
+from database import indexes
+
+# explain() needs a real MongoDB; mongomock does not plan queries. Point TEST_MONGO_URI at a disposable server
+# to run these, e.g. `docker run -p 27017:27017 mongo:7`. They are skipped when none answers.
+TEST_MONGO_URI = os.getenv('TEST_MONGO_URI', 'mongodb://localhost:27017')
+PLAN_DATABASE = 'easystay_query_plans_test'
+
+@pytest.fixture
+def mongo_db():
+    client = MongoClient(TEST_MONGO_URI, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command('ping')
+    except ServerSelectionTimeoutError:
+        pytest.skip(f"no MongoDB at {TEST_MONGO_URI}")
+    client.drop_database(PLAN_DATABASE)
+    db = client[PLAN_DATABASE]
+    assert indexes.ensure_indexes(db) == []
+    yield db
+    client.drop_database(PLAN_DATABASE)
+    client.close()
+
+def test_every_query_shape_uses_an_index(mongo_db):
+    violations = indexes.check_query_plans(mongo_db)
+    assert [shape['route'] for shape in violations] == []
+
+def test_a_missing_index_is_reported(mongo_db):
+    mongo_db.feedback.drop_index('hotel_id_id')
+    routes = [shape['route'] for shape in indexes.check_query_plans(mongo_db)]
+    assert routes == ['feedback.get_feedback']
+
+def test_plan_stages_walks_nested_plans(): # Offline: the stage walk that check_query_plans relies on
+    plan = {'stage': 'SORT', 'inputStage': {'stage': 'OR', 'inputStages': [
+        {'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN'}},
+        {'stage': 'COLLSCAN'},
+    ]}}
+    assert set(indexes._plan_stages(plan)) == {'SORT', 'OR', 'FETCH', 'IXSCAN', 'COLLSCAN'}
+
+def test_query_shapes_come_from_the_route_builders():
+    shapes = {shape['route']: shape for shape in indexes.query_shapes()}
+    assert shapes['room.get_all_rooms']['sort'] == {'pricePerNight': 1, '_id': 1}
+    assert {'booking.get_bookings (upcoming)', 'booking.get_bookings (past)', 'booking.get_bookings (cancelled)'} <= set(shapes)
+    collections = {shape['collection'] for shape in shapes.values()}
+    assert collections <= set(indexes.INDEXES) # Every queried collection has declared indexes
@@ -0,0 +1,49 @@
+from utils.response_cache import response_cache
+
+def add_rooms(db, count):
+    db.rooms.insert_many([{
+        'hotelName': f"Grand Palace {i}", 'streetAddress': f"{i} Main Road", 'city': 'Goa', 'roomType': 'Suite',
+        'pricePerNight': 1000 + i, 'amenities': ['Wi-Fi', 'AC', 'TV', 'Breakfast'],
+        'images': [f"https://res.cloudinary.com/easystay/image/upload/v1/room-{i}-{n}.jpg" for n in range(4)]
+    } for i in range(count)])
+
+def test_large_catalogue_revalidates_with_304(client, db):
+    add_rooms(db, 3000)
+
+    first = client.get('/get-rooms')
+    body = first.get_data()
+    assert len(body) > response_cache.max_entry_bytes # Larger than the default entry limit
+    etag = first.headers['ETag']
+
+    second = client.get('/get-rooms', headers={'If-None-Match': etag})
+
+    assert second.status_code == 304
+    assert second.get_data() == b''
+    assert client.get('/get-rooms').get_data() == body # Served from the cache
+
+def test_catalogue_over_the_rooms_limit_still_streams(app, client, db):
+    response_cache.namespace_max_entry_bytes['rooms'] = 64 * 1024
+    add_rooms(db, 500)
+
+    response = client.get('/get-rooms')
+
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+    assert len(response.get_json()) == 500
+
+def test_compressed_clients_revalidate_with_304(client, db):
+    add_rooms(db, 50)
+    gzip = {'Accept-Encoding': 'gzip'}
+    first = client.get('/get-rooms', headers=gzip)
+    etag = first.headers['ETag']
+    assert first.headers['Content-Encoding'] == 'gzip' and etag.endswith('-gzip"')
+
+    cached = client.get('/get-rooms', headers={**gzip, 'If-None-Match': etag}) # Served from the response cache
+    response_cache.clear()
+    rebuilt = client.get('/get-rooms', headers={**gzip, 'If-None-Match': etag}) # Built again from MongoDB
+    identity = client.get('/get-rooms', headers={'If-None-Match': etag}) # Same content, other encoding
+    other_codec = client.get('/get-rooms', headers={**gzip, 'If-None-Match': etag.replace('-gzip"', '-br"')})
+
+    assert [r.status_code for r in (cached, rebuilt, identity, other_codec)] == [304] * 4
+    assert cached.headers['ETag'] == etag
+    assert identity.headers['ETag'] == etag.replace('-gzip', '')
@@ -0,0 +1,69 @@
+import io
+import pytest
+from datetime import datetime
+from bson import ObjectId, json_util
+from flask_jwt_extended import create_access_token
+from pymongo.errors import AutoReconnect
+from admin import transfer
+from bookings import inventory
+
+def booking_lines(room_id, count):
+    return [json_util.dumps({'_id': ObjectId(), 'room_id': room_id, 'status': 'Paid',
+                             'check_in': datetime(2026, 12, i + 1), 'check_out': datetime(2026, 12, i + 2)}) for i in range(count)]
+
+@pytest.fixture
+def admin_headers(app, db):
+    app.config['ADMIN_EMAIL_SET'] = frozenset({'admin@example.com'})
+    admin_id = db.users.insert_one({'email': 'Admin@example.com', 'name': 'Admin'}).inserted_id
+    with app.app_context():
+        token = create_access_token(identity=str(admin_id))
+    return {'Authorization': f'Bearer {token}'}
+
+def test_export_requires_a_token(client):
+    assert client.get('/admin/export/bookings').status_code == 401
+
+def test_export_requires_an_admin(client, auth_headers):
+    assert client.get('/admin/export/bookings', headers=auth_headers).status_code == 403
+
+def test_import_round_trip_as_admin(client, db, admin_headers):
+    lines = booking_lines(ObjectId(), 3)
+
+    response = client.post('/admin/import/bookings', data='\n'.join(lines), headers=admin_headers, content_type='application/x-ndjson')
+
+    assert response.status_code == 200
+    assert response.get_json()['inserted'] == 3
+    exported = client.get('/admin/export/bookings', headers=admin_headers).get_data(as_text=True).splitlines()
+    assert [json_util.loads(line)['_id'] for line in exported] == [json_util.loads(line)['_id'] for line in lines]
+
+def test_interrupted_import_reports_where_to_resume(db, monkeypatch):
+    room_id = ObjectId()
+    lines = booking_lines(room_id, 5)
+    reserve_stay = inventory.reserve_stay
+    calls = []
+
+    def failing_reserve(*args, **kwargs): # MongoDB goes away while the fourth booking is reserved
+        calls.append(args)
+        if len(calls) == 4:
+            raise AutoReconnect('connection lost')
+        return reserve_stay(*args, **kwargs)
+
+    monkeypatch.setattr(inventory, 'reserve_stay', failing_reserve)
+    report = transfer.import_ndjson(db, 'bookings', io.StringIO('\n'.join(lines)), chunk_size=2)
+    assert report['inserted'] == 2
+    assert report['resume_from'] == 3 # Line 3 was reserved but still buffered when the import stopped
+    assert 'connection lost' in report['stopped']
+
+    monkeypatch.setattr(inventory, 'reserve_stay', reserve_stay)
+    resumed = transfer.import_ndjson(db, 'bookings', io.StringIO('\n'.join(lines)), start_line=report['resume_from'])
+    assert resumed['inserted'] == 3
+    assert resumed['error_count'] == 0 # Line 3's nights, still held from the first run, are its own
+    assert db.bookings.count_documents({}) == 5
+
+def test_resuming_from_an_earlier_line_skips_stored_documents(db):
+    lines = booking_lines(ObjectId(), 2)
+    transfer.import_ndjson(db, 'bookings', io.StringIO('\n'.join(lines)))
+
+    report = transfer.import_ndjson(db, 'bookings', io.StringIO('\n'.join(lines)))
+
+    assert report == dict(report, inserted=0, already_present=2, error_count=0)
+    assert not inventory.is_available(db, json_util.loads(lines[0])['room_id'], datetime(2026, 12, 1), datetime(2026, 12, 2))
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from bson import ObjectId
 from flask_cors import cross_origin
+from auth.identity import identity_cache
 
 profile_bp = Blueprint('userProfile', __name__)
 mongo = None
@@ -15,9 +16,8 @@ def get_profile():
     email = request.args.get('email') # Get the email from the request arguments
     name = request.args.get('name') # Get the name from the request arguments
 
-    result = mongo.db.users.find_one({'_id': ObjectId(user_id)}); # Find the user profile by user ID
-    if(result): # If the user profile is found, convert ObjectId to string for JSON serialization
-        result['_id'] = str(result['_id']) # Convert ObjectId to string
+    result = identity_cache.get_user(mongo.db, user_id) # Find the user profile by user ID, from this worker's cache when possible; never includes the password hash
+    if(result): # If the user profile is found; the app's JSON provider encodes its ObjectId
         return jsonify({"message": "Successfully gettig the data", "profileData": result}), 200 # Return the profile data as JSON response
     return jsonify({"message": "Failed to get the profile data", "result": result}), 400 # If the user profile is not found, return an error message
 
@@ -32,6 +32,7 @@ def update_profile():
         del data['_id'] 
 
     result = mongo.db.users.update_one({"_id": ObjectId(user_id)}, {"$set": data}) # Update the user profile with the provided data
+    identity_cache.invalidate(user_id) # The cached record is stale now
 
     if result.modified_count == 1: # If the update was successful, return a success message
         return jsonify({"message": "Profile updated successfully"}), 200 
@@ -46,6 +47,7 @@ def delete_profile():
     user_id = get_jwt_identity() # Get the user ID from the JWT token
 
     result = mongo.db.users.delete_one({'_id': ObjectId(user_id)}) # Delete the user profile by user ID
+    identity_cache.invalidate(user_id) # Stop serving the deleted user from the cache
 
     if result.deleted_count == 1: # If the deletion was successful, return a success message
         return jsonify({"message": "Profile Deleted Successfully"}), 200 # If the profile was deleted successfully
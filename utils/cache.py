@@ -0,0 +1,57 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Small thread-safe LRU cache with a per-entry time-to-live, shared by the in-process caches of the app.
+
+_MISSING = object()
+
+class TTLCache:
+    def __init__(self, maxsize=1024, ttl=300.0):
+        self.maxsize = maxsize # Entries kept before the least recently used one is evicted
+        self.ttl = ttl # Seconds an entry stays valid
+        self._data = OrderedDict() # key -> (expires_at, value), most recently used last
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] < time.monotonic():
+                if entry is not _MISSING:
+                    del self._data[key] # Drop the expired entry
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False) # Evict the least recently used entry
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
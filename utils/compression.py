@@ -0,0 +1,206 @@
+import time
+import zlib
+from flask import request
+from observability.metrics import registry
+from utils.cache import TTLCache
+
+try:
+    import brotli # Optional; br is offered only when it is installed
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard # Optional; zstd is offered only when it is installed
+except ImportError:
+    zstandard = None
+
+# Response compression negotiated from Accept-Encoding. Runs as an after_request hook, so it covers every route:
+#   - bodies below COMPRESSION_MIN_BYTES and non-text types are sent as they are
+#   - streamed bodies (/get-rooms) are compressed chunk by chunk, flushed every FLUSH_BYTES of
+#     input so clients keep receiving data while MongoDB is still producing it
+#   - a compressed response gets its own ETag, the identity ETag plus "-<encoding>", and every negotiable
+#     response carries Vary: Accept-Encoding, so shared caches never hand gzip to a client that did not ask for it.
+#     The response cache strips the suffix from If-None-Match before comparing (see base_etag)
+#   - compressed bodies of ETag-carrying responses are kept in a small cache keyed by (ETag, encoding), so a
+#     response cache hit is not recompressed for every client
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+ENCODINGS = ('gzip', 'br', 'zstd') # Every suffix encoded_etag may add, whether or not the codec is installed here
+FLUSH_BYTES = 64 * 1024 # Input bytes between flushes of a streamed body
+
+compressed_bytes_in = registry.counter('compression_bytes_in_total', 'Response bytes before compression', ('encoding',))
+compressed_bytes_out = registry.counter('compression_bytes_out_total', 'Response bytes after compression', ('encoding',))
+compression_cpu = registry.histogram('compression_cpu_seconds', 'CPU time spent compressing one response', ('encoding',))
+
+class GzipCodec:
+    name = 'gzip'
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compressor(self):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31) # wbits 31 writes the gzip header and trailer
+        return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+class BrotliCodec:
+    name = 'br'
+
+    def __init__(self, quality=4):
+        self.quality = quality # 4 is close to gzip's speed with a better ratio on JSON
+
+    def compressor(self):
+        compressor = brotli.Compressor(quality=self.quality)
+        return compressor.process, compressor.flush, compressor.finish
+
+class ZstdCodec:
+    name = 'zstd'
+
+    def __init__(self, level=3):
+        self.level = level
+
+    def compressor(self):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        return compressor.compress, lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK), compressor.flush
+
+def available_codecs(config): # Codecs in server preference order, limited to the installed libraries
+    codecs = {'gzip': GzipCodec(int(config.get('COMPRESSION_GZIP_LEVEL', 6)))}
+    if brotli is not None:
+        codecs['br'] = BrotliCodec(int(config.get('COMPRESSION_BROTLI_QUALITY', 4)))
+    if zstandard is not None:
+        codecs['zstd'] = ZstdCodec(int(config.get('COMPRESSION_ZSTD_LEVEL', 3)))
+    names = [name.strip() for name in config.get('COMPRESSION_ENCODINGS', 'br,zstd,gzip').split(',') if name.strip()]
+    return [codecs[name] for name in names if name in codecs]
+
+def encoded_etag(etag, encoding):
+    return f"{etag}-{encoding}"
+
+def base_etag(etag): # The identity ETag a compressed representation's ETag was derived from
+    tag, sep, encoding = etag.rpartition('-')
+    return tag if sep and encoding in ENCODINGS else etag
+
+def compress_body(codec, body):
+    compress, _, finish = codec.compressor()
+    return compress(body) + finish()
+
+def compress_stream(codec, prefix, chunks, source):
+    compress, flush, finish = codec.compressor()
+    size_in = size_out = 0
+    cpu = 0.0
+    since_flush = 0
+    try:
+        for chunk in _chain(prefix, chunks):
+            started = time.thread_time()
+            out = compress(chunk)
+            since_flush += len(chunk)
+            if since_flush >= FLUSH_BYTES: # Push what we have to the client instead of waiting for the end
+                out += flush()
+                since_flush = 0
+            cpu += time.thread_time() - started
+            size_in += len(chunk)
+            if out:
+                size_out += len(out)
+                yield out
+        started = time.thread_time()
+        out = finish()
+        cpu += time.thread_time() - started
+        size_out += len(out)
+        yield out
+    finally:
+        if hasattr(source, 'close'): # The original body may hold a MongoDB cursor and the request context
+            source.close()
+        compressed_bytes_in.inc(codec.name, amount=size_in)
+        compressed_bytes_out.inc(codec.name, amount=size_out)
+        compression_cpu.observe(cpu, codec.name)
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+class Compression:
+    def __init__(self):
+        self.enabled = True
+        self.min_bytes = 1024
+        self.codecs = [GzipCodec()]
+        self.bodies = TTLCache(maxsize=128, ttl=300.0) # (ETag, encoding) -> compressed body
+
+    def negotiate(self): # The codec the client prefers most among the ones we offer, or None
+        offered = {codec.name: codec for codec in self.codecs}
+        best = request.accept_encodings.best_match(list(offered)) # Honours q-values; ties go to our order
+        return offered.get(best)
+
+    def _compress_buffered(self, response, codec):
+        body = response.get_data()
+        if len(body) < self.min_bytes:
+            return response
+        etag = response.get_etag()[0]
+        compressed = self.bodies.get((etag, codec.name)) if etag else None
+        if compressed is None:
+            started = time.thread_time()
+            compressed = compress_body(codec, body)
+            compression_cpu.observe(time.thread_time() - started, codec.name)
+            compressed_bytes_in.inc(codec.name, amount=len(body))
+            compressed_bytes_out.inc(codec.name, amount=len(compressed))
+            if etag:
+                self.bodies.set((etag, codec.name), compressed)
+        if len(compressed) >= len(body): # Incompressible, keep the original
+            return response
+        response.set_data(compressed)
+        self._mark(response, codec)
+        return response
+
+    def _compress_streamed(self, response, codec):
+        source = response.response
+        chunks = response.iter_encoded()
+        prefix = b''
+        for chunk in chunks: # Read ahead until the body is known to be worth compressing
+            prefix += chunk
+            if len(prefix) >= self.min_bytes:
+                break
+        else: # The whole stream was smaller than the threshold
+            if hasattr(source, 'close'):
+                source.close()
+            response.set_data(prefix)
+            return response
+        response.response = compress_stream(codec, prefix, chunks, source)
+        response.headers.pop('Content-Length', None)
+        self._mark(response, codec)
+        return response
+
+    def _mark(self, response, codec):
+        response.headers['Content-Encoding'] = codec.name
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(encoded_etag(etag, codec.name), weak=weak)
+
+    def process(self, response):
+        if not self.enabled or request.method == 'HEAD' or response.direct_passthrough:
+            return response
+        if response.status_code not in (200, 304) or 'Content-Encoding' in response.headers:
+            return response
+        if not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES):
+            return response
+        response.vary.add('Accept-Encoding')
+        codec = self.negotiate()
+        if codec is None:
+            return response
+        if response.status_code == 304: # Same ETag the compressed 200 would have carried
+            etag, weak = response.get_etag()
+            if etag:
+                response.set_etag(encoded_etag(etag, codec.name), weak=weak)
+            return response
+        if response.is_streamed:
+            return self._compress_streamed(response, codec)
+        return self._compress_buffered(response, codec)
+
+compression = Compression()
+
+def compression_metrics(): # Body cache size for /metrics; byte and CPU totals are counters above
+    return {'compression_body_cache_entries': ('Compressed bodies kept for reuse', {(): len(compression.bodies)})}
+
+def init_app(app):
+    compression.enabled = app.config.get('COMPRESSION_ENABLED', True)
+    compression.min_bytes = int(app.config.get('COMPRESSION_MIN_BYTES', 1024))
+    compression.codecs = available_codecs(app.config)
+    compression.bodies = TTLCache(maxsize=int(app.config.get('COMPRESSION_CACHE_ENTRIES', 128)), ttl=300.0)
+    registry.register_collector(compression_metrics)
+    app.after_request(compression.process)
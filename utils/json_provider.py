@@ -0,0 +1,64 @@
+import decimal
+import json
+from datetime import date, datetime, timedelta
+from bson import Decimal128, ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson # Optional; the provider falls back to the standard library encoder, set up to write the same text
+except ImportError:
+    orjson = None
+
+# JSON provider that encodes MongoDB documents as they come off a cursor, so routes can pass them to jsonify
+# without copying them to convert ids and dates first:
+#   ObjectId    -> its hex string
+#   datetime    -> ISO 8601 in UTC, e.g. "2026-10-18T09:30:00Z" (BSON dates are naive UTC)
+#   date        -> "2026-10-18"
+#   Decimal128 / Decimal -> string, so no precision is lost
+# orjson is used when installed; it serializes dicts, lists, strings and datetimes in C and only calls back into
+# Python for ObjectId and Decimal128.
+
+def _iso(value): # Same text orjson produces with OPT_NAIVE_UTC | OPT_UTC_Z; naive datetimes from MongoDB are UTC
+    if value.tzinfo is None or value.utcoffset() == timedelta(0):
+        return value.replace(tzinfo=None).isoformat() + 'Z'
+    return value.isoformat()
+
+def _bson_default(value): # Types neither encoder knows natively
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _stdlib_default(value):
+    if isinstance(value, datetime):
+        return _iso(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return _bson_default(value)
+
+class MongoJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs.get('cls'):
+            option = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+            if kwargs.get('sort_keys', self.sort_keys):
+                option |= orjson.OPT_SORT_KEYS
+            if kwargs.get('indent'):
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_bson_default, option=option).decode('utf-8')
+        kwargs.setdefault('default', _stdlib_default)
+        kwargs.setdefault('ensure_ascii', False) # orjson writes raw UTF-8 rather than \u escapes
+        if not kwargs.get('indent'):
+            kwargs.setdefault('separators', (',', ':')) # and no spaces between items
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+def init_app(app):
+    app.json = MongoJSONProvider(app)
@@ -0,0 +1,207 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, current_app, make_response
+from observability.metrics import registry
+from utils import compression
+
+# In-process cache of full responses for read-only catalogue endpoints. Entries are keyed by route and query
+# string, evicted least-recently-used once the cached bodies exceed max_bytes, and carry a strong ETag so
+# clients revalidating with If-None-Match get a 304 without a body, whichever encoding they hold. Write paths
+# call invalidate() with the namespace they touch; with RESPONSE_CACHE_CHANGE_STREAM enabled a MongoDB change
+# stream does the same for writes made by other workers; without it, entries expire after max_age seconds so a
+# write served by another worker shows up within that bound. Every namespace has a generation counter that
+# invalidate() bumps: a response computed while an invalidation happened is not stored, because it may predate
+# the write. Bodies larger than the namespace's entry limit are not cached: the view keeps streaming them, which
+# also lets the compression hook encode them chunk by chunk. The limit is max_entry_bytes unless the namespace
+# has its own in namespace_max_entry_bytes; 'rooms' does, so the unpaginated /get-rooms catalogue, which runs
+# past a megabyte, is cached whole and revalidates with a 304 like the smaller responses.
+
+class ResponseCache:
+    def __init__(self, max_bytes=16 * 1024 * 1024, max_age=30.0, max_entry_bytes=1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes # Larger responses are sent as the view produced them, uncached
+        self.namespace_max_entry_bytes = {} # namespace -> its own entry limit, for namespaces with one large response
+        self.max_age = max_age # Seconds an entry is served before it is recomputed
+        self.enabled = True
+        self._entries = OrderedDict() # (namespace, path, query) -> (body, mimetype, etag, expires_at), most recently used last
+        self._generations = {} # namespace -> number of invalidations so far
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[3] < time.monotonic(): # Expired, recompute it
+                self._bytes -= len(self._entries.pop(key)[0])
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[:3]
+
+    def generation(self, namespace): # Read before computing a response, passed back to set()
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def entry_limit(self, namespace): # Largest body cached for namespace, never more than the whole cache
+        return min(self.max_bytes, self.namespace_max_entry_bytes.get(namespace, self.max_entry_bytes))
+
+    def set(self, key, body, mimetype, etag, generation):
+        if len(body) > self.entry_limit(key[0]):
+            return # Never let one huge body flush the whole cache
+        with self._lock:
+            if self._generations.get(key[0], 0) != generation: # Invalidated while the body was computed
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._entries[key] = (body, mimetype, etag, time.monotonic() + self.max_age)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, (evicted, _, _, _) = self._entries.popitem(last=False) # Evict the least recently used response
+                self._bytes -= len(evicted)
+
+    def invalidate(self, namespace): # Drop every cached response of one namespace, e.g. after a rooms write
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for key in [key for key in self._entries if key[0] == namespace]:
+                self._bytes -= len(self._entries.pop(key)[0])
+
+    def clear(self):
+        with self._lock:
+            for namespace in {key[0] for key in self._entries} | set(self._generations):
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+response_cache = ResponseCache()
+
+def strong_etag(body): # Content hash, so identical bodies share an ETag across workers and restarts
+    return hashlib.sha256(body).hexdigest()[:32]
+
+def _resume(buffered, chunks, source): # The chunks read ahead, then the rest of the original stream
+    try:
+        yield from buffered
+        yield from chunks
+    finally:
+        if hasattr(source, 'close'): # Releases the MongoDB cursor and the request context
+            source.close()
+
+def _buffer_body(response, limit): # The whole body if it fits in limit bytes; otherwise None, with the response left streaming
+    if not response.is_streamed:
+        body = response.get_data()
+        return body if len(body) <= limit else None
+    source = response.response
+    chunks = response.iter_encoded()
+    buffered = []
+    size = 0
+    for chunk in chunks:
+        buffered.append(chunk)
+        size += len(chunk)
+        if size > limit:
+            response.response = _resume(buffered, chunks, source)
+            return None
+    if hasattr(source, 'close'):
+        source.close()
+    body = b''.join(buffered)
+    response.set_data(body)
+    return body
+
+def _conditional(response):
+    response.headers['Cache-Control'] = 'no-cache' # Clients may store it but must revalidate with If-None-Match
+    etag = response.get_etag()[0]
+    # A client holding the gzip/br/zstd copy sends that representation's ETag back; the content is the same
+    held = {compression.base_etag(tag) for tag in request.if_none_match.as_set(include_weak=True)}
+    if etag and (request.if_none_match.star_tag or etag in held):
+        response_cache.not_modified += 1
+        not_modified = current_app.response_class(status=304, mimetype=response.mimetype)
+        not_modified.set_etag(etag) # The compression hook gives it the negotiated encoding's suffix
+        not_modified.headers['Cache-Control'] = 'no-cache'
+        return not_modified
+    return response
+
+def cached_response(namespace): # Decorator caching a GET view's 200 responses under namespace
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not response_cache.enabled or request.method != 'GET':
+                return view(*args, **kwargs)
+
+            key = (namespace, request.path, tuple(sorted(request.args.items(multi=True))))
+            entry = response_cache.get(key)
+            if entry is not None:
+                body, mimetype, etag = entry
+                response = current_app.response_class(body, status=200, mimetype=mimetype)
+                response.set_etag(etag)
+                return _conditional(response)
+
+            generation = response_cache.generation(namespace)
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            body = _buffer_body(response, response_cache.entry_limit(namespace)) # Buffered once so later hits skip MongoDB and serialization
+            if body is None: # Too large to cache, keep streaming it
+                return response
+            etag = strong_etag(body)
+            response_cache.set(key, body, response.mimetype, etag, generation)
+            response.set_etag(etag)
+            return _conditional(response)
+        return wrapper
+    return decorator
+
+def _watch_collection(app, collection, namespace): # Invalidate on every change, including writes by other workers
+    while True:
+        try:
+            with app.mongo.db[collection].watch() as stream:
+                for _ in stream:
+                    response_cache.invalidate(namespace)
+        except Exception as e: # Change streams need a replica set; keep retrying rather than killing the worker
+            print("❌ Response cache change stream error:", e)
+            response_cache.invalidate(namespace)
+            threading.Event().wait(30)
+
+def cache_metrics(): # Response cache gauges for /metrics
+    stats = response_cache.stats()
+    return {
+        'response_cache_bytes': ('Bytes held by the response cache', {(): stats['bytes']}),
+        'response_cache_entries': ('Responses held by the response cache', {(): stats['entries']}),
+        'response_cache_lookups': ('Response cache lookups by result', {
+            (('result', 'hit'),): stats['hits'],
+            (('result', 'miss'),): stats['misses'],
+            (('result', 'not_modified'),): stats['not_modified']
+        })
+    }
+
+def init_app(app):
+    registry.register_collector(cache_metrics)
+    response_cache.max_bytes = int(app.config.get('RESPONSE_CACHE_MAX_BYTES', response_cache.max_bytes))
+    response_cache.max_entry_bytes = int(app.config.get('RESPONSE_CACHE_MAX_ENTRY_BYTES', response_cache.max_entry_bytes))
+    response_cache.namespace_max_entry_bytes = {
+        'rooms': int(app.config.get('RESPONSE_CACHE_ROOMS_MAX_ENTRY_BYTES', 8 * 1024 * 1024))
+    }
+    response_cache.max_age = float(app.config.get('RESPONSE_CACHE_MAX_AGE_SECONDS', response_cache.max_age))
+    response_cache.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+
+def start(app): # Per-process start-up work, run in each worker after it forks
+    if response_cache.enabled and app.config.get('RESPONSE_CACHE_CHANGE_STREAM'):
+        threading.Thread(target=_watch_collection, args=(app, 'rooms', 'rooms'), name='response-cache-rooms', daemon=True).start()